@@ -11,6 +11,12 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from core.boot import preload
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+# DJANGO_ASYNC_VIEWS=true liga as views assíncronas de motivacional e
+# diagnostico (core/urls_async.py); por padrão o ASGI serve as mesmas
+# views síncronas do WSGI
 
 application = get_asgi_application()
+preload()
@@ -0,0 +1,74 @@
+"""
+Inicialização do processo web.
+
+preload() é chamado por core/wsgi.py e core/asgi.py depois de criar a
+aplicação: com o preload_app do gunicorn isso acontece uma vez no master,
+antes do fork, e os workers já nascem com URLconf e views importadas.
+
+measure_boot() mede cada fase do boot num interpretador novo; é executado
+por `python -X importtime -m core.boot` a partir de manage.py boot_profile.
+"""
+
+import json
+import os
+import sys
+import time
+
+
+def preload():
+    """
+    Importa a URLconf e, com ela, todas as views e serializers.
+
+    Não abre conexões com o banco nem inicia threads, então pode rodar no
+    master do gunicorn antes do fork.
+    """
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+
+
+def measure_boot(handler='wsgi'):
+    """
+    Executa o boot fase a fase e devolve [(fase, ms), ...].
+    """
+    phases = []
+    last = time.perf_counter()
+
+    def mark(name):
+        nonlocal last
+        now = time.perf_counter()
+        phases.append((name, round((now - last) * 1000, 2)))
+        last = now
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    import django
+    mark('django')
+
+    from django.conf import settings
+    settings.INSTALLED_APPS
+    mark('settings')
+
+    django.setup(set_prefix=False)
+    mark('apps')
+
+    if handler == 'asgi':
+        from django.core.handlers.asgi import ASGIHandler
+        ASGIHandler()
+    else:
+        from django.core.handlers.wsgi import WSGIHandler
+        WSGIHandler()
+    mark('middleware')
+
+    preload()
+    mark('urls')
+
+    from django.core import checks
+    checks.run_checks()
+    mark('checks')
+    return phases
+
+
+if __name__ == '__main__':
+    started_at = time.time()
+    phases = measure_boot(sys.argv[1] if len(sys.argv) > 1 else 'wsgi')
+    print(json.dumps({'started_at': started_at, 'phases': phases}))
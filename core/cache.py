@@ -0,0 +1,166 @@
+"""
+Backend de cache do Django num SQLite local, com despejo LRU.
+
+É o backend do cache de respostas (settings.CACHES['tasks']): o arquivo é
+compartilhado pelos workers do gunicorn no mesmo host, cada leitura marca
+a entrada como usada e, quando uma escrita passa de MAX_ENTRIES, saem as
+vencidas e, se ainda faltar espaço, 1/CULL_FREQUENCY das entradas usadas
+há mais tempo (LRU em lote, nunca sorteadas como no FileBasedCache). incr() roda numa
+transação, então contadores não perdem incrementos entre processos.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+class SQLiteLRUCache(BaseCache):
+    """
+    LOCATION é o caminho do arquivo. Cada thread mantém a própria conexão
+    (refeita depois de um fork).
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self.path = location
+        self._local = threading.local()
+        self._ready = False
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        if not self._ready:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL, used REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS entries_used ON entries (used)')
+            self._ready = True
+        conn.execute('PRAGMA synchronous=NORMAL')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _read(self, conn, key, now):
+        row = conn.execute('SELECT value, expires FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] is not None and row[1] <= now:
+            conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            return None
+        return row[0]
+
+    def _write(self, conn, key, value, timeout, now):
+        conn.execute(
+            'INSERT OR REPLACE INTO entries (key, value, expires, used) VALUES (?, ?, ?, ?)',
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self.get_backend_timeout(timeout), now)
+        )
+        self._cull(conn, now)
+
+    def _cull(self, conn, now):
+        # Como nos backends do Django, o corte é em lote (1/CULL_FREQUENCY
+        # das entradas, as usadas há mais tempo), para não pagar um DELETE
+        # ordenado a cada escrita com o cache cheio
+        if conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0] <= self._max_entries:
+            return
+        conn.execute('DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?', (now,))
+        count = conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+        if count <= self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            excess = count
+        else:
+            excess = max(count - self._max_entries, count // self._cull_frequency)
+        conn.execute(
+            'DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY used LIMIT ?)',
+            (excess,)
+        )
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        conn = self.connection()
+        now = time.time()
+        value = self._read(conn, key, now)
+        if value is None:
+            return default
+        conn.execute('UPDATE entries SET used = ? WHERE key = ?', (now, key))
+        return pickle.loads(value)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._write(conn, key, value, timeout, time.time())
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        conn = self.connection()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            added = self._read(conn, key, now) is None
+            if added:
+                self._write(conn, key, value, timeout, now)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        conn = self.connection()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            value = self._read(conn, key, now)
+            if value is None:
+                raise ValueError(f"Key '{key}' not found")
+            new_value = pickle.loads(value) + delta
+            conn.execute(
+                'UPDATE entries SET value = ?, used = ? WHERE key = ?',
+                (pickle.dumps(new_value, pickle.HIGHEST_PROTOCOL), now, key)
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return new_value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        conn = self.connection()
+        now = time.time()
+        cursor = conn.execute(
+            'UPDATE entries SET expires = ?, used = ? '
+            'WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self.get_backend_timeout(timeout), now, key, now)
+        )
+        return cursor.rowcount > 0
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self.connection().execute('DELETE FROM entries WHERE key = ?', (key,))
+        return cursor.rowcount > 0
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._read(self.connection(), key, time.time()) is not None
+
+    def clear(self):
+        self.connection().execute('DELETE FROM entries')
+
+    def __len__(self):
+        return self.connection().execute('SELECT COUNT(*) FROM entries').fetchone()[0]
@@ -0,0 +1,69 @@
+"""
+Pool de conexões do psycopg 3 (settings.DB_POOL) e suas métricas.
+
+O pool é criado pelo backend do Django na primeira conexão de cada
+processo (nunca no master do gunicorn, que não acessa o banco) e aberto
+com DB_POOL_MIN_SIZE conexões; cada requisição pega uma conexão e a
+devolve ao fim, em vez de abrir e fechar uma nova.
+"""
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# Contadores de pool.pop_stats() -> (métrica, divisor para a unidade da métrica)
+POOL_COUNTERS = {
+    'requests_num': ('db_pool_requests_total', 1),
+    'requests_queued': ('db_pool_requests_queued_total', 1),
+    'requests_wait_ms': ('db_pool_wait_seconds_total', 1000),
+    'requests_errors': ('db_pool_request_errors_total', 1),
+    'connections_num': ('db_pool_connections_opened_total', 1),
+    'connections_errors': ('db_pool_connection_errors_total', 1),
+    'connections_lost': ('db_pool_connections_lost_total', 1),
+}
+
+POOL_GAUGES = {
+    'pool_size': 'db_pool_size',
+    'pool_available': 'db_pool_available',
+    'requests_waiting': 'db_pool_requests_waiting',
+}
+
+
+def get_pool(alias=DEFAULT_DB_ALIAS):
+    """
+    ConnectionPool do alias, ou None se o pool não está configurado.
+    """
+    return getattr(connections[alias], 'pool', None)
+
+
+def pool_stats(alias=DEFAULT_DB_ALIAS):
+    """
+    Tamanho atual do pool (conexões abertas, livres e requisições na fila),
+    ou None sem pool.
+    """
+    pool = get_pool(alias)
+    if pool is None:
+        return None
+    stats = pool.get_stats()
+    return {
+        'min_size': pool.min_size,
+        'max_size': pool.max_size,
+        'size': stats.get('pool_size', 0),
+        'available': stats.get('pool_available', 0),
+        'waiting': stats.get('requests_waiting', 0),
+    }
+
+
+def collect_pool_metrics(metrics, alias=DEFAULT_DB_ALIAS):
+    """
+    Passa ao store de métricas o que o pool acumulou desde a última coleta
+    (pop_stats zera os contadores) e o tamanho atual, como gauges.
+    """
+    pool = get_pool(alias)
+    if pool is None:
+        return
+    stats = pool.pop_stats()
+    labels = {'alias': alias}
+    for key, (name, divisor) in POOL_COUNTERS.items():
+        if stats.get(key):
+            metrics.inc(name, labels, stats[key] / divisor)
+    for key, name in POOL_GAUGES.items():
+        metrics.set(name, stats.get(key, 0), labels)
@@ -0,0 +1,157 @@
+"""
+Probes de saúde do processo.
+
+/health/live só diz que o processo responde; /health/ready testa o banco
+com uma conexão do pool (core/db.py). Enquanto o banco estiver fora, o
+teste não é repetido a cada chamada: depois de cada falha a próxima
+tentativa só acontece após um intervalo que dobra (HEALTH_BACKOFF_BASE até
+HEALTH_BACKOFF_MAX), e as chamadas nesse meio-tempo recebem a última falha
+com Retry-After. O comando wait_for_db usa o mesmo probe para esperar o
+banco no deploy.
+"""
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import JsonResponse
+
+from .db import get_pool, pool_stats
+
+
+def check_database(alias=DEFAULT_DB_ALIAS, timeout=None):
+    """
+    SELECT 1 no banco; devolve a latência em ms ou levanta a exceção.
+
+    Com pool, pega uma conexão dele esperando no máximo timeout segundos
+    (a mesma que as requisições usariam); sem pool, usa a conexão da thread.
+    """
+    timeout = settings.HEALTH_CHECK_TIMEOUT if timeout is None else timeout
+    started = time.perf_counter()
+    pool = get_pool(alias)
+    if pool is not None:
+        pool.open()
+        with pool.connection(timeout=timeout) as conn:
+            conn.execute('SELECT 1')
+    else:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+class ReadinessProbe:
+    """
+    Testa o banco com backoff exponencial entre falhas.
+
+    check() só chama check_database se o intervalo da última falha já
+    passou; senão devolve o resultado guardado. Um sucesso zera o backoff.
+    """
+
+    def __init__(self, check=check_database, base_delay=None, max_delay=None, clock=time.monotonic):
+        self.check_database = check
+        self.base_delay = settings.HEALTH_BACKOFF_BASE if base_delay is None else base_delay
+        self.max_delay = settings.HEALTH_BACKOFF_MAX if max_delay is None else max_delay
+        self.clock = clock
+        self.failures = 0
+        self.retry_at = 0.0
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    def delay(self):
+        return min(self.base_delay * 2 ** (self.failures - 1), self.max_delay)
+
+    def retry_after(self):
+        return max(0.0, self.retry_at - self.clock())
+
+    def check(self):
+        """
+        {'ready', 'database': {...}} com latency_ms ou error e, na falha,
+        retry_after (segundos até a próxima tentativa real).
+        """
+        with self._lock:
+            if self.failures and self.clock() < self.retry_at:
+                return self.failure()
+        try:
+            latency_ms = self.check_database()
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+                self.retry_at = self.clock() + self.delay()
+                self.last_error = f'{type(e).__name__}: {str(e).strip()[:200]}'
+                return self.failure()
+        with self._lock:
+            self.failures = 0
+            self.retry_at = 0.0
+            self.last_error = None
+        return {'ready': True, 'database': {'status': 'ok', 'latency_ms': latency_ms}}
+
+    def failure(self):
+        return {
+            'ready': False,
+            'database': {
+                'status': 'unavailable',
+                'error': self.last_error,
+                'failures': self.failures,
+            },
+            'retry_after': round(self.retry_after(), 2),
+        }
+
+
+def wait_for_database(probe, timeout, sleep=time.sleep):
+    """
+    Repete probe.check() até o banco responder ou timeout segundos
+    passarem, dormindo o backoff do probe entre as tentativas.
+    """
+    deadline = probe.clock() + timeout
+    while True:
+        result = probe.check()
+        if result['ready']:
+            return result
+        wait = probe.retry_after()
+        if probe.clock() + wait > deadline:
+            return result
+        sleep(wait)
+
+
+_probe = None
+_probe_lock = threading.Lock()
+
+
+def get_readiness_probe():
+    global _probe
+    if _probe is None:
+        with _probe_lock:
+            if _probe is None:
+                _probe = ReadinessProbe()
+    return _probe
+
+
+def reset_readiness_probe():
+    global _probe
+    with _probe_lock:
+        _probe = None
+
+
+def live_view(request):
+    """
+    GET /health/live: o processo está de pé (não acessa o banco).
+    """
+    return JsonResponse({'status': 'ok'})
+
+
+def ready_view(request):
+    """
+    GET /health/ready: 200 se o banco responde, 503 com Retry-After se não.
+    """
+    result = get_readiness_probe().check()
+    body = {'status': 'ok' if result['ready'] else 'unavailable', **result}
+    del body['ready']
+    pool = pool_stats()
+    if pool is not None:
+        body['pool'] = pool
+    response = JsonResponse(body, status=200 if result['ready'] else 503)
+    if not result['ready']:
+        response['Retry-After'] = str(max(1, math.ceil(result['retry_after'])))
+    response['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,303 @@
+"""
+Métricas no formato texto do Prometheus, somadas entre os workers.
+
+Cada processo acumula os incrementos em memória e os grava em lote num
+SQLite compartilhado (METRICS_DB) a cada METRICS_FLUSH_SECONDS, na saída do
+processo e antes de cada coleta. A view metrics_view lê o total de todos os
+processos desse arquivo, então os workers do gunicorn no mesmo host
+aparecem somados.
+
+Gauges (o tamanho do pool de conexões, por exemplo) não se somam: cada
+processo grava o próprio valor, com o label pid, e os de processos que já
+terminaram são descartados na coleta.
+"""
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from .db import collect_pool_metrics
+
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# nome: (tipo, descrição, buckets)
+METRICS = {
+    'http_requests_total': ('counter', 'Requisições HTTP por ação, método e status.', None),
+    'http_request_duration_seconds': (
+        'histogram', 'Latência das requisições por ação e status.', LATENCY_BUCKETS,
+    ),
+    'db_queries_total': ('counter', 'Consultas ao banco por ação.', None),
+    'db_query_duration_seconds_total': ('counter', 'Tempo gasto no banco por ação.', None),
+    'export_rows_total': ('counter', 'Linhas exportadas, por tipo de exportação.', None),
+    'import_rows_total': ('counter', 'Linhas importadas de CSV, por resultado.', None),
+    'tasks_cache_lookups_total': ('counter', 'Consultas ao cache de respostas, por resultado (hit/miss).', None),
+    'quote_api_calls_total': ('counter', 'Chamadas ao serviço de frases, por resultado.', None),
+    'quote_api_call_duration_seconds': (
+        'histogram', 'Latência das chamadas ao serviço de frases.', LATENCY_BUCKETS,
+    ),
+    'db_pool_requests_total': ('counter', 'Conexões pedidas ao pool.', None),
+    'db_pool_requests_queued_total': ('counter', 'Pedidos ao pool que esperaram na fila.', None),
+    'db_pool_wait_seconds_total': ('counter', 'Tempo total de espera por uma conexão do pool.', None),
+    'db_pool_request_errors_total': ('counter', 'Pedidos ao pool que falharam por timeout.', None),
+    'db_pool_connections_opened_total': ('counter', 'Conexões abertas pelo pool.', None),
+    'db_pool_connections_lost_total': ('counter', 'Conexões descartadas na verificação do pool.', None),
+    'db_pool_connection_errors_total': ('counter', 'Falhas ao abrir conexões do pool.', None),
+    'db_pool_size': ('gauge', 'Conexões abertas no pool, por processo.', None),
+    'db_pool_available': ('gauge', 'Conexões livres no pool, por processo.', None),
+    'db_pool_requests_waiting': ('gauge', 'Pedidos esperando uma conexão do pool, por processo.', None),
+    'throttled_requests_total': ('counter', 'Requisições recusadas pelo limite de uso, por ação.', None),
+}
+
+
+def label_key(labels):
+    return json.dumps(labels, sort_keys=True, separators=(',', ':'))
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    inner = ','.join(f'{name}="{escape_label(value)}"' for name, value in labels.items())
+    return '{' + inner + '}'
+
+
+def format_value(value):
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MetricsStore:
+    """
+    Incrementos pendentes do processo e o SQLite onde todos são somados.
+
+    Histogramas são guardados como contadores: um por bucket (cumulativo,
+    label le), _sum e _count.
+    """
+
+    def __init__(self, path, flush_interval=1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._ready = False
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._ready:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS samples ('
+                'name TEXT NOT NULL, labels TEXT NOT NULL, value REAL NOT NULL, '
+                'PRIMARY KEY (name, labels))'
+            )
+            self._ready = True
+        return conn
+
+    def inc(self, name, labels=None, amount=1):
+        key = (name, label_key(labels or {}))
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + amount
+        self.maybe_flush()
+
+    def observe(self, name, value, labels=None):
+        labels = labels or {}
+        buckets = METRICS[name][2]
+        with self._lock:
+            for bound in buckets[bisect_left(buckets, value):]:
+                key = (f'{name}_bucket', label_key({**labels, 'le': bound}))
+                self._pending[key] = self._pending.get(key, 0) + 1
+            for suffix, amount in (('_bucket', 1), ('_sum', value), ('_count', 1)):
+                bucket_labels = {**labels, 'le': '+Inf'} if suffix == '_bucket' else labels
+                key = (f'{name}{suffix}', label_key(bucket_labels))
+                self._pending[key] = self._pending.get(key, 0) + amount
+        self.maybe_flush()
+
+    def set(self, name, value, labels=None):
+        """
+        Valor atual de um gauge neste processo.
+        """
+        key = (name, label_key({**(labels or {}), 'pid': os.getpid()}))
+        with self._lock:
+            self._gauges[key] = value
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            gauges, self._gauges = self._gauges, {}
+            self._last_flush = time.monotonic()
+        if not pending and not gauges:
+            return
+        # Métricas nunca derrubam uma requisição: se o arquivo falhar, o lote
+        # é descartado
+        try:
+            conn = self.connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        'INSERT INTO samples (name, labels, value) VALUES (?, ?, ?) '
+                        'ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value',
+                        [(name, labels, value) for (name, labels), value in pending.items()]
+                    )
+                    conn.executemany(
+                        'INSERT INTO samples (name, labels, value) VALUES (?, ?, ?) '
+                        'ON CONFLICT (name, labels) DO UPDATE SET value = excluded.value',
+                        [(name, labels, value) for (name, labels), value in gauges.items()]
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning('Falha ao gravar métricas em %s: %s', self.path, e)
+
+    def samples(self):
+        """
+        Totais de todos os processos: {(nome, labels_json): valor}.
+        """
+        self.flush()
+        conn = self.connect()
+        try:
+            rows = conn.execute('SELECT name, labels, value FROM samples').fetchall()
+            stale = [
+                (name, labels) for name, labels, _ in rows
+                if METRICS.get(name, ('',))[0] == 'gauge' and not process_alive(json.loads(labels)['pid'])
+            ]
+            if stale:
+                with conn:
+                    conn.executemany('DELETE FROM samples WHERE name = ? AND labels = ?', stale)
+        finally:
+            conn.close()
+        stale = set(stale)
+        return {(name, labels): value for name, labels, value in rows if (name, labels) not in stale}
+
+    def reset(self):
+        with self._lock:
+            self._pending = {}
+            self._gauges = {}
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute('DELETE FROM samples')
+        finally:
+            conn.close()
+
+    def render(self):
+        """
+        Texto no formato de exposição do Prometheus (versão 0.0.4).
+        """
+        by_metric = {}
+        for (name, labels), value in self.samples().items():
+            base = name
+            for suffix in ('_bucket', '_sum', '_count'):
+                if name.endswith(suffix) and name[:-len(suffix)] in METRICS:
+                    base = name[:-len(suffix)]
+            by_metric.setdefault(base, []).append((name, json.loads(labels), value))
+
+        def sort_key(sample):
+            name, labels, _ = sample
+            le = labels.get('le')
+            bound = float('inf') if le == '+Inf' else (le if le is not None else 0)
+            rest = {k: v for k, v in labels.items() if k != 'le'}
+            return label_key(rest), name, bound
+
+        lines = []
+        for base in sorted(by_metric):
+            kind, description, _ = METRICS.get(base, ('untyped', '', None))
+            lines.append(f'# HELP {base} {description}')
+            lines.append(f'# TYPE {base} {kind}')
+            for name, labels, value in sorted(by_metric[base], key=sort_key):
+                lines.append(f'{name}{format_labels(labels)} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_metrics():
+    """
+    MetricsStore do processo, criado na primeira chamada.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MetricsStore(settings.METRICS_DB, settings.METRICS_FLUSH_SECONDS)
+                atexit.register(_store.flush)
+    return _store
+
+
+def reset_metrics():
+    """
+    Descarta o store do processo (usado nos testes após mudar METRICS_DB).
+    """
+    global _store
+    with _store_lock:
+        if _store is not None:
+            atexit.unregister(_store.flush)
+        _store = None
+
+
+def observe_request(timing, method, status_code):
+    """
+    Registra uma requisição medida por RequestTimingMiddleware.
+    """
+    metrics = get_metrics()
+    action = timing.action or 'unmatched'
+    metrics.inc('http_requests_total', {'action': action, 'method': method, 'status': status_code})
+    metrics.observe(
+        'http_request_duration_seconds', time.perf_counter() - timing.start,
+        {'action': action, 'status': status_code},
+    )
+    if timing.db_count:
+        metrics.inc('db_queries_total', {'action': action}, timing.db_count)
+        metrics.inc('db_query_duration_seconds_total', {'action': action}, timing.db_time)
+    collect_pool_metrics(metrics)
+
+
+def metrics_view(request):
+    """
+    GET /metrics. Exige 'Authorization: Bearer <METRICS_TOKEN>'; só fica
+    aberto sem token com DEBUG ligado. Em produção sem METRICS_TOKEN
+    responde sempre 401.
+    """
+    token = settings.METRICS_TOKEN
+    if not token and not settings.DEBUG:
+        return HttpResponse(status=401)
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse(status=401)
+    metrics = get_metrics()
+    collect_pool_metrics(metrics)
+    return HttpResponse(
+        metrics.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -0,0 +1,74 @@
+"""
+Roteamento de leituras para réplicas (settings.DATABASE_REPLICAS).
+
+Nada vai para uma réplica por padrão: só as leituras feitas dentro de
+replica_reads(alias), ou entre start_replica_reads e end_replica_reads,
+que as ações de leitura pesadas de TaskViewSet abrem quando o usuário não
+escreveu nos últimos READ_YOUR_WRITES_SECONDS (tasks.cache.read_database). O alias fica numa ContextVar, então vale
+para a thread da requisição e para as threads de sync_to_async das views
+assíncronas, que copiam o contexto.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def choose_replica():
+    """
+    Uma das réplicas configuradas, ou None se não houver.
+    """
+    replicas = settings.DATABASE_REPLICAS
+    if not replicas:
+        return None
+    return random.choice(replicas)
+
+
+def start_replica_reads(alias):
+    """
+    A partir daqui as leituras vão para alias (None mantém o default).
+    Devolve o token para end_replica_reads.
+    """
+    return _read_alias.set(alias)
+
+
+def end_replica_reads(token):
+    _read_alias.reset(token)
+
+
+@contextmanager
+def replica_reads(alias):
+    token = start_replica_reads(alias)
+    try:
+        yield alias
+    finally:
+        end_replica_reads(token)
+
+
+class ReadReplicaRouter:
+    """
+    Leituras dentro de replica_reads() vão para a réplica escolhida, exceto
+    dentro de uma transação no default (que precisa ver as próprias
+    escritas); escritas e migrações ficam sempre no default.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas têm os mesmos dados do default
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
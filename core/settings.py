@@ -2,22 +2,9 @@
 Django settings for core project.
 """
 
+import importlib.util
 import os
 import sys
-
-# Debug das variáveis ANTES de tudo
-print("=" * 50)
-print("DJANGO SETTINGS - DEBUG INICIAL")
-print("=" * 50)
-
-# Verificar todas as variáveis relacionadas ao banco
-env_vars = ['DATABASE_URL', 'PGHOST', 'PGDATABASE', 'PGUSER', 'PGPASSWORD', 'PGPORT']
-for var in env_vars:
-    value = os.environ.get(var, 'NOT_FOUND')
-    print(f"{var}: {value}")
-
-print("=" * 50)
-
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,6 +26,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'tasks',
@@ -46,6 +34,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.timing.RequestTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -56,7 +45,10 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'core.urls'
+# DJANGO_ASYNC_VIEWS=true (opcional, só sob ASGI) serve motivacional e
+# diagnostico pelas views assíncronas de tasks.async_views
+ASYNC_VIEWS = os.environ.get('DJANGO_ASYNC_VIEWS', 'false').lower() == 'true'
+ROOT_URLCONF = 'core.urls_async' if ASYNC_VIEWS else 'core.urls'
 
 TEMPLATES = [
     {
@@ -76,22 +68,13 @@ TEMPLATES = [
 WSGI_APPLICATION = 'core.wsgi.application'
 
 # Database - Configuração robusta
-print("CONFIGURANDO DATABASE...")
-
 DATABASE_URL = os.environ.get('DATABASE_URL')
 if DATABASE_URL:
-    print(f"Usando DATABASE_URL: {DATABASE_URL[:50]}...")
     import dj_database_url
     DATABASES = {
         'default': dj_database_url.parse(DATABASE_URL)
     }
-    # Configuração mais flexível para Railway
-    DATABASES['default']['CONN_MAX_AGE'] = 60
-    DATABASES['default']['OPTIONS'] = {
-        'connect_timeout': 30,
-    }
 else:
-    print("DATABASE_URL não encontrada, usando variáveis individuais...")
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.postgresql',
@@ -100,20 +83,73 @@ else:
             'PASSWORD': os.environ.get('PGPASSWORD', ''),
             'HOST': os.environ.get('PGHOST', 'localhost'),
             'PORT': os.environ.get('PGPORT', '5432'),
-            'CONN_MAX_AGE': 60,
-            'OPTIONS': {
-                'connect_timeout': 30,
-            },
         }
     }
 
-print("Configuração final do banco:")
-print(f"ENGINE: {DATABASES['default']['ENGINE']}")
-print(f"NAME: {DATABASES['default']['NAME']}")
-print(f"USER: {DATABASES['default']['USER']}")
-print(f"HOST: {DATABASES['default']['HOST']}")
-print(f"PORT: {DATABASES['default']['PORT']}")
-print("=" * 50)
+# Pool de conexões do psycopg 3 (core/db.py): cada worker mantém entre
+# DB_POOL_MIN_SIZE e DB_POOL_MAX_SIZE conexões abertas e as requisições
+# pegam e devolvem uma delas, sem pagar o handshake a cada vez. Conexões
+# são verificadas antes de entregues (CONN_HEALTH_CHECKS) e renovadas
+# depois de DB_POOL_MAX_LIFETIME segundos. Sem o psycopg_pool instalado,
+# volta às conexões persistentes por thread.
+DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT', 10))
+DB_POOL = (
+    os.environ.get('DB_POOL', 'true').lower() == 'true'
+    and importlib.util.find_spec('psycopg_pool') is not None
+)
+DATABASES['default']['OPTIONS'] = {'connect_timeout': DB_CONNECT_TIMEOUT}
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+if DB_POOL:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+        # Espera máxima por uma conexão livre antes de falhar a requisição
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+        'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', 1800)),
+        'name': 'default',
+    }
+elif ASYNC_VIEWS:
+    # No ASGI cada requisição usa sua própria thread para o ORM; conexões
+    # persistentes ficariam abertas nas threads já descartadas
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = 60
+
+
+def replica_settings(alias, base):
+    """
+    Alias de réplica com as mesmas opções de conexão (e um pool próprio) do
+    default.
+    """
+    replica = {**base, 'OPTIONS': {**DATABASES['default']['OPTIONS']}}
+    for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS'):
+        replica[key] = DATABASES['default'][key]
+    if 'pool' in replica['OPTIONS']:
+        replica['OPTIONS']['pool'] = {**replica['OPTIONS']['pool'], 'name': alias}
+    return replica
+
+
+# Réplicas de leitura (core/routers.py): cada URL de DATABASE_REPLICA_URLS
+# (separadas por vírgula) vira um alias replica1, replica2... As leituras
+# pesadas de TaskViewSet vão para uma delas, exceto nos
+# READ_YOUR_WRITES_SECONDS seguintes a uma escrita do usuário. Para testar
+# localmente, basta apontar uma réplica para o próprio banco.
+DATABASE_REPLICAS = []
+for index, url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(',')), start=1):
+    import dj_database_url
+    DATABASES[f'replica{index}'] = replica_settings(f'replica{index}', dj_database_url.parse(url.strip()))
+    DATABASE_REPLICAS.append(f'replica{index}')
+DATABASE_ROUTERS = ['core.routers.ReadReplicaRouter']
+READ_YOUR_WRITES_SECONDS = float(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
+
+# /health/ready (core/health.py): depois de uma falha, o banco só é testado
+# de novo após um intervalo que dobra a cada falha, até o máximo
+HEALTH_CHECK_TIMEOUT = float(os.environ.get('HEALTH_CHECK_TIMEOUT', 3))
+HEALTH_BACKOFF_BASE = float(os.environ.get('HEALTH_BACKOFF_BASE', 0.5))
+HEALTH_BACKOFF_MAX = float(os.environ.get('HEALTH_BACKOFF_MAX', 30))
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -141,17 +177,120 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# Diretório temporário do host. tempfile.gettempdir() testaria a escrita
+# em disco durante o import dos settings; aqui basta ler o ambiente.
+TMP_DIR = os.environ.get('TMPDIR', '/tmp')
+
+# Cache de respostas por usuário (tasks.cache). Num SQLite local com
+# despejo LRU (core.cache), compartilhado entre os workers do gunicorn no
+# mesmo host: até TASKS_CACHE_MAX_ENTRIES entradas, por TASKS_CACHE_TTL s.
+TASKS_CACHE_DB = os.environ.get(
+    'TASKS_CACHE_DB', os.path.join(TMP_DIR, 'app-tarefas-cache.sqlite3')
+)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'tasks': {
+        'BACKEND': 'core.cache.SQLiteLRUCache',
+        'LOCATION': TASKS_CACHE_DB,
+        'TIMEOUT': int(os.environ.get('TASKS_CACHE_TTL', 300)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('TASKS_CACHE_MAX_ENTRIES', 10000)),
+        },
+    },
+}
+
+# Exportações assíncronas (tasks.export_jobs)
+EXPORT_ROOT = os.environ.get('EXPORT_ROOT', os.path.join(BASE_DIR, 'exports'))
+EXPORT_TTL_SECONDS = int(os.environ.get('EXPORT_TTL_SECONDS', 24 * 60 * 60))
+EXPORT_WORKER_POLL_SECONDS = float(os.environ.get('EXPORT_WORKER_POLL_SECONDS', 2))
+# Jobs em running há mais tempo que isso são retomados por outro worker
+EXPORT_JOB_TIMEOUT_SECONDS = int(os.environ.get('EXPORT_JOB_TIMEOUT_SECONDS', 30 * 60))
+
+# Importação síncrona de CSV (POST /api/tasks/import_csv/): roda dentro
+# da requisição, então o arquivo é limitado para caber no timeout do
+# gunicorn (~1.600 linhas/s; 2 MB são ~20 mil tarefas). Arquivos maiores:
+# manage.py import_tasks
+IMPORT_MAX_UPLOAD_BYTES = int(os.environ.get('IMPORT_MAX_UPLOAD_BYTES', 2 * 1024 * 1024))
+
+# Frases motivacionais (tasks.quotes)
+QUOTES_API_URL = os.environ.get('QUOTES_API_URL', 'https://api.quotable.io/quotes/random')
+QUOTES_API_TIMEOUT = float(os.environ.get('QUOTES_API_TIMEOUT', 5))
+QUOTES_POOL_BATCH_SIZE = int(os.environ.get('QUOTES_POOL_BATCH_SIZE', 20))
+QUOTES_POOL_LOW_WATERMARK = int(os.environ.get('QUOTES_POOL_LOW_WATERMARK', 5))
+QUOTES_BREAKER_THRESHOLD = int(os.environ.get('QUOTES_BREAKER_THRESHOLD', 3))
+QUOTES_BREAKER_COOLDOWN = float(os.environ.get('QUOTES_BREAKER_COOLDOWN', 60))
+
+# Diagnóstico de conectividade (tasks.diagnostics)
+DIAGNOSTICO_TIMEOUT = float(os.environ.get('DIAGNOSTICO_TIMEOUT', 6))
+DIAGNOSTICO_DEADLINE = float(os.environ.get('DIAGNOSTICO_DEADLINE', 8))
+DIAGNOSTICO_CACHE_SECONDS = float(os.environ.get('DIAGNOSTICO_CACHE_SECONDS', 30))
+
+# Medição por requisição (core.timing): fração das requisições que recebe
+# o cabeçalho Server-Timing e limite para registrar consultas lentas
+REQUEST_TIMING_SAMPLE_RATE = float(
+    os.environ.get('REQUEST_TIMING_SAMPLE_RATE', '1.0' if DEBUG else '0.1')
+)
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+
+# Métricas Prometheus (core.metrics), somadas entre workers num SQLite
+METRICS_DB = os.environ.get(
+    'METRICS_DB', os.path.join(TMP_DIR, 'app-tarefas-metrics.sqlite3')
+)
+METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', 1))
+# Obrigatório com DEBUG desligado: sem ele /metrics responde 401
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Limite de uso das ações caras de /api/tasks/ (tasks.throttling): balde de
+# fichas por usuário, compartilhado entre workers num SQLite. Cada usuário
+# acumula até THROTTLE_BURST fichas, recarregadas a THROTTLE_RATE por segundo
+THROTTLE_ENABLED = os.environ.get('THROTTLE_ENABLED', 'True').lower() == 'true'
+THROTTLE_DB = os.environ.get(
+    'THROTTLE_DB', os.path.join(TMP_DIR, 'app-tarefas-throttle.sqlite3')
+)
+THROTTLE_RATE = float(os.environ.get('THROTTLE_RATE', 1))
+THROTTLE_BURST = float(os.environ.get('THROTTLE_BURST', 60))
+THROTTLE_COSTS = {
+    'export_csv': float(os.environ.get('THROTTLE_COST_EXPORT', 20)),
+    'import_csv': float(os.environ.get('THROTTLE_COST_IMPORT', 20)),
+    'diagnostico': float(os.environ.get('THROTTLE_COST_DIAGNOSTICO', 10)),
+    'search': float(os.environ.get('THROTTLE_COST_SEARCH', 10)),
+    'statistics': float(os.environ.get('THROTTLE_COST_STATISTICS', 5)),
+}
+# Custo de search com termo, filtros ou paginação e de statistics sem filtros
+THROTTLE_BOUNDED_COST = float(os.environ.get('THROTTLE_BOUNDED_COST', 1))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {'format': '%(asctime)s %(levelname)s %(name)s: %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'simple'},
+    },
+    'loggers': {
+        'core': {'handlers': ['console'], 'level': os.environ.get('LOG_LEVEL', 'INFO')},
+        'tasks': {'handlers': ['console'], 'level': os.environ.get('LOG_LEVEL', 'INFO')},
+    },
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'tasks.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'tasks.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 # JWT Configuration
@@ -163,6 +302,13 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
 }
 
+# Usuários autenticados por JWT ficam num LRU por processo
+# (tasks.authentication), validado a cada requisição pela versão do usuário
+# no cache 'tasks': até AUTH_USER_CACHE_SIZE usuários, por
+# AUTH_USER_CACHE_TTL segundos; 0 desativa
+AUTH_USER_CACHE_SIZE = int(os.environ.get('AUTH_USER_CACHE_SIZE', 1024))
+AUTH_USER_CACHE_TTL = float(os.environ.get('AUTH_USER_CACHE_TTL', 30))
+
 
 # CORS Configuration - Funcionará em qualquer modo (DEBUG=True ou False)
 CORS_ALLOWED_ORIGINS = [
@@ -195,4 +341,33 @@ CORS_ALLOWED_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
-]
\ No newline at end of file
+]
+
+
+# manage.py test: nada compartilhado com o servidor ou com execuções
+# anteriores. Os testes que precisam de outro valor usam override_settings.
+if 'test' in sys.argv:
+    # Espelho do default, para os testes do roteamento (que ativam
+    # DATABASE_REPLICAS com override_settings). Sem pool: o runner não
+    # fecha pools de espelhos, e as conexões abertas impediriam apagar o
+    # banco de teste.
+    if not DATABASE_REPLICAS:
+        DATABASES['replica1'] = replica_settings(
+            'replica1', {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+        )
+        DATABASES['replica1']['OPTIONS'].pop('pool', None)
+
+    # Cache de respostas em memória, vazio a cada execução
+    CACHES['tasks'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tasks-test',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+
+    # SQLites por processo
+    METRICS_DB = os.path.join(TMP_DIR, f'app-tarefas-metrics-test-{os.getpid()}.sqlite3')
+    THROTTLE_DB = os.path.join(TMP_DIR, f'app-tarefas-throttle-test-{os.getpid()}.sqlite3')
+
+    # Limite de uso desligado, exceto nos testes que o ligam
+    THROTTLE_ENABLED = False
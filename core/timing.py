@@ -0,0 +1,201 @@
+"""
+Medição de tempo por requisição: banco, serialização e renderização.
+
+Um execute_wrapper (QueryTimer) fica instalado em cada conexão e soma tempo
+e quantidade de consultas na requisição atual (ContextVar, que acompanha
+também as threads de sync_to_async das views assíncronas), e registra como
+WARNING toda consulta acima de SLOW_QUERY_MS. As fases de serialização e
+renderização são marcadas com timed(). Nas requisições sorteadas por
+REQUEST_TIMING_SAMPLE_RATE, os tempos vão no cabeçalho Server-Timing.
+Todas as requisições entram nas métricas de core.metrics.
+"""
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .metrics import observe_request
+
+
+logger = logging.getLogger(__name__)
+
+_current_timing = ContextVar('request_timing', default=None)
+
+SQL_LOG_LIMIT = 2000
+
+
+class RequestTiming:
+    """
+    Tempos acumulados de uma requisição. As fases (timed) descontam o tempo
+    de banco gasto dentro delas, então db, fases e app não se sobrepõem.
+    """
+
+    def __init__(self, request, sampled):
+        self.request = request
+        self.sampled = sampled
+        self.start = time.perf_counter()
+        self.db_count = 0
+        self.db_time = 0.0
+        self.phases = {}
+        self._action = None
+
+    @property
+    def action(self):
+        """
+        Ação atendida, conhecida depois da resolução da URL.
+        """
+        if self._action is None:
+            match = getattr(self.request, 'resolver_match', None)
+            if match is not None:
+                self._action = view_action(self.request, match.func)
+        return self._action
+
+    def add_phase(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def server_timing(self):
+        total = time.perf_counter() - self.start
+        app = max(0.0, total - self.db_time - sum(self.phases.values()))
+        entries = [f'db;dur={self.db_time * 1000:.1f};desc="{self.db_count} queries"']
+        entries += [f'{phase};dur={seconds * 1000:.1f}' for phase, seconds in self.phases.items()]
+        entries.append(f'app;dur={app * 1000:.1f}')
+        total_entry = f'total;dur={total * 1000:.1f}'
+        if self.action:
+            total_entry += f';desc="{self.action}"'
+        entries.append(total_entry)
+        return ', '.join(entries)
+
+
+class QueryTimer:
+    """
+    execute_wrapper que soma as consultas na RequestTiming atual e registra
+    as lentas com o SQL (sem os parâmetros) e a ação que as executou. Fora
+    de uma requisição só executa a consulta.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        timing = _current_timing.get()
+        if timing is None:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            timing.db_count += 1
+            timing.db_time += elapsed
+            slow_query_ms = settings.SLOW_QUERY_MS
+            if slow_query_ms is not None and elapsed * 1000 >= slow_query_ms:
+                logger.warning(
+                    'Consulta lenta (%.1f ms, %s) em %s: %s',
+                    elapsed * 1000, self.alias, timing.action or '-', sql[:SQL_LOG_LIMIT]
+                )
+
+
+def install_query_timer(connection, **kwargs):
+    """
+    Garante um QueryTimer na conexão (uma vez por objeto de conexão).
+    """
+    if not any(isinstance(wrapper, QueryTimer) for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.append(QueryTimer(connection.alias))
+
+
+# Conexões abertas depois da carga do módulo, em qualquer thread
+connection_created.connect(install_query_timer)
+
+
+@contextmanager
+def timed(phase):
+    """
+    Marca uma fase (ex.: 'serialize', 'render') da requisição atual. Fora
+    de uma requisição sorteada não mede nada.
+    """
+    timing = _current_timing.get()
+    if timing is None or not timing.sampled:
+        yield
+        return
+    start = time.perf_counter()
+    db_start = timing.db_time
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start - (timing.db_time - db_start)
+        timing.add_phase(phase, elapsed)
+
+
+def view_action(request, view_func):
+    """
+    Nome da ação atendida: 'TaskViewSet.list' para viewsets do DRF, o
+    action_name declarado pela view, ou o nome da função da view.
+    """
+    if getattr(view_func, 'action_name', None):
+        return view_func.action_name
+    actions = getattr(view_func, 'actions', None)
+    cls = getattr(view_func, 'cls', None)
+    if actions and cls is not None:
+        return f'{cls.__name__}.{actions.get(request.method.lower(), request.method.lower())}'
+    return getattr(view_func, '__name__', None)
+
+
+class RequestTimingMiddleware:
+    """
+    Mede cada requisição e, se sorteada, adiciona o cabeçalho Server-Timing.
+
+    Funciona nos modos síncrono (WSGI) e assíncrono (ASGI), sem trocar de
+    thread. Respostas em streaming saem do middleware antes do corpo ser
+    gerado; as consultas feitas durante o streaming não entram na conta.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timing, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timing.reset(token)
+        return self.finish(request, response, timing)
+
+    async def __acall__(self, request):
+        timing, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timing.reset(token)
+        return self.finish(request, response, timing)
+
+    def start(self, request):
+        sample_rate = settings.REQUEST_TIMING_SAMPLE_RATE
+        timing = RequestTiming(request, sampled=sample_rate >= 1 or random.random() < sample_rate)
+        # Conexões desta thread criadas antes da carga do módulo
+        for alias in connections:
+            install_query_timer(connections[alias])
+        return timing, _current_timing.set(timing)
+
+    def finish(self, request, response, timing):
+        observe_request(timing, request.method, response.status_code)
+        if timing.sampled:
+            header = timing.server_timing()
+            response['Server-Timing'] = header
+            # Sem isso o navegador esconde Server-Timing de outras origens
+            allowed_origin = response.get('Access-Control-Allow-Origin')
+            if allowed_origin:
+                response['Timing-Allow-Origin'] = allowed_origin
+            logger.debug('%s %s %s %s', request.method, request.path, response.status_code, header)
+        return response
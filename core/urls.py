@@ -23,12 +23,17 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
     TokenVerifyView, 
 )
+from core.health import live_view, ready_view
+from core.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/token/verify/', TokenVerifyView.as_view(), name='token_verify'), 
+    path('metrics', metrics_view, name='metrics'),
+    path('health/live', live_view, name='health_live'),
+    path('health/ready', ready_view, name='health_ready'),
     path('', include('tasks.urls')),
 ]
 
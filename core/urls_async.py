@@ -0,0 +1,16 @@
+"""
+URLs do modo ASGI: motivacional e diagnostico pelas views assíncronas de
+tasks.async_views, na frente das rotas de core.urls, que continuam
+atendendo todo o resto.
+
+Ativado por DJANGO_ASYNC_VIEWS=true.
+"""
+from django.urls import path
+
+from core.urls import urlpatterns as sync_urlpatterns
+from tasks import async_views
+
+urlpatterns = [
+    path('api/tasks/motivacional/', async_views.task_motivacional),
+    path('api/tasks/diagnostico/', async_views.task_diagnostico),
+] + sync_urlpatterns
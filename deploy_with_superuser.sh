@@ -5,7 +5,7 @@ echo "=================================="
 
 # Aguardar banco estar pronto
 echo "⏳ Aguardando banco PostgreSQL..."
-python wake_db.py
+python manage.py wait_for_db
 
 # Executar migrações
 echo "📦 Executando migrações..."
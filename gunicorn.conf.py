@@ -0,0 +1,32 @@
+"""
+Configuração do gunicorn (lida automaticamente a partir da raiz do projeto).
+
+Com preload_app a aplicação Django é carregada uma vez no master e os
+workers são criados por fork já com settings, apps, URLconf e views
+importados (ver core/boot.py). Migrações e criação do admin rodam na fase
+de release (Procfile), não a cada boot.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+accesslog = '-'
+
+
+def post_fork(server, worker):
+    # Nada do master pode ser herdado pelos workers: conexões com o banco
+    # e o store de métricas (contadores pendentes seriam somados em dobro).
+    # O pool de conexões (core/db.py) só nasce na primeira consulta, já no
+    # worker.
+    if not server.cfg.preload_app:
+        return
+    from django.db import connections
+
+    from core.metrics import reset_metrics
+
+    connections.close_all()
+    reset_metrics()
@@ -1,33 +1,15 @@
 #!/bin/bash
+# Boot do container: só o que precisa rodar a cada início. Migrações e a
+# criação do admin ficam na fase de release (Procfile / preDeployCommand).
+set -e
 
-echo "=== RAILWAY DEPLOY DEBUG ==="
-echo "Starting deployment..."
-
-# Debug das variáveis de ambiente
-echo "=== CHECKING ENVIRONMENT VARIABLES ==="
-python debug_env.py
-
-echo "=== RUNNING DJANGO COMMANDS ==="
-
-# Aguardar um pouco e depois tentar acordar o banco
-echo "Waking up database..."
-python wake_db.py
-
-if [ $? -ne 0 ]; then
-    echo "❌ Failed to wake database, trying anyway..."
+if [ "$RUN_MIGRATIONS_ON_BOOT" = "true" ]; then
+    echo "Running migrations..."
+    python manage.py migrate --noinput
 fi
 
-# Aplicar migrações com timeout
-echo "Running migrations with timeout..."
-timeout 180 python manage.py migrate || {
-    echo "❌ Migration failed or timed out"
-    exit 1
-}
-
-# Coletar arquivos estáticos
-echo "Collecting static files..."
-python manage.py collectstatic --noinput
+# collectstatic não acessa o banco e pula arquivos inalterados
+python manage.py collectstatic --noinput -v 0
 
-# Iniciar servidor
 echo "Starting server on 0.0.0.0:$PORT"
-python manage.py runserver 0.0.0.0:$PORT 
\ No newline at end of file
+exec gunicorn core.wsgi:application --config gunicorn.conf.py
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""
+Versões assíncronas de motivacional e diagnostico, servidas via ASGI.
+
+As duas passam a maior parte do tempo esperando serviços externos; com
+clientes HTTP assíncronos (httpx), essa espera não prende uma thread do
+worker. As leituras de banco (list, search, statistics) continuam nas
+views síncronas do TaskViewSet: com o ORM assíncrono, que roda cada
+consulta numa thread, elas tinham de 0,37 a 0,50x da vazão do WSGI no
+bench_asgi.
+
+Só a ação é uma corrotina. Autenticação, permissões, limite de uso,
+negociação de conteúdo, formato dos erros e cabeçalhos vêm do próprio
+pipeline do DRF (initialize_request, initial, handle_exception,
+finalize_response) herdado do TaskViewSet.
+
+As rotas ficam em core/urls_async.py, ativado por DJANGO_ASYNC_VIEWS=true.
+"""
+import inspect
+
+from asgiref.sync import sync_to_async
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .views import TaskViewSet
+
+
+class AsyncTaskViewSet(TaskViewSet):
+    """
+    TaskViewSet com as ações de rede em corrotinas e um dispatch que as
+    aguarda. Nenhuma delas lê o banco, então nenhuma está em
+    REPLICA_ACTIONS.
+    """
+
+    @action(detail=False, methods=['get'])
+    async def motivacional(self, request):
+        """
+        Retorna uma frase motivacional aleatória da API Quotable.
+
+        Com o pool vazio, o reabastecimento roda no event loop (arefill).
+        """
+        from .quotes import get_quote_pool, quote_data
+
+        quote, from_pool = await get_quote_pool().aget()
+        return Response(quote_data(quote, from_pool))
+
+    @action(detail=False, methods=['get'], url_path='diagnostico')
+    async def diagnostico(self, request):
+        """
+        Endpoint de diagnóstico: testa conexões HTTPS para vários domínios e retorna status.
+        """
+        from .diagnostics import arun_diagnostics, diagnostico_data
+
+        resultados, em_cache = await arun_diagnostics()
+        return Response(diagnostico_data(resultados, em_cache))
+
+    async def adispatch(self, request, *args, **kwargs):
+        """
+        APIView.dispatch aguardando o handler. initial() autentica (o que
+        pode consultar o banco) e consome o limite de uso, então roda em
+        sync_to_async.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def async_task_view(action_name):
+    """
+    View assíncrona para uma ação de AsyncTaskViewSet, montada como
+    ViewSetMixin.as_view monta as síncronas (GET e HEAD para a ação).
+    """
+    actions = {'get': action_name, 'head': action_name}
+
+    @csrf_exempt
+    async def view(request, *args, **kwargs):
+        self = AsyncTaskViewSet(basename='task', detail=False)
+        self.action_map = actions
+        for method, name in actions.items():
+            setattr(self, method, getattr(self, name))
+        return await self.adispatch(request, *args, **kwargs)
+
+    view.cls = AsyncTaskViewSet
+    view.actions = actions
+    view.initkwargs = {'basename': 'task', 'detail': False}
+    view.action_name = f'TaskViewSet.{action_name}'
+    return view
+
+
+task_motivacional = async_task_view('motivacional')
+task_diagnostico = async_task_view('diagnostico')
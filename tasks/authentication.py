@@ -0,0 +1,148 @@
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import get_cache
+
+
+class UserCache:
+    """
+    LRU limitado de usuários por id, com validade de ttl segundos. Os ids
+    são comparados como texto (o claim do token pode vir como string).
+
+    Fica na memória do processo. Cada entrada guarda a versão do usuário
+    com que foi gravada (get_user_version); get() com outra versão é um
+    miss, o que invalida a entrada em todos os workers assim que uma
+    alteração troca a versão no cache compartilhado.
+    """
+
+    def __init__(self, maxsize=1024, ttl=30, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, version=None):
+        user_id = str(user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, entry_version, expires_at = entry
+            if entry_version != version or self.clock() >= expires_at:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, user, version=None):
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        user_id = str(user_id)
+        with self._lock:
+            self._entries[user_id] = (user, version, self.clock() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def user_version_key(user_id):
+    return f'tasks:authver:{user_id}'
+
+
+def get_user_version(user_id):
+    """
+    Versão do usuário no cache compartilhado pelos workers (settings
+    CACHES['tasks']), trocada a cada alteração dele (bump_user_version).
+
+    Nunca é None: se a chave sumiu (LRU), uma versão nova é criada, então
+    uma entrada gravada antes da troca não volta a valer.
+    """
+    cache = get_cache()
+    key = user_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        # DummyCache não guarda nada: uma versão nova nunca dá hit
+        version = cache.get(key) or uuid.uuid4().hex
+    return version
+
+
+def bump_user_version(user_id):
+    get_cache().set(user_version_key(user_id), uuid.uuid4().hex, timeout=None)
+
+
+_user_cache = None
+_user_cache_lock = threading.Lock()
+
+
+def get_user_cache():
+    global _user_cache
+    if _user_cache is None:
+        with _user_cache_lock:
+            if _user_cache is None:
+                _user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL)
+    return _user_cache
+
+
+def reset_user_cache():
+    global _user_cache
+    with _user_cache_lock:
+        _user_cache = None
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication sem o SELECT do usuário a cada requisição: o usuário
+    do token vem de get_user_cache() e só é buscado no banco na primeira
+    vez (ou depois que a entrada vence ou a versão do usuário muda). A
+    versão é lida do cache compartilhado a cada requisição, uma consulta
+    local bem mais barata que o SELECT no banco.
+
+    As verificações do simplejwt (usuário ativo, senha trocada com
+    CHECK_REVOKE_TOKEN) continuam valendo para o usuário do cache. Cada
+    requisição recebe uma cópia, para nada do que uma view guardar no
+    objeto vazar para outra.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        cache = get_user_cache()
+        version = get_user_version(user_id)
+        user = cache.get(user_id, version)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(user_id, user, version)
+            return copy.copy(user)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        return copy.copy(user)
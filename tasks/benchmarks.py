@@ -0,0 +1,344 @@
+import asyncio
+import json
+import threading
+import time
+import tracemalloc
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.contrib.auth.models import User
+from django.db import connection, connections
+from django.db.models import DateTimeField, ExpressionWrapper, F, Value
+from django.db.models.functions import Now
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .cache import generation_key, get_cache
+from .models import Task
+from .stats import rebuild_user_stats
+
+
+BENCH_USER_PREFIX = '__bench_'
+SEARCH_WORDS = ('relatório', 'reunião', 'projeto', 'estudar', 'compras', 'academia')
+
+# Consultas por requisição (sem cache de respostas), contando SAVEPOINTs
+# das escritas aninhadas (create grava as linhas diária e horária).
+# TaskQueryBudgetTestCase falha quando um cenário passa do limite.
+QUERY_BUDGETS = {
+    'list': 2,
+    'list_filtered': 2,
+    'search': 2,
+    'statistics': 3,
+    'export_csv': 2,
+    'create': 7,
+    'update': 7,
+}
+
+
+def scenario_requests(task_id):
+    """
+    Requisições de cada cenário para um usuário: (método, url, corpo).
+    """
+    return {
+        'list': ('get', '/api/tasks/', {'page_size': 50}),
+        'list_filtered': ('get', '/api/tasks/', {'status': 'pending', 'ordering': 'title', 'page_size': 50}),
+        'search': ('get', '/api/tasks/search/', {'q': 'projeto', 'page_size': 50}),
+        'statistics': ('get', '/api/tasks/statistics/', {}),
+        'export_csv': ('get', '/api/tasks/export_csv/', {}),
+        'create': ('post', '/api/tasks/', {'title': 'Nova tarefa do benchmark'}),
+        'update': ('patch', f'/api/tasks/{task_id}/', {'status': 'completed'}),
+    }
+
+
+def seed_dataset(users, tasks_per_user, batch_size=5000, first=0):
+    """
+    Cria usuários e tarefas de benchmark com datas espalhadas pelos últimos
+    90 dias. Retorna a lista de usuários criados. first é o número do
+    primeiro usuário, para gerar grupos com tamanhos diferentes.
+    """
+    created = User.objects.bulk_create(
+        User(username=f'{BENCH_USER_PREFIX}{index:05d}') for index in range(first, first + users)
+    )
+    batch = []
+    for user in created:
+        for index in range(tasks_per_user):
+            batch.append(Task(
+                title=f'{SEARCH_WORDS[index % len(SEARCH_WORDS)]} {index}',
+                description=f'Descrição {index} da tarefa de benchmark',
+                status='completed' if index % 3 == 0 else 'pending',
+                user=user,
+            ))
+            if len(batch) >= batch_size:
+                Task.objects.bulk_create(batch)
+                batch = []
+    if batch:
+        Task.objects.bulk_create(batch)
+
+    # auto_now_add ignora created_at no bulk_create; espalha depois
+    Task.objects.filter(user__in=created).update(created_at=ExpressionWrapper(
+        Now() - (F('id') % 90) * Value(timedelta(days=1)),
+        output_field=DateTimeField(),
+    ))
+    return created
+
+
+def percentile(sorted_values, fraction):
+    """
+    Percentil por posição mais próxima de uma lista já ordenada.
+    """
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def consume(response):
+    """
+    Lê o corpo inteiro, inclusive de respostas em streaming.
+    """
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def run_scenario(client, users, name, iterations, cached=False, auth='force'):
+    """
+    Executa um cenário alternando entre os usuários e mede latência,
+    consultas por requisição e pico de memória (tracemalloc, numa
+    requisição extra, para não distorcer as latências). Sem cached, as
+    respostas do usuário saem do cache antes de cada requisição (só a
+    geração dele: a versão usada pelo cache de usuários fica).
+
+    auth='force' autentica pelo force_authenticate do cliente de teste;
+    auth='jwt' manda um access token no header, como um cliente real, e
+    inclui no custo a autenticação (com o cache de usuários).
+    """
+    targets = []
+    for user in users:
+        task_id = Task.objects.filter(user=user).values_list('pk', flat=True).first()
+        token = str(RefreshToken.for_user(user).access_token) if auth == 'jwt' else None
+        targets.append((user, token, scenario_requests(task_id)[name]))
+
+    def send(index):
+        user, token, (method, url, data) = targets[index % len(targets)]
+        if token:
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        else:
+            client.force_authenticate(user=user)
+        if not cached:
+            get_cache().delete(generation_key(user.pk))
+        response = getattr(client, method)(url, data)
+        consume(response)
+        return response
+
+    # Aquecimento por usuário: caches por processo (ex.: detecção do
+    # pg_trgm) e a primeira linha diária do dia nas escritas
+    for index in range(len(targets)):
+        send(index)
+
+    latencies = []
+    queries = []
+    statuses = {}
+    for index in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = send(index)
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(len(captured.captured_queries))
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    tracemalloc.start()
+    send(iterations)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'requests': iterations,
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'queries_max': max(queries),
+        'queries_mean': round(sum(queries) / len(queries), 2),
+        'query_budget': QUERY_BUDGETS.get(name),
+        'peak_memory_kb': round(peak / 1024, 1),
+        'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+def prepare_users(users):
+    """
+    Cria os contadores dos usuários medidos, para a primeira leitura não
+    pagar a reconstrução.
+    """
+    for user in users:
+        rebuild_user_stats(user.pk)
+
+
+class SlowUpstream:
+    """
+    Servidor HTTP local que responde depois de delay segundos, para simular
+    um serviço externo lento (diagnostico, frases) sem depender da rede.
+    """
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def __enter__(self):
+        delay = self.delay
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(delay)
+                body = json.dumps({'ok': True}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(percentile(latencies, 0.50), 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95), 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99), 2) if latencies else None,
+    }
+
+
+def run_wsgi(request_list, concurrency, close_connections):
+    """
+    Dispara as requisições pelo handler WSGI (django.test.Client) com
+    concurrency threads, como os workers com threads do gunicorn.
+    """
+    from django.test import Client
+
+    pending = list(enumerate(request_list))
+    lock = threading.Lock()
+    latencies = []
+    errors = [0]
+
+    def worker():
+        client = Client()
+        try:
+            while True:
+                with lock:
+                    if not pending:
+                        return
+                    _, (url, headers) = pending.pop()
+                start = time.perf_counter()
+                response = client.get(url, headers=headers)
+                consume(response)
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    latencies.append(elapsed)
+                    if response.status_code >= 400:
+                        errors[0] += 1
+                if close_connections:
+                    connections.close_all()
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, errors[0], time.perf_counter() - start)
+
+
+def run_flood(request_list, concurrency, flood, flood_threads, close_connections, warmup=0):
+    """
+    run_wsgi enquanto flood_threads threads repetem sem parar a requisição
+    flood (url, headers), como um cliente abusivo. As medições começam
+    warmup segundos depois do início da repetição (regime contínuo, não o
+    começo). Devolve o resumo das requisições de request_list e, em
+    'flood', as repetições por status durante a medição.
+    """
+    from django.test import Client
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    statuses = {}
+
+    def flooder():
+        client = Client()
+        try:
+            while not stop.is_set():
+                response = client.get(flood[0], headers=flood[1])
+                consume(response)
+                with lock:
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if close_connections:
+                    connections.close_all()
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=flooder) for _ in range(flood_threads)]
+    for thread in threads:
+        thread.start()
+    try:
+        time.sleep(warmup)
+        with lock:
+            statuses.clear()
+        result = run_wsgi(request_list, concurrency, close_connections)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    result['flood'] = {str(code): count for code, count in sorted(statuses.items())}
+    return result
+
+
+def run_asgi(request_list, concurrency):
+    """
+    Dispara as requisições pelo handler ASGI (django.test.AsyncClient) com
+    concurrency corrotinas. Cada requisição ganha seu ThreadSensitiveContext,
+    como no ASGIHandler, e fecha a conexão da sua thread no fim.
+    """
+    from asgiref.sync import ThreadSensitiveContext, sync_to_async
+    from django.test import AsyncClient
+
+    async def main():
+        pending = list(request_list)
+        latencies = []
+        errors = 0
+
+        async def worker():
+            nonlocal errors
+            client = AsyncClient()
+            while pending:
+                url, headers = pending.pop()
+                async with ThreadSensitiveContext():
+                    start = time.perf_counter()
+                    response = await client.get(url, headers=headers)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    await sync_to_async(connections.close_all)()
+                if response.status_code >= 400:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return summarize(latencies, errors, time.perf_counter() - start)
+
+    return asyncio.run(main())
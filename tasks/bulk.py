@@ -0,0 +1,141 @@
+from datetime import timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .events import (
+    apply_completion, creation_events, record_bulk_transition, record_events,
+    stamp_completed_on_creation, task_event,
+)
+
+from .filters import apply_task_filters
+from .models import Task
+from .serializers import TaskSerializer, TaskUpdateSerializer
+from .stats import StatsDelta
+
+
+# Limite de itens por requisição de escrita em lote
+BULK_MAX_ITEMS = 1000
+
+
+def validate_items(serializer_class, items, **kwargs):
+    """
+    Valida os itens com o serializer em modo many e devolve
+    (dados validados dos itens válidos, índices válidos, erros por item).
+    """
+    serializer = serializer_class(data=items, many=True, **kwargs)
+    if serializer.is_valid():
+        return serializer.validated_data, list(range(len(items))), []
+
+    valid_indexes = [index for index, errors in enumerate(serializer.errors) if not errors]
+    errors = [
+        {'index': index, 'errors': item_errors}
+        for index, item_errors in enumerate(serializer.errors)
+        if item_errors
+    ]
+    # Só os itens sem erro: a segunda validação não pode falhar
+    valid = serializer_class(data=[items[index] for index in valid_indexes], many=True, **kwargs)
+    valid.is_valid(raise_exception=True)
+    return valid.validated_data, valid_indexes, errors
+
+
+def bulk_create_tasks(user, items):
+    """
+    Cria as tarefas válidas com um único bulk_create.
+
+    Devolve (tarefas criadas, erros por item).
+    """
+    validated, _, errors = validate_items(TaskSerializer, items)
+    tasks = [Task(user=user, **data) for data in validated]
+    with transaction.atomic():
+        Task.objects.bulk_create(tasks)
+        stamp_completed_on_creation(tasks)
+        # bulk_create não dispara post_save: atualiza os contadores e o log aqui
+        delta = StatsDelta()
+        events = []
+        for task in tasks:
+            delta.created(task)
+            events.extend(creation_events(task))
+        delta.apply()
+        record_events(events)
+    return tasks, errors
+
+
+def bulk_update_tasks(user, items):
+    """
+    Aplica atualizações parciais ({"id": ..., campos}) com um único bulk_update.
+
+    Devolve (tarefas atualizadas, erros por item).
+    """
+    validated, valid_indexes, errors = validate_items(TaskUpdateSerializer, items, partial=True)
+
+    with transaction.atomic():
+        ids = [items[index].get('id') for index in valid_indexes]
+        tasks = Task.objects.select_for_update().filter(
+            user=user, pk__in=[pk for pk in ids if type(pk) is int]
+        ).in_bulk()
+
+        updated, fields, events = [], set(), []
+        now = timezone.now()
+        delta = StatsDelta()
+        for index, pk, data in zip(valid_indexes, ids, validated):
+            task = tasks.get(pk) if type(pk) is int else None
+            if task is None:
+                errors.append({'index': index, 'errors': {'id': ['Tarefa não encontrada.']}})
+                continue
+            old_status, old_completed_at = task.status, task.completed_at
+            for field, value in data.items():
+                setattr(task, field, value)
+            fields.update(data)
+            transition = apply_completion(task, old_status, now)
+            if transition:
+                fields.add('completed_at')
+                events.append(task_event(task, transition, now))
+            delta.status_changed(task, old_status, old_completed_at)
+            updated.append(task)
+
+        if updated and fields:
+            Task.objects.bulk_update(updated, sorted(fields))
+        delta.apply()
+        record_events(events)
+
+    errors.sort(key=lambda error: error['index'])
+    return updated, errors
+
+
+def bulk_set_status(user, filters, new_status):
+    """
+    Muda o status de todas as tarefas do usuário que casam com os filtros,
+    com um único UPDATE no banco. Devolve quantas tarefas mudaram.
+    """
+    queryset = apply_task_filters(Task.objects.filter(user=user), filters)
+    changing = queryset.exclude(status=new_status).order_by()
+
+    now = timezone.now()
+    with transaction.atomic():
+        # Quantas tarefas mudam, por hora de criação, hora da conclusão e status anterior
+        moved = (
+            changing.annotate(
+                hour=TruncHour('created_at', tzinfo=dt_timezone.utc),
+                completed_hour=TruncHour('completed_at', tzinfo=dt_timezone.utc),
+            )
+            .values('hour', 'completed_hour', 'status')
+            .annotate(count=Count('id'))
+        )
+        delta = StatsDelta()
+        for row in moved:
+            delta.status_moved(user.pk, row['hour'], row['status'], new_status, row['count'])
+            if row['status'] == 'completed' and row['completed_hour']:
+                delta.completions_moved(user.pk, row['completed_hour'], -row['count'])
+            if new_status == 'completed':
+                delta.completions_moved(user.pk, now, row['count'])
+
+        kind = 'completed' if new_status == 'completed' else 'reopened'
+        record_bulk_transition(changing, user.pk, kind, now)
+        updated = changing.update(
+            status=new_status, completed_at=now if new_status == 'completed' else None
+        )
+        delta.apply()
+    return updated
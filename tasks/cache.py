@@ -0,0 +1,132 @@
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from core.metrics import get_metrics
+from core.routers import choose_replica
+
+from .filters import depends_on_today, parse_timezone_param
+
+
+CACHE_ALIAS = 'tasks'
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def generation_key(user_id):
+    return f'tasks:gen:{user_id}'
+
+
+def get_generation(user_id):
+    """
+    Geração atual do cache do usuário: um token trocado a cada escrita.
+
+    As respostas são guardadas sob a geração em que foram calculadas, então
+    trocar o token invalida exatamente as entradas desse usuário; as
+    antigas deixam de ser alcançáveis e saem por LRU/TTL.
+    """
+    cache = get_cache()
+    key = generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        # DummyCache não guarda nada: uma geração nova nunca dá hit
+        generation = cache.get(key) or uuid.uuid4().hex
+    return generation
+
+
+def invalidate_user_cache(user_id):
+    """
+    Troca a geração do usuário agora e de novo depois do commit.
+
+    A segunda troca descarta o que uma leitura concorrente tenha guardado
+    com os dados de antes do commit.
+    """
+    def bump():
+        get_cache().set(generation_key(user_id), uuid.uuid4().hex, timeout=None)
+    bump()
+    transaction.on_commit(bump)
+
+
+def pin_key(user_id):
+    return f'tasks:pin:{user_id}'
+
+
+def pin_to_primary(user_id):
+    """
+    Mantém as leituras do usuário no banco principal pelos próximos
+    READ_YOUR_WRITES_SECONDS, para ele ver as próprias escritas mesmo com
+    a réplica atrasada. Fica no cache para valer entre os workers.
+    """
+    if settings.DATABASE_REPLICAS:
+        get_cache().set(pin_key(user_id), 1, timeout=settings.READ_YOUR_WRITES_SECONDS)
+
+
+def read_database(user_id):
+    """
+    Réplica para as leituras pesadas do usuário, ou None (banco principal)
+    sem réplicas ou logo depois de uma escrita dele.
+    """
+    if not settings.DATABASE_REPLICAS or get_cache().get(pin_key(user_id)) is not None:
+        return None
+    return choose_replica()
+
+
+def request_today(request):
+    """
+    Data de hoje no fuso pedido em ?tz=, ou no fuso do projeto.
+    """
+    return timezone.localdate(timezone=parse_timezone_param(request.query_params.get('tz')))
+
+
+def is_daily(request, daily):
+    """
+    daily da ação, ou True se os parâmetros fazem o resultado depender do
+    dia (filtro ou ordenação por prioridade).
+    """
+    return daily or depends_on_today(request.query_params)
+
+
+def response_key(request, action, daily=False):
+    """
+    Chave da resposta: usuário, geração, ação e query string normalizada.
+    """
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    parts = [str(request.user.pk), get_generation(request.user.pk), action, repr(params)]
+    if is_daily(request, daily):
+        parts.append(request_today(request).isoformat())
+    digest = hashlib.sha256('|'.join(parts).encode()).hexdigest()
+    return f'tasks:resp:{digest}'
+
+
+def record_lookup(hit):
+    """
+    Conta hits e misses em tasks_cache_lookups_total (core.metrics), que
+    soma os incrementos de todos os workers sem perder nenhum.
+    """
+    get_metrics().inc('tasks_cache_lookups_total', {'result': 'hit' if hit else 'miss'})
+
+
+def cache_stats():
+    counts = {'hit': 0, 'miss': 0}
+    for (name, labels), value in get_metrics().samples().items():
+        if name == 'tasks_cache_lookups_total':
+            counts[json.loads(labels)['result']] += int(value)
+    hits, misses = counts['hit'], counts['miss']
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
@@ -0,0 +1,114 @@
+import hashlib
+from functools import wraps
+
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache import get_cache, is_daily, record_lookup, request_today, response_key
+from .models import UserTaskStats
+from .stats import rebuild_user_stats
+
+
+def load_task_stats(user):
+    """
+    Linha de UserTaskStats do usuário, reconstruída se ainda não existir.
+
+    Lida sempre do banco principal, mesmo com as leituras da ação já na
+    réplica (TaskViewSet.initial): uma versão atrasada geraria ETags e
+    entradas de cache para dados antigos, e uma réplica que ainda não
+    recebeu a linha faria a reconstrução se repetir a cada requisição.
+    """
+    stats = UserTaskStats.objects.using(DEFAULT_DB_ALIAS).filter(user=user).first()
+    if stats is None:
+        stats = rebuild_user_stats(user.pk)
+    return stats
+
+
+def task_etag(request, action, version, daily=False):
+    """
+    ETag forte para uma leitura: usuário, versão, ação e query string
+    normalizada. Com daily=True inclui a data de hoje (no fuso de ?tz=, se
+    houver), para respostas que mudam com o passar dos dias (estatísticas,
+    dias desde a criação); o mesmo vale para filtro e ordenação por
+    prioridade.
+    """
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    parts = [str(request.user.pk), str(version), action, repr(params)]
+    if is_daily(request, daily):
+        parts.append(request_today(request).isoformat())
+    digest = hashlib.sha256('|'.join(parts).encode()).hexdigest()[:32]
+    return quote_etag(digest)
+
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag in etags or etag.strip('"') in etags
+
+
+def conditional_headers(etag):
+    return {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+
+
+def lookup_cached_response(request, action, daily=False):
+    """
+    Procura a resposta no cache de respostas: devolve (chave, (etag, dados))
+    ou (chave, None), contando o hit ou miss.
+    """
+    key = response_key(request, action, daily=daily)
+    cached = get_cache().get(key)
+    record_lookup(cached is not None)
+    return key, cached
+
+
+def store_cached_response(key, etag, data):
+    get_cache().set(key, (etag, data))
+
+
+def conditional_task_response(daily=False, cache=False):
+    """
+    Decorator para ações de leitura de TaskViewSet com GET condicional.
+
+    Calcula o ETag a partir da versão do usuário antes de executar a ação;
+    se o cliente já tem essa versão (If-None-Match), responde 304 sem
+    consultar nem serializar tarefas. A linha de UserTaskStats lida fica em
+    request.task_stats para a ação reaproveitar.
+
+    Com cache=True, a resposta (dados + ETag) também fica no cache de
+    respostas por usuário (tasks.cache); um hit não consulta o banco.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if cache:
+                key, cached = lookup_cached_response(request, method.__name__, daily=daily)
+                if cached is not None:
+                    etag, data = cached
+                    headers = conditional_headers(etag)
+                    if etag_matches(request, etag):
+                        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+                    return Response(data, headers=headers)
+
+            request.task_stats = load_task_stats(request.user)
+            etag = task_etag(request, method.__name__, request.task_stats.version, daily=daily)
+            headers = conditional_headers(etag)
+            if etag_matches(request, etag):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+            response = method(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                for header, value in headers.items():
+                    response[header] = value
+                if cache:
+                    store_cached_response(key, etag, response.data)
+            return response
+        return wrapper
+    return decorator
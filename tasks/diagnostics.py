@@ -0,0 +1,178 @@
+import asyncio
+import functools
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+
+DEFAULT_TARGETS = [
+    ('Quotable API', 'https://api.quotable.io/random'),
+    ('HTTPBin', 'https://httpbin.org/get'),
+    ('Google', 'https://www.google.com'),
+    ('GitHub', 'https://api.github.com'),
+    ('ZenQuotes', 'https://zenquotes.io/api/random'),
+    ('JsonPlaceholder', 'https://jsonplaceholder.typicode.com/todos/1'),
+]
+
+_cache = {'expires': 0.0, 'results': None}
+_cache_lock = threading.Lock()
+
+
+def elapsed_ms(start, end):
+    if start is None or end is None:
+        return None
+    return round((end - start) * 1000, 1)
+
+
+async def probe(client, name, url):
+    """
+    Faz um GET em url e mede DNS, conexão TCP, TLS e tempo total (ms).
+    """
+    loop = asyncio.get_running_loop()
+    marks = {}
+
+    async def trace(event, info):
+        marks[event] = time.perf_counter()
+
+    result = {'nome': name, 'url': url, 'status_code': None, 'ok': False, 'erro': None}
+    started = time.perf_counter()
+    dns_done = None
+    try:
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        await loop.getaddrinfo(parts.hostname, port)
+        dns_done = time.perf_counter()
+
+        response = await client.get(url, extensions={'trace': trace})
+        result['status_code'] = response.status_code
+        result['ok'] = response.is_success
+    except Exception as e:
+        result['erro'] = str(e) or e.__class__.__name__
+
+    result['tempos'] = {
+        'dns_ms': elapsed_ms(started, dns_done),
+        'connect_ms': elapsed_ms(
+            marks.get('connection.connect_tcp.started'), marks.get('connection.connect_tcp.complete')
+        ),
+        'tls_ms': elapsed_ms(
+            marks.get('connection.start_tls.started'), marks.get('connection.start_tls.complete')
+        ),
+        'total_ms': elapsed_ms(started, time.perf_counter()),
+    }
+    return result
+
+
+@functools.lru_cache(maxsize=1)
+def ssl_context():
+    """
+    Contexto SSL compartilhado pelos clientes httpx do processo.
+
+    Carregar o bundle de certificados custa ~30 ms de CPU por cliente;
+    reaproveitar o contexto evita esse custo a cada requisição.
+    """
+    import httpx
+
+    return httpx.create_ssl_context()
+
+
+async def run_probes(targets, timeout, deadline):
+    """
+    Testa todos os alvos em paralelo com um pool de conexões compartilhado.
+
+    O tempo total fica limitado por deadline segundos; alvos que não
+    responderem até lá são cancelados e reportados com erro.
+    """
+    import httpx
+
+    # Segue redirecionamentos como o requests.get de antes: ok é o status final
+    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True, verify=ssl_context()) as client:
+        tasks = [asyncio.ensure_future(probe(client, name, url)) for name, url in targets]
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+
+        results = []
+        for (name, url), task in zip(targets, tasks):
+            if task in done:
+                results.append(task.result())
+            else:
+                results.append({
+                    'nome': name,
+                    'url': url,
+                    'status_code': None,
+                    'ok': False,
+                    'erro': f'Prazo total de {deadline}s excedido',
+                    'tempos': {'dns_ms': None, 'connect_ms': None, 'tls_ms': None, 'total_ms': None},
+                })
+    return results
+
+
+def cached_diagnostics():
+    now = time.monotonic()
+    with _cache_lock:
+        if _cache['results'] is not None and now < _cache['expires']:
+            return _cache['results']
+    return None
+
+
+def store_diagnostics(results):
+    with _cache_lock:
+        _cache['results'] = results
+        _cache['expires'] = time.monotonic() + settings.DIAGNOSTICO_CACHE_SECONDS
+
+
+def diagnostics_probes():
+    """
+    Corrotina de run_probes com os alvos e prazos das settings.
+    """
+    targets = getattr(settings, 'DIAGNOSTICO_TARGETS', None) or DEFAULT_TARGETS
+    return run_probes(
+        targets,
+        timeout=settings.DIAGNOSTICO_TIMEOUT,
+        deadline=settings.DIAGNOSTICO_DEADLINE,
+    )
+
+
+def run_diagnostics():
+    """
+    Resultado do diagnóstico, reaproveitado por DIAGNOSTICO_CACHE_SECONDS.
+
+    Devolve (resultados, veio_do_cache).
+    """
+    results = cached_diagnostics()
+    if results is not None:
+        return results, True
+    results = asyncio.run(diagnostics_probes())
+    store_diagnostics(results)
+    return results, False
+
+
+async def arun_diagnostics():
+    """
+    run_diagnostics() no event loop já em execução (views assíncronas).
+    """
+    results = cached_diagnostics()
+    if results is not None:
+        return results, True
+    results = await diagnostics_probes()
+    store_diagnostics(results)
+    return results, False
+
+
+def diagnostico_data(results, em_cache):
+    """
+    Corpo da resposta de /api/tasks/diagnostico/.
+    """
+    return {
+        'diagnostico': results,
+        'em_cache': em_cache,
+        'mensagem': 'Se apenas a Quotable API falhar, o problema é externo ao seu código.'
+    }
+
+
+def clear_diagnostics_cache():
+    with _cache_lock:
+        _cache['results'] = None
+        _cache['expires'] = 0.0
@@ -0,0 +1,159 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.postgres.fields import ArrayField
+from django.db import connection
+from django.db.models import Aggregate, Avg, Count, F, FloatField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Extract
+
+from .filters import parse_period_params
+from .models import Task, TaskEvent
+
+
+PERCENTILES = (0.5, 0.75, 0.9, 0.95, 0.99)
+
+# Período padrão das métricas de fluxo, em dias terminando hoje
+DEFAULT_FLOW_DAYS = 90
+
+
+def apply_completion(task, old_status, now):
+    """
+    Ajusta task.completed_at à transição old_status -> task.status e
+    devolve o evento correspondente ('completed', 'reopened' ou None).
+    """
+    if task.status == old_status:
+        return None
+    if task.status == 'completed':
+        task.completed_at = now
+        return 'completed'
+    if old_status == 'completed':
+        task.completed_at = None
+        return 'reopened'
+    return None
+
+
+def stamp_completed_on_creation(tasks):
+    """
+    Tarefas que já nascem concluídas recebem completed_at = created_at,
+    que só é conhecido depois do INSERT (auto_now_add). Um UPDATE para
+    todas, e nenhum se não houver tarefas assim.
+    """
+    stamped = [task for task in tasks if task.status == 'completed' and task.completed_at is None]
+    for task in stamped:
+        task.completed_at = task.created_at
+    if stamped:
+        Task.objects.filter(pk__in=[task.pk for task in stamped]).update(completed_at=F('created_at'))
+
+
+def task_event(task, kind, occurred_at):
+    return TaskEvent(
+        user_id=task.user_id,
+        task_id=task.pk,
+        kind=kind,
+        occurred_at=occurred_at,
+        task_created_at=task.created_at,
+    )
+
+
+def creation_events(task):
+    """
+    Eventos de uma tarefa recém-criada: 'created' e, se ela já nasceu
+    concluída, 'completed' no mesmo instante.
+    """
+    events = [task_event(task, 'created', task.created_at)]
+    if task.status == 'completed':
+        events.append(task_event(task, 'completed', task.completed_at))
+    return events
+
+
+def record_events(events):
+    if events:
+        TaskEvent.objects.bulk_create(events)
+
+
+def record_bulk_transition(queryset, user_id, kind, occurred_at):
+    """
+    Um evento kind para cada tarefa de queryset, com um único
+    INSERT ... SELECT (sem trazer as tarefas para o Python). Deve rodar
+    antes do UPDATE que muda o status, enquanto queryset ainda casa.
+    """
+    select_sql, select_params = queryset.order_by().values('id', 'created_at').query.sql_with_params()
+    table = TaskEvent._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (user_id, task_id, kind, occurred_at, task_created_at) '
+            f'SELECT %s, tasks.id, %s, %s, tasks.created_at FROM ({select_sql}) AS tasks',
+            (user_id, kind, occurred_at, *select_params),
+        )
+
+
+class PercentilesCont(Aggregate):
+    """
+    percentile_cont do PostgreSQL para várias frações de uma vez, sobre os
+    segundos de uma duração.
+    """
+    function = 'percentile_cont'
+    template = (
+        '%(function)s(ARRAY[%(fractions)s]::float8[]) '
+        'WITHIN GROUP (ORDER BY EXTRACT(EPOCH FROM %(expressions)s))'
+    )
+    output_field = ArrayField(FloatField())
+
+    def __init__(self, expression, fractions, **extra):
+        super().__init__(expression, fractions=', '.join(str(float(f)) for f in fractions), **extra)
+
+
+def parse_flow_params(query_params):
+    """
+    (início, fim) do período de conclusões de ?date_from=&date_to=&tz=,
+    como datetimes aware; padrão: os últimos DEFAULT_FLOW_DAYS dias.
+    """
+    date_from, date_to, tz = parse_period_params(query_params, DEFAULT_FLOW_DAYS)
+    return (
+        datetime.combine(date_from, time.min, tzinfo=tz),
+        datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=tz),
+    )
+
+
+def flow_durations():
+    """
+    Durações de cada evento 'completed': lead time desde a criação e cycle
+    time desde a última vez que a tarefa entrou em pendente (criação ou
+    reabertura). Sem um status "em andamento", a reabertura é o único
+    reinício de trabalho que o log registra.
+    """
+    last_reopen = TaskEvent.objects.filter(
+        task_id=OuterRef('task_id'), kind='reopened', occurred_at__lte=OuterRef('occurred_at')
+    ).order_by('-occurred_at').values('occurred_at')[:1]
+    return {
+        'lead_time': F('occurred_at') - F('task_created_at'),
+        'cycle_time': F('occurred_at') - Coalesce(Subquery(last_reopen), F('task_created_at')),
+    }
+
+
+def completion_time_distribution(user, metric, start, end):
+    """
+    Distribuição (em segundos) de lead_time ou cycle_time das conclusões
+    entre start e end, numa única consulta sobre o índice
+    (user, kind, occurred_at) do log.
+    """
+    duration = flow_durations()[metric]
+    result = TaskEvent.objects.filter(
+        user=user, kind='completed', occurred_at__gte=start, occurred_at__lt=end
+    ).aggregate(
+        count=Count('id'),
+        mean=Avg(Extract(duration, 'epoch')),
+        percentiles=PercentilesCont(duration, PERCENTILES),
+    )
+    percentiles = result['percentiles'] or [None] * len(PERCENTILES)
+    return {
+        'metric': metric,
+        'unit': 'seconds',
+        'date_from': start.date().isoformat(),
+        'date_to': (end - timedelta(days=1)).date().isoformat(),
+        'count': result['count'],
+        'mean': round(result['mean'], 1) if result['mean'] is not None else None,
+        'percentiles': {
+            f'p{round(fraction * 100)}': round(value, 1) if value is not None else None
+            for fraction, value in zip(PERCENTILES, percentiles)
+        },
+    }
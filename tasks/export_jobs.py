@@ -0,0 +1,106 @@
+import gzip
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from core.metrics import get_metrics
+
+from .exports import iter_task_csv_lines
+from .filters import apply_task_filters
+from .models import ExportJob, Task
+
+
+def write_csv_gz(queryset, username, path):
+    """
+    Grava o CSV de exportação comprimido com gzip; devolve o número de tarefas.
+    """
+    rows = -1  # a primeira linha é o cabeçalho
+    with gzip.open(path, 'wt', encoding='utf-8', newline='') as output:
+        for line in iter_task_csv_lines(queryset, username):
+            output.write(line)
+            rows += 1
+    return rows
+
+
+# Formato -> (função que grava o arquivo, content type do download)
+EXPORT_FORMATS = {
+    'csv.gz': (write_csv_gz, 'application/gzip'),
+}
+
+
+def artifact_path(job):
+    return os.path.join(settings.EXPORT_ROOT, f'{job.id}.{job.format}')
+
+
+def claim_next_job():
+    """
+    Marca como running o job mais antigo da fila e o devolve (ou None).
+
+    Jobs em running há mais de EXPORT_JOB_TIMEOUT_SECONDS voltam a ser
+    pegos: o worker que os tinha caiu ou foi reiniciado no meio do arquivo.
+    SKIP LOCKED permite vários workers consumindo a mesma fila.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.EXPORT_JOB_TIMEOUT_SECONDS)
+    with transaction.atomic():
+        job = (
+            ExportJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='queued') | Q(status='running', started_at__lt=stale))
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = 'running'
+        job.started_at = now
+        job.save(update_fields=['status', 'started_at'])
+    return job
+
+
+def run_export_job(job):
+    """
+    Gera o arquivo de um job com os mesmos filtros da listagem de tarefas.
+    """
+    writer, _ = EXPORT_FORMATS[job.format]
+    queryset = apply_task_filters(Task.objects.filter(user_id=job.user_id), job.params)
+    path = artifact_path(job)
+    partial_path = path + '.part'
+    os.makedirs(settings.EXPORT_ROOT, exist_ok=True)
+
+    try:
+        job.row_count = writer(queryset, job.user.username, partial_path)
+        os.replace(partial_path, path)
+    except Exception as e:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        job.status = 'failed'
+        job.error = str(e)
+    else:
+        job.status = 'completed'
+        get_metrics().inc('export_rows_total', {'kind': 'job'}, job.row_count)
+        job.file_path = path
+        job.file_size = os.path.getsize(path)
+        job.expires_at = timezone.now() + timedelta(seconds=settings.EXPORT_TTL_SECONDS)
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def expire_artifacts(now=None):
+    """
+    Remove do disco os arquivos cujo prazo expirou; devolve quantos foram removidos.
+    """
+    now = now or timezone.now()
+    expired = 0
+    jobs = ExportJob.objects.filter(status='completed', expires_at__lte=now)
+    for job in jobs.iterator():
+        if job.file_path and os.path.exists(job.file_path):
+            os.remove(job.file_path)
+        job.status = 'expired'
+        job.file_path = ''
+        job.save(update_fields=['status', 'file_path'])
+        expired += 1
+    return expired
@@ -0,0 +1,100 @@
+import csv
+
+from django.utils import timezone
+from core.metrics import get_metrics
+
+from .filters import priority_label
+
+
+STATUS_LABELS = {
+    'pending': 'Pendente',
+    'completed': 'Concluída',
+    'cancelled': 'Cancelada'
+}
+
+CSV_HEADER = [
+    'ID',
+    'Título',
+    'Descrição',
+    'Status',
+    'Prioridade',
+    'Data de Criação',
+    'Hora de Criação',
+    'Dias Desde Criação',
+    'Usuário'
+]
+
+# Só as colunas usadas no CSV, lidas como tuplas (sem instanciar Task);
+# a prioridade vem calculada pelo banco (filters.priority_label)
+EXPORT_COLUMNS = ('id', 'title', 'description', 'status', 'priority', 'created_at')
+
+CSV_BOM = '\ufeff'
+
+# Descrição vazia na planilha (tasks.imports volta para '')
+EMPTY_DESCRIPTION = 'Sem descrição'
+
+
+class Echo:
+    """
+    Pseudo-arquivo para o csv.writer: devolve a linha em vez de guardá-la.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_filename(username, extension='csv'):
+    today = timezone.localdate().strftime('%Y-%m-%d')
+    return f'tarefas_{username}_{today}.{extension}'
+
+
+def iter_task_csv_lines(queryset, username, chunk_size=2000):
+    """
+    Gera o CSV linha a linha: primeiro o cabeçalho (com BOM), depois uma
+    linha por tarefa.
+
+    Percorre o queryset com um cursor no servidor (iterator) buscando só
+    EXPORT_COLUMNS, então a memória usada não depende do número de linhas.
+    """
+    writer = csv.writer(Echo(), delimiter=';', quoting=csv.QUOTE_ALL)
+    today = timezone.localdate()
+
+    yield CSV_BOM + writer.writerow(CSV_HEADER)
+
+    rows = queryset.annotate(priority=priority_label(today)).values_list(*EXPORT_COLUMNS)
+    for task_id, title, description, status, priority, created_at in rows.iterator(chunk_size=chunk_size):
+        days_since_creation = (today - created_at.date()).days
+        yield writer.writerow([
+            task_id,
+            title,
+            description or EMPTY_DESCRIPTION,
+            STATUS_LABELS.get(status, status),
+            priority,
+            created_at.strftime('%d/%m/%Y'),
+            created_at.strftime('%H:%M'),
+            f'{days_since_creation} dias',
+            username
+        ])
+
+
+def iter_task_csv(queryset, username, chunk_size=2000):
+    """
+    Agrupa as linhas de iter_task_csv_lines em blocos de até chunk_size
+    linhas, para respostas em streaming. As linhas geradas entram em
+    export_rows_total{kind="stream"}, mesmo se o cliente desistir no meio.
+    """
+    lines = []
+    produced = 0
+    try:
+        for line in iter_task_csv_lines(queryset, username, chunk_size):
+            lines.append(line)
+            produced += 1
+            if len(lines) >= chunk_size:
+                yield ''.join(lines)
+                lines = []
+        if lines:
+            yield ''.join(lines)
+    finally:
+        # A primeira linha é o cabeçalho
+        if produced > 1:
+            get_metrics().inc('export_rows_total', {'kind': 'stream'}, produced - 1)
@@ -0,0 +1,284 @@
+import zoneinfo
+from datetime import datetime, time, timedelta
+
+from django.db.models import Case, CharField, IntegerField, Q, Value, When
+from django.utils import timezone
+from rest_framework import serializers
+
+from .search import search_tasks
+
+
+ORDERING_FIELDS = [
+    'created_at', '-created_at', 'title', '-title', 'status', '-status', 'priority', '-priority'
+]
+
+# Parâmetros de filtro aceitos por apply_task_filters
+FILTER_PARAMS = ('search', 'status', 'priority', 'date_from', 'date_to', 'ordering')
+
+# Dias em aberto a partir dos quais uma tarefa pendente passa a Média e a Alta
+PRIORITY_MEDIUM_DAYS = 3
+PRIORITY_HIGH_DAYS = 7
+
+# Valores aceitos em ?priority=: rótulo (CSV) e posição na ordenação
+PRIORITY_LEVELS = {
+    'alta': ('Alta', 3),
+    'media': ('Média', 2),
+    'baixa': ('Baixa', 1),
+}
+NO_PRIORITY = ('N/A', 0)
+
+
+def clean_filter_params(data, allowed=FILTER_PARAMS):
+    """
+    Mantém só os filtros conhecidos, como strings, para guardar ou reaplicar.
+    """
+    return {
+        key: str(data[key])
+        for key in allowed
+        if data.get(key) not in (None, '')
+    }
+
+
+def parse_date_param(value):
+    """
+    Converte um parâmetro YYYY-MM-DD em date, retornando None se inválido.
+    """
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def parse_timezone_param(value):
+    """
+    Converte um nome de fuso IANA (America/Sao_Paulo) em ZoneInfo,
+    retornando None se ausente ou desconhecido.
+    """
+    if not value:
+        return None
+    try:
+        return zoneinfo.ZoneInfo(value)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def parse_period_params(query_params, default_days, max_days=None):
+    """
+    (date_from, date_to, fuso) de ?date_from=&date_to=&tz=, para relatórios
+    por período.
+
+    As datas são dias no fuso pedido (padrão: o do projeto) e o período
+    inclui date_to; sem datas, cobre default_days dias terminando hoje.
+    Valores inválidos viram ValidationError (400).
+    """
+    errors = {}
+    tz = timezone.get_current_timezone()
+    if query_params.get('tz'):
+        tz = parse_timezone_param(query_params['tz'])
+        if tz is None:
+            errors['tz'] = 'Fuso horário desconhecido. Use um nome IANA, ex.: America/Sao_Paulo'
+
+    dates = {}
+    for param in ('date_from', 'date_to'):
+        value = query_params.get(param)
+        dates[param] = parse_date_param(value)
+        if value and dates[param] is None:
+            errors[param] = 'Use o formato YYYY-MM-DD'
+    if errors:
+        raise serializers.ValidationError(errors)
+
+    date_to = dates['date_to'] or timezone.localdate(timezone=tz)
+    date_from = dates['date_from'] or date_to - timedelta(days=default_days - 1)
+    if date_from > date_to:
+        raise serializers.ValidationError({'date_from': 'Deve ser anterior ou igual a date_to'})
+    if max_days and (date_to - date_from).days >= max_days:
+        raise serializers.ValidationError({'date_from': f'Período máximo de {max_days} dias'})
+    return date_from, date_to, tz
+
+
+def start_of_day(day):
+    """
+    Início do dia (00:00) no fuso horário atual, como datetime aware.
+    """
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def parse_priority_param(value):
+    """
+    Nível de ?priority= (alta, media/média, baixa), ou None se ausente ou
+    desconhecido.
+    """
+    if not value:
+        return None
+    level = value.strip().lower().replace('é', 'e')
+    return level if level in PRIORITY_LEVELS else None
+
+
+def priority_cutoffs(today=None):
+    """
+    (limite de Alta, limite de Média) sobre created_at.
+
+    Uma tarefa está há mais de N dias em aberto quando foi criada antes do
+    início do dia today - N. Comparar created_at com esses instantes, em vez
+    de calcular a idade linha a linha, mantém filtro e ordenação como faixas
+    dos índices (user, created_at) e (user, status, created_at).
+    """
+    today = today or timezone.localdate()
+    return (
+        start_of_day(today - timedelta(days=PRIORITY_HIGH_DAYS)),
+        start_of_day(today - timedelta(days=PRIORITY_MEDIUM_DAYS)),
+    )
+
+
+def priority_q(level, today=None):
+    """
+    Condição das tarefas de um nível: pendentes, numa faixa de created_at.
+    """
+    high, medium = priority_cutoffs(today)
+    ranges = {
+        'alta': Q(created_at__lt=high),
+        'media': Q(created_at__gte=high, created_at__lt=medium),
+        'baixa': Q(created_at__gte=medium),
+    }
+    return Q(status='pending') & ranges[level]
+
+
+def priority_case(position, output_field, today=None):
+    high, medium = priority_cutoffs(today)
+    return Case(
+        When(~Q(status='pending'), then=Value(NO_PRIORITY[position])),
+        When(created_at__lt=high, then=Value(PRIORITY_LEVELS['alta'][position])),
+        When(created_at__lt=medium, then=Value(PRIORITY_LEVELS['media'][position])),
+        default=Value(PRIORITY_LEVELS['baixa'][position]),
+        output_field=output_field,
+    )
+
+
+def priority_label(today=None):
+    """
+    Expressão com o rótulo da prioridade: Alta, Média, Baixa ou N/A.
+    """
+    return priority_case(0, CharField(), today)
+
+
+def priority_rank(today=None):
+    """
+    Expressão com a posição da prioridade: 3 (Alta) a 0 (não pendente).
+    """
+    return priority_case(1, IntegerField(), today)
+
+
+def depends_on_today(query_params):
+    """
+    True se o resultado muda com a data de hoje (filtro ou ordenação por
+    prioridade), para o cache e o ETag da resposta incluírem o dia.
+    """
+    return bool(query_params.get('priority')) or get_ordering(query_params).lstrip('-') == 'priority'
+
+
+def apply_task_filters(queryset, query_params, search_term=None):
+    """
+    Aplica os filtros da listagem de tarefas ao queryset.
+
+    As datas viram intervalos semiabertos sobre created_at
+    ([date_from 00:00, date_to + 1 dia 00:00)) em vez de created_at__date,
+    para que o PostgreSQL consiga usar os índices compostos de Task; a
+    prioridade, pelo mesmo motivo, vira uma faixa de created_at
+    (priority_q). Com busca textual e sem ordering explícito, ordena por
+    relevância.
+    """
+    if search_term is None:
+        search_term = query_params.get('search')
+    if search_term:
+        queryset = search_tasks(
+            queryset, search_term, highlight=query_params.get('highlight') == 'true'
+        )
+
+    status_filter = query_params.get('status')
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+
+    priority = parse_priority_param(query_params.get('priority'))
+    if priority:
+        queryset = queryset.filter(priority_q(priority))
+
+    date_from = parse_date_param(query_params.get('date_from'))
+    if date_from:
+        queryset = queryset.filter(created_at__gte=start_of_day(date_from))
+
+    date_to = parse_date_param(query_params.get('date_to'))
+    if date_to:
+        queryset = queryset.filter(created_at__lt=start_of_day(date_to + timedelta(days=1)))
+
+    if 'ordering' not in query_params and 'rank' in queryset.query.annotations:
+        return queryset.order_by('-rank', '-created_at', '-id')
+    ordering = get_ordering(query_params)
+    if ordering.lstrip('-') == 'priority':
+        only_pending = status_filter == 'pending' or priority
+        return order_by_priority(queryset, ordering, only_pending)
+    return queryset.order_by(*ordering_keys(ordering))
+
+
+def order_by_priority(queryset, ordering, only_pending=False):
+    """
+    Ordena por prioridade; -priority começa pelas mais urgentes.
+
+    Entre pendentes, prioridade maior é o mesmo que created_at menor, então
+    com o queryset restrito a pendentes a ordem é só created_at invertido:
+    "pendentes mais antigas primeiro" é uma leitura em ordem do índice
+    (user, status, created_at). Nos demais casos, ordena pela posição
+    anotada (priority_rank) e, dentro dela, pela idade.
+    """
+    descending = ordering.startswith('-')
+    if only_pending:
+        return queryset.order_by(*ordering_keys('created_at' if descending else '-created_at'))
+    keys = ['-priority_rank', 'created_at', 'id'] if descending else ['priority_rank', '-created_at', '-id']
+    return queryset.annotate(priority_rank=priority_rank()).order_by(*keys)
+
+
+def get_ordering(query_params):
+    """
+    Ordenação pedida pelo cliente, ou -created_at se ausente/inválida.
+    """
+    ordering = query_params.get('ordering', '-created_at')
+    if ordering not in ORDERING_FIELDS:
+        ordering = '-created_at'
+    return ordering
+
+
+def ordering_keys(ordering):
+    """
+    Colunas completas de ordenação: o campo pedido seguido de created_at e id
+    na mesma direção, para que empates tenham ordem estável.
+    """
+    descending = ordering.startswith('-')
+    field = ordering.lstrip('-')
+    names = [field] if field == 'created_at' else [field, 'created_at']
+    names.append('id')
+    return [('-' if descending else '') + name for name in names]
+
+
+def has_row_filters(query_params):
+    """
+    True se algum filtro que restringe linhas (não só a ordem) foi pedido.
+    """
+    return any(query_params.get(param) for param in FILTER_PARAMS if param != 'ordering')
+
+
+def search_filters_applied(query_params, search_term, ranked):
+    """
+    Campo filters_applied da resposta de /api/tasks/search/.
+    """
+    ordering = query_params.get('ordering', '-created_at')
+    if 'ordering' not in query_params and ranked:
+        ordering = '-relevance'
+    return {
+        'search': search_term,
+        'status': query_params.get('status'),
+        'priority': query_params.get('priority'),
+        'date_from': query_params.get('date_from'),
+        'date_to': query_params.get('date_to'),
+        'ordering': ordering
+    }
@@ -0,0 +1,228 @@
+"""
+Importação de tarefas a partir do CSV de export_csv.
+
+O arquivo é lido em streaming (csv.reader sobre o arquivo enviado, que o
+Django guarda em disco acima de FILE_UPLOAD_MAX_MEMORY_SIZE) e processado
+em blocos de chunk_size linhas: cada bloco é validado com o TaskSerializer,
+inserido com um bulk_create e tem contadores e eventos gravados na mesma
+transação. A memória usada depende do tamanho do bloco, não do arquivo.
+
+Os blocos são independentes: um erro de leitura no meio do arquivo não
+desfaz os blocos já gravados, e o relatório diz quantas tarefas entraram.
+"""
+import csv
+import io
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+from core.metrics import get_metrics
+
+from .bulk import validate_items
+from .events import creation_events, record_events, stamp_completed_on_creation
+from .exports import CSV_HEADER, EMPTY_DESCRIPTION, STATUS_LABELS
+from .models import Task
+from .serializers import TaskSerializer
+from .stats import StatsDelta
+
+
+IMPORT_CHUNK_SIZE = 1000
+
+# Erros por linha guardados no relatório; os demais só entram na contagem
+IMPORT_MAX_ERRORS = 1000
+
+# Colunas lidas do CSV (pelo nome no cabeçalho). ID, Prioridade, Dias Desde
+# Criação e Usuário são calculados na exportação e ignorados aqui: as
+# tarefas são criadas para quem importa, com novos ids.
+TITLE_COLUMN, DESCRIPTION_COLUMN, STATUS_COLUMN = CSV_HEADER[1:4]
+DATE_COLUMN, TIME_COLUMN = CSV_HEADER[5:7]
+
+# Rótulo do export (ou o próprio código) -> status
+STATUS_VALUES = {
+    **{code: code for code in STATUS_LABELS},
+    **{label.lower(): code for code, label in STATUS_LABELS.items()},
+}
+
+
+class CSVImportError(ValueError):
+    """
+    Arquivo que não pode ser lido como o CSV da exportação. report tem o
+    que já foi gravado antes do erro.
+    """
+    report = None
+
+
+def parse_created_at(date_value, time_value):
+    """
+    Data e hora de criação como escritas pela exportação (dd/mm/aaaa e
+    HH:MM, em UTC, o fuso de created_at lido do banco), ou None se a data
+    estiver vazia. Levanta ValueError se o formato for outro.
+    """
+    if not date_value:
+        return None
+    parsed = datetime.strptime(f'{date_value} {time_value or "00:00"}', '%d/%m/%Y %H:%M')
+    return parsed.replace(tzinfo=dt_timezone.utc)
+
+
+def parse_row(row, columns):
+    """
+    Linha do CSV -> (item para o TaskSerializer, created_at, erros).
+    """
+    def value(column):
+        index = columns.get(column)
+        return row[index].strip() if index is not None and index < len(row) else ''
+
+    item = {'title': value(TITLE_COLUMN)}
+    description = value(DESCRIPTION_COLUMN)
+    item['description'] = '' if description == EMPTY_DESCRIPTION else description
+    status = value(STATUS_COLUMN)
+    if status:
+        # Rótulo desconhecido segue como veio e é recusado pelo serializer
+        item['status'] = STATUS_VALUES.get(status.lower(), status)
+
+    try:
+        created_at = parse_created_at(value(DATE_COLUMN), value(TIME_COLUMN))
+    except ValueError:
+        return item, None, {DATE_COLUMN: ['Use dd/mm/aaaa e HH:MM.']}
+    return item, created_at, None
+
+
+def read_header(reader):
+    try:
+        header = next(reader)
+    except StopIteration:
+        raise CSVImportError('Arquivo vazio.')
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise CSVImportError(f'Cabeçalho ilegível (use UTF-8): {e}')
+    columns = {name.strip(): index for index, name in enumerate(header)}
+    if TITLE_COLUMN not in columns:
+        raise CSVImportError(
+            f'Coluna "{TITLE_COLUMN}" não encontrada. Use o CSV de export_csv '
+            '(separado por ponto e vírgula).'
+        )
+    return columns
+
+
+def iter_chunks(reader, columns, chunk_size):
+    """
+    Blocos de até chunk_size linhas: listas de (número da linha de dados,
+    item, created_at, erros da leitura).
+    """
+    chunk = []
+    row_number = 0
+    try:
+        for row in reader:
+            if not any(field.strip() for field in row):
+                continue
+            row_number += 1
+            chunk.append((row_number, *parse_row(row, columns)))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    except (csv.Error, UnicodeDecodeError) as e:
+        if chunk:
+            yield chunk
+        raise CSVImportError(f'Erro ao ler a linha {reader.line_num}: {e}')
+    if chunk:
+        yield chunk
+
+
+def set_created_at(tasks):
+    """
+    Grava task.created_at das tarefas já inseridas com um único UPDATE
+    (bulk_update montaria um CASE por linha, bem mais lento nos blocos
+    grandes).
+    """
+    table = Task._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} SET created_at = data.created_at '
+            f'FROM unnest(%s::bigint[], %s::timestamptz[]) AS data (id, created_at) '
+            f'WHERE {table}.id = data.id',
+            ([task.pk for task in tasks], [task.created_at for task in tasks]),
+        )
+
+
+def import_chunk(user, chunk):
+    """
+    Valida e grava um bloco numa transação. Devolve (criadas, erros).
+    """
+    errors = [{'row': number, 'errors': error} for number, _, _, error in chunk if error]
+    parsed = [(number, item, created_at) for number, item, created_at, error in chunk if not error]
+    validated, valid_indexes, item_errors = validate_items(TaskSerializer, [item for _, item, _ in parsed])
+    errors.extend({'row': parsed[error['index']][0], 'errors': error['errors']} for error in item_errors)
+    errors.sort(key=lambda error: error['row'])
+
+    tasks = [Task(user=user, **data) for data in validated]
+    if not tasks:
+        return 0, errors
+    with transaction.atomic():
+        Task.objects.bulk_create(tasks)
+        # auto_now_add ignora created_at no INSERT: grava as datas do arquivo depois
+        dated = []
+        for task, index in zip(tasks, valid_indexes):
+            created_at = parsed[index][2]
+            if created_at is not None:
+                task.created_at = created_at
+                dated.append(task)
+        if dated:
+            set_created_at(dated)
+        stamp_completed_on_creation(tasks)
+
+        # bulk_create não dispara post_save: contadores e log como em bulk_create_tasks
+        delta = StatsDelta()
+        events = []
+        for task in tasks:
+            delta.created(task)
+            events.extend(creation_events(task))
+        delta.apply()
+        record_events(events)
+    return len(tasks), errors
+
+
+def import_tasks_csv(user, file, chunk_size=IMPORT_CHUNK_SIZE, max_errors=IMPORT_MAX_ERRORS, progress=None):
+    """
+    Importa as tarefas de file (binário, UTF-8 com ou sem BOM, separado por
+    ponto e vírgula) para user.
+
+    Devolve o relatório: linhas lidas, criadas e com erro, os primeiros
+    max_errors erros por linha ({'row', 'errors'}, contando a partir da
+    primeira linha depois do cabeçalho), tempo e linhas por segundo.
+    progress(relatório parcial) é chamado depois de cada bloco. Levanta
+    CSVImportError se o cabeçalho não for o da exportação ou o arquivo não
+    puder ser lido; os blocos anteriores ao erro continuam gravados.
+    """
+    started = time.perf_counter()
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    report = {'rows': 0, 'created': 0, 'failed': 0, 'errors': []}
+    try:
+        reader = csv.reader(text, delimiter=';')
+        columns = read_header(reader)
+        for chunk in iter_chunks(reader, columns, chunk_size):
+            created, errors = import_chunk(user, chunk)
+            report['rows'] += len(chunk)
+            report['created'] += created
+            report['failed'] += len(errors)
+            report['errors'].extend(errors[:max(0, max_errors - len(report['errors']))])
+            get_metrics().inc('import_rows_total', {'result': 'created'}, created)
+            if errors:
+                get_metrics().inc('import_rows_total', {'result': 'failed'}, len(errors))
+            if progress:
+                progress(finish_report(report, started))
+    except CSVImportError as e:
+        e.report = finish_report(report, started)
+        raise
+    finally:
+        # Devolve o arquivo a quem chamou sem fechá-lo
+        text.detach()
+    return finish_report(report, started)
+
+
+def finish_report(report, started):
+    elapsed = time.perf_counter() - started
+    return {
+        **report,
+        'errors_truncated': report['failed'] > len(report['errors']),
+        'elapsed_s': round(elapsed, 3),
+        'rows_per_second': round(report['rows'] / elapsed, 1) if elapsed else None,
+    }
@@ -0,0 +1,129 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from tasks.benchmarks import (
+    BENCH_USER_PREFIX, SlowUpstream, prepare_users, run_asgi, run_wsgi, seed_dataset,
+)
+from tasks.cache import get_cache
+from tasks.diagnostics import clear_diagnostics_cache
+
+
+SCENARIOS = {
+    'list': '/api/tasks/?page_size=50',
+    'search': '/api/tasks/search/?q=projeto&page_size=50',
+    'statistics': '/api/tasks/statistics/',
+    'diagnostico': '/api/tasks/diagnostico/',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a vazão com requisições concorrentes entre o handler WSGI '
+        '(views síncronas, uma thread por requisição em andamento) e o ASGI '
+        'com core/urls_async.py (diagnostico assíncrono; as leituras de banco '
+        'pelas mesmas views síncronas). Grava usuários __bench_* no banco e os '
+        'remove no fim.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Usuários gerados (padrão: 20)')
+        parser.add_argument('--tasks-per-user', type=int, default=200, help='Tarefas por usuário (padrão: 200)')
+        parser.add_argument('--requests', type=int, default=200, help='Requisições por cenário (padrão: 200)')
+        parser.add_argument(
+            '--concurrency', type=int, default=32,
+            help='Requisições simultâneas em andamento no ASGI (padrão: 32)'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=8,
+            help='Threads do worker WSGI, como gunicorn --threads (padrão: 8)'
+        )
+        parser.add_argument(
+            '--upstream-delay', type=float, default=0.2,
+            help='Atraso do serviço externo simulado no diagnostico, em segundos (padrão: 0.2)'
+        )
+        parser.add_argument(
+            '--scenario', action='append', choices=sorted(SCENARIOS),
+            help='Cenário a medir (repetível; padrão: todos)'
+        )
+        parser.add_argument('--output', help='Arquivo JSON com os resultados')
+
+    def handle(self, *args, **options):
+        # Cache próprio desde o início: cleanup() limpa só ele, nunca o cache
+        # de respostas compartilhado pelos workers
+        caches = {**settings.CACHES, 'tasks': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'bench-asgi',
+        }}
+        with override_settings(CACHES=caches):
+            self.run(options)
+
+    def run(self, options):
+        scenarios = options['scenario'] or list(SCENARIOS)
+        self.cleanup()
+        results = {}
+        try:
+            users = seed_dataset(options['users'], options['tasks_per_user'])
+            prepare_users(users)
+            auth = [
+                {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+                for user in users
+            ]
+
+            with SlowUpstream(options['upstream_delay']) as upstream, override_settings(
+                ALLOWED_HOSTS=['testserver'],
+                DIAGNOSTICO_TARGETS=[(f'Lento {i}', f'{upstream.url}/{i}') for i in range(3)],
+                DIAGNOSTICO_CACHE_SECONDS=0,
+                THROTTLE_ENABLED=False,
+                CACHES={**settings.CACHES, 'tasks': {
+                    'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+                }},
+            ):
+                for name in scenarios:
+                    request_list = [
+                        (SCENARIOS[name], auth[index % len(auth)])
+                        for index in range(options['requests'])
+                    ]
+                    results[name] = {}
+                    for mode, urlconf in (('wsgi', 'core.urls'), ('asgi', 'core.urls_async')):
+                        clear_diagnostics_cache()
+                        with override_settings(ROOT_URLCONF=urlconf):
+                            if mode == 'wsgi':
+                                conn_max_age = settings.DATABASES['default'].get('CONN_MAX_AGE', 0)
+                                result = run_wsgi(request_list, options['threads'], conn_max_age == 0)
+                            else:
+                                result = run_asgi(request_list, options['concurrency'])
+                        results[name][mode] = result
+                    self.report(name, results[name])
+        finally:
+            self.cleanup()
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump({
+                    'concurrency': options['concurrency'],
+                    'threads': options['threads'],
+                    'requests': options['requests'],
+                    'upstream_delay': options['upstream_delay'],
+                    'scenarios': results,
+                }, handle, indent=2)
+            self.stdout.write(f'Resultados salvos em {options["output"]}')
+
+    def report(self, name, result):
+        for mode in ('wsgi', 'asgi'):
+            data = result[mode]
+            self.stdout.write(
+                f'{name:<12} {mode}  {data["throughput_rps"]:8.1f} req/s  '
+                f'p50 {data["p50_ms"]:8.2f} ms  p95 {data["p95_ms"]:8.2f} ms  erros {data["errors"]}'
+            )
+        wsgi, asgi = result['wsgi']['throughput_rps'], result['asgi']['throughput_rps']
+        if wsgi:
+            self.stdout.write(f'{name:<12} asgi/wsgi {asgi / wsgi:.2f}x')
+
+    def cleanup(self):
+        get_cache().clear()
+        User.objects.filter(username__startswith=BENCH_USER_PREFIX).delete()
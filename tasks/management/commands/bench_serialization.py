@@ -0,0 +1,79 @@
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from tasks.models import Task
+from tasks.renderers import FastJSONRenderer
+from tasks.serializers import (
+    TASK_FIELDS, TaskSerializer, parse_task_fields, serialize_task_rows, task_values,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a serialização de listagens: TaskSerializer + JSONRenderer '
+        'contra task_values/serialize_task_rows + FastJSONRenderer'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=5000, help='Tarefas geradas (padrão: 5000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Repetições por caminho (padrão: 5)')
+        parser.add_argument(
+            '--fields', default='',
+            help='Campos do caminho rápido, como em ?fields= (padrão: todos)'
+        )
+
+    def handle(self, *args, **options):
+        fields = parse_task_fields(options['fields'])
+
+        # Os dados de teste são descartados no fim (rollback)
+        with transaction.atomic():
+            user = User.objects.create_user(username='__bench_serialization__')
+            Task.objects.bulk_create(
+                Task(
+                    title=f'Tarefa {i}',
+                    description=f'Descrição da tarefa {i} — ação',
+                    status='completed' if i % 3 == 0 else 'pending',
+                    user=user,
+                )
+                for i in range(options['tasks'])
+            )
+            queryset = Task.objects.filter(user=user).order_by('-created_at', '-id')
+
+            def model_path():
+                return JSONRenderer().render(TaskSerializer(queryset, many=True).data)
+
+            def fast_path():
+                rows = task_values(queryset, fields)
+                return FastJSONRenderer().render(serialize_task_rows(rows, fields))
+
+            results = {
+                'TaskSerializer': self.measure(model_path, options['repeat']),
+                'serialize_task_rows': self.measure(fast_path, options['repeat']),
+            }
+            if fields == TASK_FIELDS:
+                identical = model_path() == fast_path()
+            else:
+                identical = None
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'{options["tasks"]} tarefas, {options["repeat"]} repetições, campos: {",".join(fields)}')
+        for name, (median, size) in results.items():
+            self.stdout.write(f'  {name:<20} mediana {median:8.1f} ms  {size} bytes')
+        baseline = results['TaskSerializer'][0]
+        fast = results['serialize_task_rows'][0]
+        self.stdout.write(f'  ganho: {baseline / fast:.1f}x')
+        if identical is not None:
+            self.stdout.write(f'  saídas idênticas: {"sim" if identical else "NÃO"}')
+
+    def measure(self, path, repeat):
+        timings = []
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            body = path()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings), len(body)
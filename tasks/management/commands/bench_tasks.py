@@ -0,0 +1,125 @@
+import json
+import platform
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks.benchmarks import (
+    QUERY_BUDGETS, prepare_users, run_scenario, seed_dataset,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark em processo da API de tarefas: gera um conjunto de dados '
+        '(descartado no fim), mede p50/p95/p99, consultas por requisição e '
+        'pico de memória por cenário. Ex.: --users 1000 --tasks-per-user 10000'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help='Usuários gerados (padrão: 50)')
+        parser.add_argument('--tasks-per-user', type=int, default=200, help='Tarefas por usuário (padrão: 200)')
+        parser.add_argument('--sample', type=int, default=10, help='Usuários que recebem as requisições (padrão: 10)')
+        parser.add_argument('--iterations', type=int, default=50, help='Requisições por cenário (padrão: 50)')
+        parser.add_argument(
+            '--scenario', action='append', choices=sorted(QUERY_BUDGETS),
+            help='Cenário a medir (repetível; padrão: todos)'
+        )
+        parser.add_argument('--cached', action='store_true', help='Mantém o cache de respostas entre requisições')
+        parser.add_argument(
+            '--auth', choices=('force', 'jwt'), default='force',
+            help='force: sem custo de autenticação; jwt: access token no header (padrão: force)'
+        )
+        parser.add_argument('--output', help='Arquivo JSON com os resultados')
+        parser.add_argument('--compare', help='JSON de uma execução anterior para comparar')
+        parser.add_argument(
+            '--fail-on-budget', action='store_true',
+            help='Sai com erro se algum cenário passar do orçamento de consultas'
+        )
+
+    def handle(self, *args, **options):
+        scenarios = options['scenario'] or list(QUERY_BUDGETS)
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as handle:
+                baseline = json.load(handle)
+
+        # Cache local e host do cliente de teste, sem tocar no cache real; sem
+        # limite de uso, que recusaria as repetições das ações caras
+        caches = {**settings.CACHES, 'tasks': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'bench-tasks',
+        }}
+        with override_settings(CACHES=caches, ALLOWED_HOSTS=['testserver'], THROTTLE_ENABLED=False):
+            with transaction.atomic():
+                self.stdout.write(
+                    f'Gerando {options["users"]} usuários × {options["tasks_per_user"]} tarefas...'
+                )
+                users = seed_dataset(options['users'], options['tasks_per_user'])
+                sample = users[:max(1, options['sample'])]
+                prepare_users(sample)
+
+                client = APIClient()
+                results = {}
+                for name in scenarios:
+                    results[name] = run_scenario(
+                        client, sample, name, options['iterations'],
+                        cached=options['cached'], auth=options['auth'],
+                    )
+                    self.report(name, results[name], baseline)
+                transaction.set_rollback(True)
+
+        report = {
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'commit': self.git_commit(),
+                'python': platform.python_version(),
+                'database': settings.DATABASES['default']['ENGINE'],
+                'users': options['users'],
+                'tasks_per_user': options['tasks_per_user'],
+                'sample': len(sample),
+                'iterations': options['iterations'],
+                'cached': options['cached'],
+                'auth': options['auth'],
+            },
+            'scenarios': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(f'Resultados salvos em {options["output"]}')
+
+        over = [
+            name for name, result in results.items()
+            if result['query_budget'] is not None and result['queries_max'] > result['query_budget']
+        ]
+        if over and options['fail_on_budget']:
+            raise CommandError(f'Orçamento de consultas excedido: {", ".join(over)}')
+
+    def report(self, name, result, baseline):
+        line = (
+            f'{name:<14} p50 {result["p50_ms"]:8.2f} ms  p95 {result["p95_ms"]:8.2f} ms  '
+            f'p99 {result["p99_ms"]:8.2f} ms  consultas {result["queries_max"]}/{result["query_budget"]}  '
+            f'memória {result["peak_memory_kb"]:.0f} KiB'
+        )
+        previous = (baseline or {}).get('scenarios', {}).get(name)
+        if previous:
+            change = (result['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+            line += f'  (p95 {change:+.0f}%, consultas antes {previous["queries_max"]})'
+        if result['query_budget'] is not None and result['queries_max'] > result['query_budget']:
+            line += '  ACIMA DO ORÇAMENTO'
+        self.stdout.write(line)
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, cwd=settings.BASE_DIR, timeout=5,
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
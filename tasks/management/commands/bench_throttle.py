@@ -0,0 +1,140 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from tasks.benchmarks import (
+    BENCH_USER_PREFIX, prepare_users, run_flood, run_wsgi, seed_dataset,
+)
+from tasks.cache import get_cache
+from tasks.throttling import reset_throttle_store
+
+
+CHEAP_URL = '/api/tasks/?page_size=20'
+FLOOD_URL = '/api/tasks/export_csv/'
+
+# fase: (com um usuário exportando sem parar, limite de uso ligado)
+PHASES = {
+    'baseline': (False, True),
+    'flood': (True, False),
+    'flood_throttled': (True, True),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Teste de carga do limite de uso: mede a latência de uma leitura '
+        'barata (lista paginada) de vários usuários sem carga extra, com um '
+        'usuário repetindo export_csv sem limite e com o limite ligado. '
+        'Grava usuários __bench_* no banco e os remove no fim.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='Usuários das leituras baratas (padrão: 10)')
+        parser.add_argument('--tasks-per-user', type=int, default=200, help='Tarefas por usuário (padrão: 200)')
+        parser.add_argument(
+            '--flood-tasks', type=int, default=20000,
+            help='Tarefas do usuário que exporta sem parar (padrão: 20000)'
+        )
+        parser.add_argument('--requests', type=int, default=300, help='Leituras baratas por fase (padrão: 300)')
+        parser.add_argument('--threads', type=int, default=4, help='Threads das leituras baratas (padrão: 4)')
+        parser.add_argument(
+            '--flood-threads', type=int, default=4,
+            help='Threads repetindo a exportação (padrão: 4)'
+        )
+        parser.add_argument(
+            '--warmup', type=float, default=5,
+            help='Segundos de exportações antes de medir, para gastar o balde inicial (padrão: 5)'
+        )
+        parser.add_argument('--output', help='Arquivo JSON com os resultados')
+
+    def handle(self, *args, **options):
+        # Cache próprio desde o início: cleanup() limpa só ele, nunca o cache
+        # de respostas compartilhado pelos workers
+        caches = {**settings.CACHES, 'tasks': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'bench-throttle',
+        }}
+        with override_settings(CACHES=caches):
+            self.run(options)
+
+    def run(self, options):
+        self.cleanup()
+        throttle_dir = tempfile.mkdtemp(prefix='bench-throttle-')
+        results = {}
+        try:
+            users = seed_dataset(options['users'], options['tasks_per_user'])
+            flooder = seed_dataset(1, options['flood_tasks'], first=options['users'])[0]
+            prepare_users(users + [flooder])
+            request_list = [
+                (CHEAP_URL, self.auth(users[index % len(users)]))
+                for index in range(options['requests'])
+            ]
+            flood = (FLOOD_URL, self.auth(flooder))
+            close_connections = settings.DATABASES['default'].get('CONN_MAX_AGE', 0) == 0
+
+            for name, (flooding, throttled) in PHASES.items():
+                with override_settings(
+                    ALLOWED_HOSTS=['testserver'],
+                    CACHES={**settings.CACHES, 'tasks': {
+                        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+                    }},
+                    THROTTLE_ENABLED=throttled,
+                    THROTTLE_DB=os.path.join(throttle_dir, f'{name}.sqlite3'),
+                ):
+                    reset_throttle_store()
+                    if flooding:
+                        result = run_flood(
+                            request_list, options['threads'], flood,
+                            options['flood_threads'], close_connections, options['warmup'],
+                        )
+                    else:
+                        result = run_wsgi(request_list, options['threads'], close_connections)
+                results[name] = result
+                self.report(name, result, results['baseline'])
+        finally:
+            reset_throttle_store()
+            shutil.rmtree(throttle_dir, ignore_errors=True)
+            self.cleanup()
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump({
+                    'users': options['users'],
+                    'flood_tasks': options['flood_tasks'],
+                    'threads': options['threads'],
+                    'flood_threads': options['flood_threads'],
+                    'warmup': options['warmup'],
+                    'throttle': {
+                        'rate': settings.THROTTLE_RATE,
+                        'burst': settings.THROTTLE_BURST,
+                        'costs': settings.THROTTLE_COSTS,
+                    },
+                    'phases': results,
+                }, handle, indent=2)
+            self.stdout.write(f'Resultados salvos em {options["output"]}')
+
+    def auth(self, user):
+        return {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+    def report(self, name, result, baseline):
+        line = (
+            f'{name:<16} p50 {result["p50_ms"]:8.2f} ms  p95 {result["p95_ms"]:8.2f} ms  '
+            f'p99 {result["p99_ms"]:8.2f} ms  erros {result["errors"]}'
+        )
+        if baseline['p99_ms']:
+            line += f'  p99 {result["p99_ms"] / baseline["p99_ms"]:.1f}x'
+        if 'flood' in result:
+            flood = ', '.join(f'{code}: {count}' for code, count in result['flood'].items())
+            line += f'  exportações ({flood})'
+        self.stdout.write(line)
+
+    def cleanup(self):
+        get_cache().clear()
+        User.objects.filter(username__startswith=BENCH_USER_PREFIX).delete()
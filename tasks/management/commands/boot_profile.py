@@ -0,0 +1,116 @@
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede o boot de um worker num interpretador novo: tempo por fase '
+        '(settings, apps, middleware, URLconf, checks) e tempo de import por '
+        'pacote (python -X importtime). Não acessa o banco.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help='Execuções; reporta a mediana (padrão: 3)')
+        parser.add_argument('--handler', choices=['wsgi', 'asgi'], default='wsgi', help='Handler medido (padrão: wsgi)')
+        parser.add_argument('--top', type=int, default=15, help='Pacotes listados no import (padrão: 15)')
+        parser.add_argument('--output', help='Arquivo JSON com os resultados')
+        parser.add_argument('--compare', help='JSON de uma execução anterior para comparar')
+        parser.add_argument(
+            '--max-boot-ms', type=float,
+            help='Sai com erro se o boot total (mediana) passar deste valor'
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as handle:
+                baseline = json.load(handle)
+
+        runs = [self.measure(options['handler']) for _ in range(max(1, options['runs']))]
+        phases = {
+            name: round(statistics.median(run['phases'][name] for run in runs), 2)
+            for name in runs[0]['phases']
+        }
+        packages = {}
+        for run in runs:
+            for name, ms in run['imports'].items():
+                packages.setdefault(name, []).append(ms)
+        imports = {
+            name: round(statistics.median(values + [0.0] * (len(runs) - len(values))), 2)
+            for name, values in packages.items()
+        }
+        result = {
+            'handler': options['handler'],
+            'runs': len(runs),
+            'total_ms': round(sum(phases.values()), 2),
+            'phases': phases,
+            'import_total_ms': round(sum(imports.values()), 2),
+            'imports': dict(sorted(imports.items(), key=lambda item: -item[1])),
+        }
+        self.report(result, baseline, options['top'])
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(result, handle, indent=2)
+            self.stdout.write(f'Resultados salvos em {options["output"]}')
+
+        if options['max_boot_ms'] is not None and result['total_ms'] > options['max_boot_ms']:
+            raise CommandError(
+                f'Boot de {result["total_ms"]:.0f} ms acima do limite de {options["max_boot_ms"]:.0f} ms'
+            )
+
+    def measure(self, handler):
+        """
+        Roda core.boot num processo novo com -X importtime e devolve
+        {'phases': {fase: ms}, 'imports': {pacote: ms}}.
+        """
+        spawned_at = time.time()
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-m', 'core.boot', handler],
+            capture_output=True, text=True, cwd=settings.BASE_DIR, timeout=120,
+        )
+        if completed.returncode != 0:
+            raise CommandError(f'Falha ao medir o boot:\n{completed.stderr[-2000:]}')
+        data = json.loads(completed.stdout.strip().splitlines()[-1])
+        phases = {'interpreter': round((data['started_at'] - spawned_at) * 1000, 2)}
+        phases.update(dict(data['phases']))
+        return {'phases': phases, 'imports': parse_importtime(completed.stderr)}
+
+    def report(self, result, baseline, top):
+        previous = baseline or {}
+        self.stdout.write(f'Boot ({result["handler"]}, mediana de {result["runs"]} execuções)')
+        for name, ms in result['phases'].items():
+            self.stdout.write(f'  {name:<14} {ms:8.1f} ms{self.change(ms, previous.get("phases", {}).get(name))}')
+        self.stdout.write(
+            f'  {"total":<14} {result["total_ms"]:8.1f} ms{self.change(result["total_ms"], previous.get("total_ms"))}'
+        )
+        self.stdout.write(f'Import por pacote (total {result["import_total_ms"]:.1f} ms)')
+        for name, ms in list(result['imports'].items())[:top]:
+            self.stdout.write(f'  {name:<24} {ms:8.1f} ms{self.change(ms, previous.get("imports", {}).get(name))}')
+
+    def change(self, current, before):
+        if not before:
+            return ''
+        return f'  ({(current - before) / before * 100:+.0f}%)'
+
+
+def parse_importtime(stderr):
+    """
+    Soma o tempo próprio (self) de cada módulo no pacote de topo dele.
+    """
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, _, name = line[len('import time:'):].split('|', 2)
+        if not self_us.strip().isdigit():
+            continue
+        package = name.strip().split('.')[0]
+        totals[package] = totals.get(package, 0) + int(self_us) / 1000
+    return {name: round(ms, 2) for name, ms in totals.items()}
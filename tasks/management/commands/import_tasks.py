@@ -0,0 +1,62 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.imports import IMPORT_CHUNK_SIZE, IMPORT_MAX_ERRORS, CSVImportError, import_tasks_csv
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa tarefas de um CSV no formato de export_csv para um usuário, '
+        'lendo em streaming e gravando em blocos. Mostra o progresso, os '
+        'erros por linha e a vazão.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Arquivo CSV exportado')
+        parser.add_argument('--user', required=True, help='Usuário que recebe as tarefas')
+        parser.add_argument(
+            '--chunk-size', type=int, default=IMPORT_CHUNK_SIZE,
+            help=f'Linhas por bloco/transação (padrão: {IMPORT_CHUNK_SIZE})'
+        )
+        parser.add_argument(
+            '--max-errors', type=int, default=IMPORT_MAX_ERRORS,
+            help=f'Erros por linha listados no fim (padrão: {IMPORT_MAX_ERRORS})'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'Usuário não encontrado: {options["user"]}')
+
+        try:
+            with open(options['path'], 'rb') as handle:
+                report = import_tasks_csv(
+                    user, handle, chunk_size=max(1, options['chunk_size']),
+                    max_errors=options['max_errors'], progress=self.progress,
+                )
+        except OSError as e:
+            raise CommandError(f'Não foi possível abrir {options["path"]}: {e}')
+        except CSVImportError as e:
+            if e.report:
+                self.summary(e.report)
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            self.stderr.write(f'linha {error["row"]}: {error["errors"]}')
+        if report['errors_truncated']:
+            self.stderr.write(f'... mais {report["failed"] - len(report["errors"])} linha(s) com erro')
+        self.summary(report)
+
+    def progress(self, report):
+        self.stdout.write(
+            f'{report["rows"]} linhas lidas, {report["created"]} criadas '
+            f'({report["rows_per_second"]} linhas/s)'
+        )
+
+    def summary(self, report):
+        self.stdout.write(
+            f'Importação: {report["rows"]} linhas, {report["created"]} criadas, '
+            f'{report["failed"]} com erro em {report["elapsed_s"]} s '
+            f'({report["rows_per_second"]} linhas/s)'
+        )
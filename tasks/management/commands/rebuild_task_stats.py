@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+
+from tasks.stats import rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói do zero os contadores de estatísticas de tarefas por usuário'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help='Usuários a reconstruir (padrão: todos)'
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+
+        rebuilt = 0
+        for user_id in users.values_list('pk', flat=True).iterator():
+            rebuild_user_stats(user_id)
+            rebuilt += 1
+
+        self.stdout.write(f'Estatísticas reconstruídas para {rebuilt} usuário(s)')
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from tasks.export_jobs import claim_next_job, expire_artifacts, run_export_job
+
+
+class Command(BaseCommand):
+    help = 'Processa a fila de exportações assíncronas de tarefas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Processa os jobs pendentes e sai, em vez de ficar em loop'
+        )
+
+    def handle(self, *args, **options):
+        poll = settings.EXPORT_WORKER_POLL_SECONDS
+        while True:
+            if not options['once']:
+                # Processo de longa duração: descarta conexões velhas/quebradas
+                close_old_connections()
+            expired = expire_artifacts()
+            if expired:
+                self.stdout.write(f'{expired} exportação(ões) expirada(s)')
+
+            processed = 0
+            while (job := claim_next_job()) is not None:
+                job = run_export_job(job)
+                processed += 1
+                self.stdout.write(f'Exportação {job.id}: {job.status} ({job.row_count} tarefas)')
+
+            if options['once']:
+                return
+            if not processed:
+                time.sleep(poll)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.health import ReadinessProbe, wait_for_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Espera o banco aceitar conexões (ex.: instância hibernada acordando), '
+        'com backoff exponencial entre as tentativas. Usa o mesmo teste de '
+        '/health/ready.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--timeout', type=float, default=90, help='Espera máxima em segundos (padrão: 90)')
+        parser.add_argument('--base-delay', type=float, default=1, help='Primeiro intervalo entre tentativas (padrão: 1)')
+        parser.add_argument('--max-delay', type=float, default=15, help='Intervalo máximo entre tentativas (padrão: 15)')
+
+    def handle(self, *args, **options):
+        probe = ReadinessProbe(base_delay=options['base_delay'], max_delay=options['max_delay'])
+        result = wait_for_database(probe, options['timeout'])
+        if not result['ready']:
+            raise CommandError(
+                f'Banco indisponível após {probe.failures} tentativa(s): {result["database"]["error"]}'
+            )
+        self.stdout.write(f'Banco disponível ({result["database"]["latency_ms"]} ms)')
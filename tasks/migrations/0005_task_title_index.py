@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'title', 'created_at'], name='task_user_title_created_idx'),
+        ),
+    ]
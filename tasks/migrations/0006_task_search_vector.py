@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:14
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_title_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # pg_trgm é opcional: sem a extensão, ou sem permissão para criá-la
+        # (bancos gerenciados), a busca curta usa icontains
+        migrations.RunSQL(
+            sql="""
+            DO $$
+            BEGIN
+                IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+                    BEGIN
+                        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+                        CREATE INDEX IF NOT EXISTS task_title_trgm_idx
+                            ON tasks_task USING gin (title gin_trgm_ops);
+                    EXCEPTION WHEN insufficient_privilege THEN
+                        NULL;
+                    END;
+                END IF;
+            END
+            $$;
+            """,
+            reverse_sql='DROP INDEX IF EXISTS task_title_trgm_idx;',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('title', config='portuguese', weight='A'), '||', django.contrib.postgres.search.SearchVector('title', config='english', weight='A'), django.contrib.postgres.search.SearchConfig('portuguese')), '||', django.contrib.postgres.search.SearchVector('description', config='portuguese', weight='B'), django.contrib.postgres.search.SearchConfig('portuguese')), '||', django.contrib.postgres.search.SearchVector('description', config='english', weight='B'), django.contrib.postgres.search.SearchConfig('portuguese')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='task_search_vector_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:18
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('format', models.CharField(choices=[('csv.gz', 'CSV (gzip)')], default='csv.gz', max_length=20)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('queued', 'Na fila'), ('running', 'Em andamento'), ('completed', 'Concluída'), ('failed', 'Falhou'), ('expired', 'Expirada')], default='queued', max_length=20)),
+                ('file_path', models.CharField(blank=True, max_length=500)),
+                ('row_count', models.IntegerField(blank=True, null=True)),
+                ('file_size', models.BigIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='exportjob_status_created_idx'), models.Index(fields=['user', 'created_at'], name='exportjob_user_created_idx')],
+            },
+        ),
+    ]
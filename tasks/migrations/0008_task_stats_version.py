@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_export_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usertaskstats',
+            name='version',
+            field=models.BigIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_stats_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('task_id', models.BigIntegerField()),
+                ('kind', models.CharField(choices=[('created', 'Criada'), ('completed', 'Concluída'), ('reopened', 'Reaberta'), ('deleted', 'Excluída')], max_length=20)),
+                ('occurred_at', models.DateTimeField()),
+                ('task_created_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='dailytaskstats',
+            name='completions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completed_at__isnull', False)), fields=['user', 'completed_at'], name='task_user_completed_idx'),
+        ),
+        migrations.AddField(
+            model_name='taskevent',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_events', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='taskevent',
+            index=models.Index(fields=['user', 'kind', 'occurred_at'], name='taskevent_user_kind_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskevent',
+            index=models.Index(fields=['task_id', 'occurred_at'], name='taskevent_task_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Preenche as linhas horárias dos usuários já acompanhados; os demais são
+# reconstruídos na próxima leitura, como antes
+BACKFILL_SQL = """
+INSERT INTO tasks_hourlytaskstats (user_id, hour, created, completed, completions)
+SELECT user_id, hour, SUM(created), SUM(completed), SUM(completions)
+FROM (
+    SELECT user_id, date_trunc('hour', created_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS hour,
+           1 AS created, (status = 'completed')::int AS completed, 0 AS completions
+    FROM tasks_task
+    UNION ALL
+    SELECT user_id, date_trunc('hour', completed_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+           0, 0, 1
+    FROM tasks_task
+    WHERE status = 'completed' AND completed_at IS NOT NULL
+) AS counts
+WHERE user_id IN (SELECT user_id FROM tasks_usertaskstats)
+GROUP BY user_id, hour
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_task_events'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HourlyTaskStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('created', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('completions', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hourly_task_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'hour'), name='hourly_task_stats_user_hour_uniq')],
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
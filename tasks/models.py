@@ -1,5 +1,24 @@
-from django.db import models
+import uuid
+
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+
+
+# Vetor de busca em português e inglês: título com peso A, descrição com peso B
+TASK_SEARCH_VECTOR = (
+    SearchVector('title', config='portuguese', weight='A')
+    + SearchVector('title', config='english', weight='A')
+    + SearchVector('description', config='portuguese', weight='B')
+    + SearchVector('description', config='english', weight='B')
+)
+
+
+class TaskManager(models.Manager):
+    def get_queryset(self):
+        # O vetor de busca só é usado dentro do banco; não precisa trafegar
+        return super().get_queryset().defer('search_vector')
 
 
 class Task(models.Model):
@@ -14,7 +33,176 @@ class Task(models.Model):
         default='pending'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Quando a tarefa foi concluída (nulo se pendente); o histórico
+    # completo das transições fica em TaskEvent
+    completed_at = models.DateTimeField(null=True, blank=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    search_vector = models.GeneratedField(
+        expression=TASK_SEARCH_VECTOR,
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = TaskManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='task_user_created_idx'),
+            models.Index(fields=['user', 'status', 'created_at'], name='task_user_status_created_idx'),
+            models.Index(fields=['user', 'title', 'created_at'], name='task_user_title_created_idx'),
+            GinIndex(fields=['search_vector'], name='task_search_vector_idx'),
+            models.Index(
+                fields=['user', 'completed_at'], name='task_user_completed_idx',
+                condition=models.Q(completed_at__isnull=False),
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # A tarefa e os contadores (post_save) entram na mesma transação,
+        # para rebuild_user_stats nunca ver uma sem os outros
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Guarda o status carregado para detectar transições no post_save
+        instance._loaded_status = instance.__dict__.get('status')
+        instance._loaded_completed_at = instance.__dict__.get('completed_at')
+        return instance
+
+    def __str__(self):
+        return self.title
+
+
+class UserTaskStats(models.Model):
+    """
+    Contadores de tarefas por usuário, mantidos incrementalmente a cada escrita.
+
+    A existência da linha indica que o usuário está sendo acompanhado; se ela
+    não existir, os contadores são reconstruídos na próxima leitura.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='task_stats')
+    total = models.IntegerField(default=0)
+    pending = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    # Incrementado a cada escrita nas tarefas do usuário (base dos ETags)
+    version = models.BigIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Estatísticas de {self.user_id}'
+
+
+class DailyTaskStats(models.Model):
+    """
+    Tarefas criadas por dia e quantas delas estão concluídas, por usuário.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_task_stats')
+    day = models.DateField()
+    created = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    # Tarefas concluídas neste dia (por completed_at), criadas em qualquer dia
+    completions = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day'], name='daily_task_stats_user_day_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} {self.day}'
+
+
+class HourlyTaskStats(models.Model):
+    """
+    Os mesmos contadores de DailyTaskStats por hora (início da hora em UTC).
+
+    Os dias de qualquer fuso com deslocamento em horas cheias são somas
+    dessas linhas; é daqui que a série temporal lê fora do fuso do projeto.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='hourly_task_stats')
+    hour = models.DateTimeField()
+    created = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    completions = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'hour'], name='hourly_task_stats_user_hour_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} {self.hour}'
+
+
+class TaskEvent(models.Model):
+    """
+    Log só de inserção das transições de cada tarefa.
+
+    Fica fora de Task para a linha quente continuar pequena. task_id não é
+    chave estrangeira, então o histórico sobrevive à exclusão da tarefa;
+    task_created_at é copiado para que lead time e cycle time saiam do
+    próprio log, sem join com Task.
+    """
+    KIND_CHOICES = [
+        ('created', 'Criada'),
+        ('completed', 'Concluída'),
+        ('reopened', 'Reaberta'),
+        ('deleted', 'Excluída'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_events')
+    task_id = models.BigIntegerField()
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    occurred_at = models.DateTimeField()
+    task_created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'kind', 'occurred_at'], name='taskevent_user_kind_idx'),
+            models.Index(fields=['task_id', 'occurred_at'], name='taskevent_task_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.task_id} {self.kind} {self.occurred_at}'
+
+
+class ExportJob(models.Model):
+    """
+    Exportação assíncrona de tarefas, processada pelo comando run_export_worker.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Na fila'),
+        ('running', 'Em andamento'),
+        ('completed', 'Concluída'),
+        ('failed', 'Falhou'),
+        ('expired', 'Expirada'),
+    ]
+    FORMAT_CHOICES = [
+        ('csv.gz', 'CSV (gzip)'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='export_jobs')
+    format = models.CharField(max_length=20, choices=FORMAT_CHOICES, default='csv.gz')
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    file_path = models.CharField(max_length=500, blank=True)
+    row_count = models.IntegerField(null=True, blank=True)
+    file_size = models.BigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='exportjob_status_created_idx'),
+            models.Index(fields=['user', 'created_at'], name='exportjob_user_created_idx'),
+        ]
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f'{self.id} ({self.status})'
@@ -0,0 +1,193 @@
+import base64
+import json
+import math
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .filters import get_ordering, ordering_keys
+
+
+def parse_position_value(name, value):
+    """
+    Valor de um campo da posição do cursor, convertido para o tipo da
+    coluna. Levanta ValueError se o valor não servir para o campo.
+    """
+    if name == 'created_at':
+        if not isinstance(value, str):
+            raise ValueError
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            raise ValueError
+        return parsed
+    if name in ('id', 'priority_rank'):
+        # bool é subclasse de int, mas true/false não são ids
+        if type(value) is not int:
+            raise ValueError
+        return value
+    if name == 'rank':
+        if type(value) not in (int, float) or not math.isfinite(value):
+            raise ValueError
+        return float(value)
+    if name in ('title', 'status'):
+        if not isinstance(value, str):
+            raise ValueError
+        return value
+    raise ValueError
+
+
+class TaskCursorPagination(BasePagination):
+    """
+    Paginação por cursor (keyset) para tarefas.
+
+    A chave é a ordenação do queryset (ordering_keys: campo pedido,
+    created_at, id; ou -rank, -created_at, -id na busca textual), então
+    cada página é uma leitura por faixa de índice a partir da última linha
+    vista, sem OFFSET. A paginação é ativada pelos parâmetros cursor ou page_size; a contagem total só é
+    calculada com count=true.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+    page_size = 50
+    max_page_size = 500
+    invalid_cursor_message = 'Cursor inválido'
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.prepare(queryset, request)
+        if page_queryset is None:
+            return None
+        if self.count_requested:
+            self.count = queryset.count()
+        return self.finish(list(page_queryset))
+
+    def prepare(self, queryset, request):
+        """
+        Lê os parâmetros e devolve o queryset da página (uma linha a mais,
+        para saber se há próxima), ou None se a paginação não foi pedida.
+        """
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        # A chave do cursor é a ordenação completa já aplicada ao queryset
+        self.keys = list(queryset.query.order_by) or ordering_keys(get_ordering(request.query_params))
+        self.count = None
+        self.count_requested = request.query_params.get(self.count_query_param) == 'true'
+
+        position, self.reverse = self.decode_cursor(request)
+        self.has_cursor = position is not None
+        keys = self.flip(self.keys) if self.reverse else self.keys
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.after(keys, position))
+            except (TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+        return queryset.order_by(*keys)[:self.page_size + 1]
+
+    def finish(self, rows):
+        self.has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+        self.rows = rows
+        return rows
+
+    def flip(self, keys):
+        return [key[1:] if key.startswith('-') else '-' + key for key in keys]
+
+    def after(self, keys, position):
+        """
+        Condição "linha depois de position" na ordem de keys.
+
+        Equivale à comparação de tupla (k1, k2, ...) > (v1, v2, ...). O filtro
+        redundante k1 >= v1 limita a faixa do índice para o PostgreSQL.
+        """
+        names = [key.lstrip('-') for key in keys]
+        condition = Q()
+        for index, key in enumerate(keys):
+            lookup = 'lt' if key.startswith('-') else 'gt'
+            branch = Q(**{f'{names[index]}__{lookup}': position[index]})
+            for prior in range(index):
+                branch &= Q(**{names[prior]: position[prior]})
+            condition |= branch
+        first = 'lte' if keys[0].startswith('-') else 'gte'
+        return Q(**{f'{names[0]}__{first}': position[0]}) & condition
+
+    def position_of(self, row):
+        # Linhas podem ser instâncias de Task ou dicts de task_values()
+        if isinstance(row, dict):
+            return [row[key.lstrip('-')] for key in self.keys]
+        return [getattr(row, key.lstrip('-')) for key in self.keys]
+
+    def encode_cursor(self, row, reverse):
+        values = [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in self.position_of(row)
+        ]
+        payload = json.dumps({'p': values, 'r': int(reverse)}, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values = payload['p']
+            if not isinstance(values, list) or len(values) != len(self.keys):
+                raise ValueError
+            position = [
+                parse_position_value(key.lstrip('-'), value)
+                for key, value in zip(self.keys, values)
+            ]
+            return position, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.rows:
+            return None
+        if self.reverse or self.has_more:
+            return self.encode_cursor(self.rows[-1], reverse=False)
+        return None
+
+    def get_previous_link(self):
+        if not self.rows:
+            if self.has_cursor:
+                return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+            return None
+        if (self.reverse and self.has_more) or (not self.reverse and self.has_cursor):
+            return self.encode_cursor(self.rows[0], reverse=True)
+        return None
+
+    def get_paginated_data(self, data):
+        paginated = {
+            'results': data,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        }
+        if self.count is not None:
+            paginated['count'] = self.count
+        return paginated
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
@@ -0,0 +1,291 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+from core.metrics import get_metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+# Fallback: cache local de frases reais da Quotable API
+FALLBACK_QUOTES = [
+    {"_id": "YbIkDkitaO", "content": "Life is what happens when you're busy making other plans.", "author": "John Lennon", "tags": ["Famous Quotes"], "length": 58},
+    {"_id": "ZvmwOvR0QI", "content": "The only way to do great work is to love what you do.", "author": "Steve Jobs", "tags": ["Famous Quotes"], "length": 54},
+    {"_id": "kPPCBjlg", "content": "In the end, we will remember not the words of our enemies, but the silence of our friends.", "author": "Martin Luther King Jr.", "tags": ["Famous Quotes"], "length": 89},
+    {"_id": "EhPdlmjZ9ON", "content": "Intuition will tell the thinking mind where to look next.", "author": "Jonas Salk", "tags": ["Famous Quotes"], "length": 57},
+    {"_id": "mEOw7jZ4OY", "content": "Success is not final, failure is not fatal: it is the courage to continue that counts.", "author": "Winston Churchill", "tags": ["Famous Quotes"], "length": 83},
+    {"_id": "X8nGqg5OxI", "content": "The future belongs to those who believe in the beauty of their dreams.", "author": "Eleanor Roosevelt", "tags": ["Famous Quotes"], "length": 70},
+    {"_id": "bQJl8Z6wQ5", "content": "Innovation distinguishes between a leader and a follower.", "author": "Steve Jobs", "tags": ["Famous Quotes"], "length": 56},
+    {"_id": "pQXf9Y8xR2", "content": "Be yourself; everyone else is already taken.", "author": "Oscar Wilde", "tags": ["Famous Quotes"], "length": 42},
+    {"_id": "nK8fQ9Rx", "content": "Two things are infinite: the universe and human stupidity; and I'm not sure about the universe.", "author": "Albert Einstein", "tags": ["Famous Quotes"], "length": 94},
+    {"_id": "mX7dR4Wp", "content": "A room without books is like a body without a soul.", "author": "Marcus Tullius Cicero", "tags": ["Famous Quotes"], "length": 49},
+    {"_id": "hL9sK2Nt", "content": "You only live once, but if you do it right, once is enough.", "author": "Mae West", "tags": ["Famous Quotes"], "length": 58},
+    {"_id": "fG4pM8Qv", "content": "If you want to know what a man's like, take a good look at how he treats his inferiors.", "author": "J.K. Rowling", "tags": ["Famous Quotes"], "length": 85},
+    {"_id": "eC3hN7Bs", "content": "The greatest glory in living lies not in never falling, but in rising every time we fall.", "author": "Nelson Mandela", "tags": ["Famous Quotes"], "length": 87},
+    {"_id": "dB2gM6Ar", "content": "The way to get started is to quit talking and begin doing.", "author": "Walt Disney", "tags": ["Famous Quotes"], "length": 56},
+    {"_id": "aZ1fL5Dq", "content": "Your time is limited, so don't waste it living someone else's life.", "author": "Steve Jobs", "tags": ["Famous Quotes"], "length": 66}
+]
+
+
+class CircuitBreaker:
+    """
+    Interrompe as chamadas ao serviço externo após falhas seguidas.
+
+    Depois de failure_threshold falhas o circuito abre e allow() devolve
+    False durante cooldown segundos; passado esse tempo uma tentativa é
+    liberada (meio-aberto) e o sucesso fecha o circuito de novo.
+    """
+
+    def __init__(self, failure_threshold=3, cooldown=60, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if self.clock() - self.opened_at >= self.cooldown:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        return self.state != 'open'
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+
+
+class QuotePool:
+    """
+    Frases da Quotable API guardadas em memória e reabastecidas em lotes por
+    uma thread em segundo plano.
+
+    get() nunca espera pela rede: entrega uma frase do pool (hit) ou, se ele
+    estiver vazio, uma de FALLBACK_QUOTES (miss). Quando restam menos de
+    low_watermark frases, um novo lote é buscado em segundo plano, a menos
+    que o circuit breaker esteja aberto.
+    """
+
+    def __init__(self, url, batch_size=20, low_watermark=5, timeout=5, breaker=None):
+        self.url = url
+        self.batch_size = batch_size
+        self.low_watermark = low_watermark
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.hits = 0
+        self.misses = 0
+        self.upstream_calls = 0
+        self._quotes = deque()
+        self._lock = threading.Lock()
+        self._refill_thread = None
+        self._refill_task = None
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            url=settings.QUOTES_API_URL,
+            batch_size=settings.QUOTES_POOL_BATCH_SIZE,
+            low_watermark=settings.QUOTES_POOL_LOW_WATERMARK,
+            timeout=settings.QUOTES_API_TIMEOUT,
+            breaker=CircuitBreaker(
+                failure_threshold=settings.QUOTES_BREAKER_THRESHOLD,
+                cooldown=settings.QUOTES_BREAKER_COOLDOWN,
+            ),
+        )
+
+    def take(self):
+        """
+        Tira uma frase do pool: (frase ou None, precisa_reabastecer).
+        """
+        with self._lock:
+            quote = self._quotes.popleft() if self._quotes else None
+            remaining = len(self._quotes)
+            if quote is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return quote, remaining < self.low_watermark
+
+    def get(self):
+        """
+        Devolve (frase, veio_do_pool).
+        """
+        quote, low = self.take()
+        if low:
+            self.refill_in_background()
+        if quote is None:
+            return random.choice(FALLBACK_QUOTES), False
+        return quote, True
+
+    async def aget(self):
+        """
+        get() para views assíncronas: o reabastecimento roda como task no
+        event loop (arefill) em vez de numa thread.
+        """
+        quote, low = self.take()
+        if low:
+            self.refill_in_event_loop()
+        if quote is None:
+            return random.choice(FALLBACK_QUOTES), False
+        return quote, True
+
+    def refilling(self):
+        thread, task = self._refill_thread, self._refill_task
+        return (thread is not None and thread.is_alive()) or (task is not None and not task.done())
+
+    def refill_in_background(self):
+        with self._lock:
+            if self.refilling() or not self.breaker.allow():
+                return
+            self._refill_thread = threading.Thread(target=self.refill, name='quote-pool-refill', daemon=True)
+            self._refill_thread.start()
+
+    def refill_in_event_loop(self):
+        with self._lock:
+            if self.refilling() or not self.breaker.allow():
+                return
+            self._refill_task = asyncio.get_running_loop().create_task(self.arefill())
+
+    def wait_for_refill(self, timeout=None):
+        thread = self._refill_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def refill(self):
+        """
+        Busca um lote de frases no serviço externo (bloqueante).
+        """
+        if not self.start_upstream_call():
+            return 0
+        import requests
+
+        start = time.perf_counter()
+        try:
+            response = requests.get(self.url, params={'limit': self.batch_size}, timeout=self.timeout)
+            response.raise_for_status()
+            payload = response.json()
+        except Exception as e:
+            return self.record_upstream_failure(e, start)
+        return self.record_upstream_success(payload, start)
+
+    async def arefill(self):
+        """
+        refill() com cliente HTTP assíncrono (httpx), sem bloquear o event loop.
+        """
+        if not self.start_upstream_call():
+            return 0
+        import httpx
+
+        from .diagnostics import ssl_context
+
+        start = time.perf_counter()
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout, verify=ssl_context()) as client:
+                response = await client.get(self.url, params={'limit': self.batch_size})
+                response.raise_for_status()
+                payload = response.json()
+        except Exception as e:
+            return self.record_upstream_failure(e, start)
+        return self.record_upstream_success(payload, start)
+
+    def start_upstream_call(self):
+        if not self.breaker.allow():
+            get_metrics().inc('quote_api_calls_total', {'result': 'circuit_open'})
+            return False
+        self.upstream_calls += 1
+        return True
+
+    def record_upstream_failure(self, error, start):
+        self.breaker.record_failure()
+        metrics = get_metrics()
+        metrics.inc('quote_api_calls_total', {'result': 'error'})
+        metrics.observe('quote_api_call_duration_seconds', time.perf_counter() - start)
+        logger.warning('Quotable API falhou: %s', error)
+        return 0
+
+    def record_upstream_success(self, payload, start):
+        quotes = [payload] if isinstance(payload, dict) else payload
+        if not isinstance(quotes, list):
+            quotes = []
+        quotes = [quote for quote in quotes if isinstance(quote, dict) and quote.get('content')]
+        if not quotes:
+            # Resposta fora do formato (ou sem frases): conta como falha para
+            # o breaker, senão o pool vazio pediria de novo a cada acesso
+            return self.record_upstream_failure(f'resposta sem frases: {str(payload)[:100]}', start)
+        self.breaker.record_success()
+        metrics = get_metrics()
+        metrics.inc('quote_api_calls_total', {'result': 'success'})
+        metrics.observe('quote_api_call_duration_seconds', time.perf_counter() - start)
+        with self._lock:
+            self._quotes.extend(quotes)
+        return len(quotes)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else None,
+            'pool_size': len(self._quotes),
+            'upstream_calls': self.upstream_calls,
+            'breaker_state': self.breaker.state,
+            'breaker_failures': self.breaker.failures,
+        }
+
+
+def quote_data(quote, from_pool):
+    """
+    Corpo da resposta de /api/tasks/motivacional/.
+    """
+    data = {
+        'content': quote.get('content', ''),
+        'author': quote.get('author', ''),
+        'tag': quote['tags'][0] if quote.get('tags') else 'inspiração',
+        'success': True,
+        'source': 'QUOTABLE_API' if from_pool else 'QUOTABLE_API_CACHED',
+        'api_id': quote.get('_id', ''),
+        'length': quote.get('length', 0)
+    }
+    if not from_pool:
+        data['message'] = 'Dados reais da Quotable API (cache local por limitação Railway)'
+    return data
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_quote_pool():
+    """
+    Pool do processo, criado sob demanda (depois do fork dos workers).
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = QuotePool.from_settings()
+    return _pool
+
+
+def reset_quote_pool():
+    global _pool
+    with _pool_lock:
+        _pool = None
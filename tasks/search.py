@@ -0,0 +1,96 @@
+import re
+
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db import connections
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast, Greatest
+
+
+SEARCH_CONFIGS = ('portuguese', 'english')
+
+# Termos mais curtos que isso não geram lexemas úteis: usa o fallback
+MIN_FULL_TEXT_LENGTH = 3
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_STOP = '</mark>'
+
+_trigram_available = {}
+
+
+def trigram_available(using='default'):
+    """
+    Indica se a extensão pg_trgm está instalada no banco (cache por processo).
+    """
+    if using not in _trigram_available:
+        with connections[using].cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_available[using] = cursor.fetchone() is not None
+    return _trigram_available[using]
+
+
+def prefix_query(term):
+    """
+    tsquery "raw" que casa lexemas começando com cada palavra do termo
+    (ex.: "proj estud" -> 'proj':* & 'estud':*), para termos parciais.
+    """
+    words = re.findall(r'\w+', term.lower())
+    return ' & '.join("'{}':*".format(word) for word in words)
+
+
+def build_search_query(term):
+    """
+    Consulta em português OU inglês (sintaxe websearch), mais prefixos.
+    """
+    query = None
+    for config in SEARCH_CONFIGS:
+        config_query = SearchQuery(term, config=config, search_type='websearch')
+        query = config_query if query is None else query | config_query
+    prefixes = prefix_query(term)
+    if prefixes:
+        query |= SearchQuery(prefixes, config='simple', search_type='raw')
+    return query
+
+
+def search_tasks(queryset, term, highlight=False):
+    """
+    Filtra tarefas pelo termo usando o vetor de busca (índice GIN).
+
+    Termos com pelo menos MIN_FULL_TEXT_LENGTH caracteres usam busca
+    full-text e recebem a anotação rank (relevância); com pg_trgm instalado,
+    títulos parecidos por trigramas também entram. Termos mais curtos usam
+    icontains, sem rank. Com highlight=True, anota title_highlight e
+    description_highlight com os trechos encontrados marcados.
+    """
+    term = term.strip()
+    query = build_search_query(term)
+
+    if len(term) < MIN_FULL_TEXT_LENGTH:
+        queryset = queryset.filter(
+            Q(title__icontains=term) |
+            Q(description__icontains=term)
+        )
+    else:
+        match = Q(search_vector=query)
+        rank = SearchRank(F('search_vector'), query)
+        if trigram_available(queryset.db):
+            match |= Q(title__trigram_word_similar=term)
+            rank = Greatest(rank, TrigramWordSimilarity(term, 'title'))
+        # float8 para que o valor volte idêntico em cursores de paginação
+        queryset = queryset.annotate(rank=Cast(rank, FloatField())).filter(match)
+
+    if highlight and query is not None:
+        options = {
+            'config': SEARCH_CONFIGS[0],
+            'start_sel': HIGHLIGHT_START,
+            'stop_sel': HIGHLIGHT_STOP,
+        }
+        queryset = queryset.annotate(
+            title_highlight=SearchHeadline('title', query, highlight_all=True, **options),
+            description_highlight=SearchHeadline('description', query, max_words=35, min_words=15, **options),
+        )
+    return queryset
@@ -1,11 +1,90 @@
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Task
+from .models import ExportJob, Task, TaskEvent
 
 class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
-        fields = ['id', 'title', 'description', 'status', 'created_at', 'user']
-        read_only_fields = ['id', 'created_at', 'user']
+        fields = ['id', 'title', 'description', 'status', 'created_at', 'completed_at', 'user']
+        read_only_fields = ['id', 'created_at', 'completed_at', 'user']
+
+# Campos de TaskSerializer, na ordem de saída, e a coluna de cada um
+TASK_FIELDS = ('id', 'title', 'description', 'status', 'created_at', 'completed_at', 'user')
+DATETIME_FIELDS = ('created_at', 'completed_at')
+TASK_COLUMNS = {field: field for field in TASK_FIELDS}
+TASK_COLUMNS['user'] = 'user_id'
+HIGHLIGHT_COLUMNS = ('title_highlight', 'description_highlight')
+
+
+def parse_task_fields(value):
+    """
+    Campos pedidos em ?fields=id,title,status, na ordem de TaskSerializer.
+
+    Sem o parâmetro, retorna todos os campos.
+    """
+    if not value:
+        return TASK_FIELDS
+    requested = {field.strip() for field in value.split(',') if field.strip()}
+    unknown = sorted(requested - set(TASK_FIELDS))
+    if unknown or not requested:
+        raise serializers.ValidationError({
+            'fields': f'Campos inválidos: {", ".join(unknown)}. Disponíveis: {", ".join(TASK_FIELDS)}'
+        })
+    return tuple(field for field in TASK_FIELDS if field in requested)
+
+
+def task_values(queryset, fields=TASK_FIELDS):
+    """
+    Queryset de linhas (dicts) só com as colunas necessárias: os campos
+    pedidos, as chaves da ordenação (usadas pelo cursor) e os trechos de
+    highlight, quando anotados.
+    """
+    columns = [TASK_COLUMNS[field] for field in fields]
+    for key in queryset.query.order_by:
+        name = key.lstrip('-')
+        if name not in columns:
+            columns.append(name)
+    if HIGHLIGHT_COLUMNS[0] in queryset.query.annotations:
+        columns.extend(HIGHLIGHT_COLUMNS)
+    return queryset.values(*columns)
+
+
+def format_datetime(value, tz):
+    """
+    Mesma representação de serializers.DateTimeField: fuso atual (tz),
+    ISO 8601 e 'Z' para UTC.
+    """
+    value = value.astimezone(tz).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def serialize_task_rows(rows, fields=TASK_FIELDS):
+    """
+    Serializa linhas de task_values() sem instanciar Task nem passar pelos
+    campos do DRF. A saída é idêntica à de TaskSerializer para os mesmos
+    campos, com o dict 'highlight' quando a busca pediu trechos.
+    """
+    columns = [(field, TASK_COLUMNS[field]) for field in fields]
+    # Lido uma vez: get_current_timezone() por linha custa mais que o resto
+    tz = timezone.get_current_timezone()
+    data = []
+    for row in rows:
+        item = {}
+        for field, column in columns:
+            value = row[column]
+            if field in DATETIME_FIELDS and value is not None:
+                value = format_datetime(value, tz)
+            item[field] = value
+        if HIGHLIGHT_COLUMNS[0] in row:
+            item['highlight'] = {
+                'title': row['title_highlight'],
+                'description': row['description_highlight'],
+            }
+        data.append(item)
+    return data
+
 
 class TaskUpdateSerializer(serializers.ModelSerializer):
     title = serializers.CharField(required=False, allow_blank=True)
@@ -18,4 +97,30 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
             'title': {'required': False},
             'description': {'required': False},
             'status': {'required': False}
-        }
\ No newline at end of file
+        }
+
+
+class TaskEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TaskEvent
+        fields = ['kind', 'occurred_at']
+        read_only_fields = fields
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            'id', 'format', 'params', 'status', 'row_count', 'file_size', 'error',
+            'created_at', 'started_at', 'finished_at', 'expires_at', 'download_url'
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != 'completed':
+            return None
+        url = f'/api/exports/{obj.id}/download/'
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
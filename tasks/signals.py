@@ -0,0 +1,68 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .authentication import bump_user_version, get_user_cache
+from .events import (
+    apply_completion, creation_events, record_events, stamp_completed_on_creation, task_event,
+)
+from .models import Task
+from .stats import StatsDelta
+
+
+@receiver(pre_save, sender=Task)
+def set_completed_at(sender, instance, raw=False, **kwargs):
+    """
+    Mantém completed_at de acordo com o status a cada save() de uma tarefa
+    existente; as novas recebem o valor em post_save, junto com created_at.
+    """
+    if raw or instance._state.adding:
+        return
+    old_status = getattr(instance, '_loaded_status', None) or instance.status
+    instance._transition = apply_completion(instance, old_status, timezone.now())
+
+
+@receiver(post_save, sender=Task)
+def update_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Mantém os contadores de UserTaskStats/DailyTaskStats e o log de
+    eventos a cada save().
+    """
+    if raw:
+        return
+    if created:
+        stamp_completed_on_creation([instance])
+        StatsDelta().created(instance).apply()
+        record_events(creation_events(instance))
+    else:
+        old_status = getattr(instance, '_loaded_status', None) or instance.status
+        old_completed_at = getattr(instance, '_loaded_completed_at', None)
+        StatsDelta().status_changed(instance, old_status, old_completed_at).apply()
+        transition = getattr(instance, '_transition', None)
+        if transition:
+            record_events([task_event(instance, transition, instance.completed_at or timezone.now())])
+    instance._loaded_status = instance.status
+    instance._loaded_completed_at = instance.completed_at
+    instance._transition = None
+
+
+@receiver(post_delete, sender=Task)
+def update_stats_on_delete(sender, instance, origin=None, **kwargs):
+    StatsDelta().deleted(instance).apply()
+    # Na exclusão do próprio usuário, o log dele é apagado junto
+    origin_model = getattr(origin, 'model', type(origin))
+    if not issubclass(origin_model, User):
+        record_events([task_event(instance, 'deleted', timezone.now())])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_cached_user(sender, instance, **kwargs):
+    """
+    Invalida o usuário no cache de autenticação a cada alteração
+    (desativação, troca de senha) ou exclusão: troca a versão dele, o que
+    vale para todos os workers, e remove a entrada deste processo.
+    """
+    bump_user_version(instance.pk)
+    get_user_cache().delete(instance.pk)
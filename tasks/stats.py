@@ -0,0 +1,323 @@
+from collections import defaultdict
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connection, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .cache import invalidate_user_cache, pin_to_primary
+from .filters import start_of_day
+from .models import DailyTaskStats, HourlyTaskStats, Task, UserTaskStats
+
+
+STATUS_COUNTERS = ('pending', 'completed')
+
+# Primeira chave do advisory lock por usuário de lock_user_stats
+STATS_LOCK_NAMESPACE = 7301
+
+
+class StatsDelta:
+    """
+    Acumula variações de contadores por usuário antes de gravá-las.
+
+    Permite que escritas em lote (vários Tasks de uma vez) virem um único
+    UPDATE por usuário e um por dia e hora afetados.
+    """
+
+    def __init__(self):
+        # Todo usuário presente aqui tem a versão incrementada em apply()
+        self.users = defaultdict(lambda: {
+            'total': 0,
+            'pending': 0,
+            'completed': 0,
+            'daily': defaultdict(lambda: {'created': 0, 'completed': 0, 'completions': 0}),
+            'hourly': defaultdict(lambda: {'created': 0, 'completed': 0, 'completions': 0}),
+        })
+
+    def buckets(self, user_id, moment):
+        """
+        Linhas diária e horária que contam um instante (created_at ou
+        completed_at).
+        """
+        entry = self.users[user_id]
+        return entry['daily'][timezone.localdate(moment)], entry['hourly'][hour_start(moment)]
+
+    def created(self, task, sign=1):
+        entry = self.users[task.user_id]
+        entry['total'] += sign
+        if task.status in STATUS_COUNTERS:
+            entry[task.status] += sign
+        for row in self.buckets(task.user_id, task.created_at):
+            row['created'] += sign
+            if task.status == 'completed':
+                row['completed'] += sign
+        if task.status == 'completed' and task.completed_at:
+            self.completions_moved(task.user_id, task.completed_at, sign)
+        return self
+
+    def deleted(self, task):
+        return self.created(task, sign=-1)
+
+    def status_changed(self, task, old_status, old_completed_at=None):
+        """
+        task passou de old_status para o status atual; old_completed_at é a
+        conclusão anterior, descontada do seu dia se a tarefa foi reaberta.
+        """
+        if old_status != task.status:
+            if old_status == 'completed' and old_completed_at:
+                self.completions_moved(task.user_id, old_completed_at, -1)
+            if task.status == 'completed' and task.completed_at:
+                self.completions_moved(task.user_id, task.completed_at, 1)
+        return self.status_moved(task.user_id, task.created_at, old_status, task.status)
+
+    def status_moved(self, user_id, created_at, old_status, new_status, count=1):
+        """
+        count tarefas criadas em created_at (ou na hora que começa ali)
+        passaram de old_status para new_status.
+        """
+        entry = self.users[user_id]
+        if old_status == new_status:
+            return self
+        if old_status in STATUS_COUNTERS:
+            entry[old_status] -= count
+        if new_status in STATUS_COUNTERS:
+            entry[new_status] += count
+        for row in self.buckets(user_id, created_at):
+            row['completed'] += count * (
+                (new_status == 'completed') - (old_status == 'completed')
+            )
+        return self
+
+    def completions_moved(self, user_id, completed_at, count):
+        """
+        count conclusões a mais (ou a menos, se negativo) em completed_at.
+        """
+        for row in self.buckets(user_id, completed_at):
+            row['completions'] += count
+        return self
+
+    def apply(self):
+        for user_id, entry in self.users.items():
+            apply_user_delta(user_id, entry)
+
+
+def hour_start(moment):
+    """
+    Início, em UTC, da hora de moment (chave de HourlyTaskStats).
+    """
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def apply_user_delta(user_id, entry):
+    """
+    Grava as variações de um usuário com UPDATEs relativos (F()) e
+    incrementa a versão, mesmo quando nenhum contador muda. Também invalida
+    o cache de respostas do usuário e fixa as leituras dele no banco
+    principal por alguns segundos (pin_to_primary).
+
+    Usuários sem linha em UserTaskStats ainda não são acompanhados: nada é
+    gravado e os contadores são reconstruídos na próxima leitura.
+    """
+    changes = {
+        field: F(field) + entry[field]
+        for field in ('total',) + STATUS_COUNTERS
+        if entry[field]
+    }
+    invalidate_user_cache(user_id)
+    pin_to_primary(user_id)
+    with transaction.atomic():
+        tracked = UserTaskStats.objects.filter(user_id=user_id).update(
+            version=F('version') + 1, updated_at=timezone.now(), **changes
+        )
+        if not tracked:
+            # Uma reconstrução em andamento ainda não gravou a linha e não
+            # viu estas tarefas: espera por ela e aplica sobre o resultado
+            lock_user_stats(user_id)
+            tracked = UserTaskStats.objects.filter(user_id=user_id).update(
+                version=F('version') + 1, updated_at=timezone.now(), **changes
+            )
+        if not tracked:
+            return
+        for day, deltas in entry['daily'].items():
+            _bump_row(DailyTaskStats, user_id, {'day': day}, deltas)
+        for hour, deltas in entry['hourly'].items():
+            _bump_row(HourlyTaskStats, user_id, {'hour': hour}, deltas)
+
+
+def _bump_row(model, user_id, key, deltas):
+    changes = {field: F(field) + value for field, value in deltas.items() if value}
+    if not changes:
+        return
+    rows = model.objects.filter(user_id=user_id, **key)
+    if rows.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(user_id=user_id, **key, **deltas)
+    except IntegrityError:
+        rows.update(**changes)
+
+
+def lock_user_stats(user_id):
+    """
+    Advisory lock dos contadores do usuário até o fim da transação atual.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)', (STATS_LOCK_NAMESPACE, user_id))
+
+
+def rebuild_user_stats(user_id):
+    """
+    Recalcula do zero os contadores de um usuário a partir da tabela Task.
+
+    As linhas diárias são somas das horárias: o fuso do projeto tem
+    deslocamento em horas cheias.
+
+    Antes de agregar, trava os contadores do usuário (o advisory lock e a
+    linha, se existir): escritas que já atualizaram a linha terminam antes
+    e entram na agregação; as seguintes esperam e somam sobre o resultado
+    (apply_user_delta). Como Task.save(), cada escrita grava a tarefa e os
+    contadores na mesma transação.
+    """
+    tasks = Task.objects.filter(user_id=user_id)
+    with transaction.atomic():
+        lock_user_stats(user_id)
+        list(UserTaskStats.objects.select_for_update().filter(user_id=user_id))
+        totals = tasks.aggregate(
+            total=Count('id'),
+            pending=Count('id', filter=Q(status='pending')),
+            completed=Count('id', filter=Q(status='completed')),
+        )
+        hourly = defaultdict(lambda: {'created': 0, 'completed': 0, 'completions': 0})
+        created = (
+            tasks.annotate(hour=TruncHour('created_at', tzinfo=dt_timezone.utc))
+            .values('hour')
+            .annotate(created=Count('id'), completed=Count('id', filter=Q(status='completed')))
+            .order_by()
+        )
+        for row in created:
+            hourly[row['hour']].update(created=row['created'], completed=row['completed'])
+        completions = (
+            tasks.filter(status='completed', completed_at__isnull=False)
+            .annotate(hour=TruncHour('completed_at', tzinfo=dt_timezone.utc))
+            .values('hour')
+            .annotate(completions=Count('id'))
+            .order_by()
+        )
+        for row in completions:
+            hourly[row['hour']]['completions'] = row['completions']
+        daily = defaultdict(lambda: {'created': 0, 'completed': 0, 'completions': 0})
+        for hour, counts in hourly.items():
+            day = daily[timezone.localdate(hour)]
+            for field, value in counts.items():
+                day[field] += value
+        # A versão nunca volta atrás, para não repetir ETags já entregues
+        stats, _ = UserTaskStats.objects.update_or_create(
+            user_id=user_id,
+            defaults={**totals, 'version': F('version') + 1},
+            create_defaults=totals,
+        )
+        stats.refresh_from_db(fields=['version'])
+        DailyTaskStats.objects.filter(user_id=user_id).delete()
+        DailyTaskStats.objects.bulk_create([
+            DailyTaskStats(user_id=user_id, day=day, **counts) for day, counts in daily.items()
+        ])
+        HourlyTaskStats.objects.filter(user_id=user_id).delete()
+        HourlyTaskStats.objects.bulk_create([
+            HourlyTaskStats(user_id=user_id, hour=hour, **counts) for hour, counts in hourly.items()
+        ])
+    return stats
+
+
+def task_count_aggregates():
+    """
+    Agregações de count_tasks.
+    """
+    today = timezone.localdate()
+    return {
+        'total_tasks': Count('id'),
+        'completed_tasks': Count('id', filter=Q(status='completed')),
+        'pending_tasks': Count('id', filter=Q(status='pending')),
+        'tasks_today': Count('id', filter=Q(created_at__gte=start_of_day(today))),
+        'tasks_this_week': Count('id', filter=Q(created_at__gte=start_of_day(today - timedelta(days=7)))),
+        'tasks_this_month': Count('id', filter=Q(created_at__gte=start_of_day(today - timedelta(days=30)))),
+        'completed_today': Count('id', filter=Q(status='completed', completed_at__gte=start_of_day(today))),
+    }
+
+
+def count_tasks(queryset):
+    """
+    Conta tarefas por status e período em uma única consulta agregada.
+    """
+    return queryset.order_by().aggregate(**task_count_aggregates())
+
+
+def recent_daily_stats(user):
+    """
+    Linhas diárias dos últimos 30 dias: (dia, criadas, conclusões do dia).
+    """
+    today = timezone.localdate()
+    return DailyTaskStats.objects.filter(
+        user=user, day__gte=today - timedelta(days=30), day__lte=today
+    ).values_list('day', 'created', 'completions')
+
+
+def sum_user_counts(stats, daily):
+    """
+    Números de count_tasks a partir dos contadores e das linhas diárias.
+    """
+    today = timezone.localdate()
+    week_ago = today - timedelta(days=7)
+    counts = {
+        'total_tasks': stats.total,
+        'completed_tasks': stats.completed,
+        'pending_tasks': stats.pending,
+        'tasks_today': 0,
+        'tasks_this_week': 0,
+        'tasks_this_month': 0,
+        'completed_today': 0,
+    }
+    for day, created, completions in daily:
+        counts['tasks_this_month'] += created
+        if day >= week_ago:
+            counts['tasks_this_week'] += created
+        if day == today:
+            counts['tasks_today'] += created
+            counts['completed_today'] += completions
+    return counts
+
+
+def count_user_tasks(user, stats=None):
+    """
+    Mesmos números de count_tasks, lidos dos contadores mantidos por usuário.
+
+    Custa a leitura de uma linha de UserTaskStats (ou nenhuma, se stats já
+    foi carregado) e de no máximo 31 linhas de DailyTaskStats, independente
+    de quantas tarefas o usuário tenha.
+    """
+    if stats is None:
+        stats = UserTaskStats.objects.using(DEFAULT_DB_ALIAS).filter(user=user).first()
+    if stats is None:
+        stats = rebuild_user_stats(user.pk)
+    return sum_user_counts(stats, recent_daily_stats(user))
+
+
+def build_statistics(counts, recent_tasks):
+    """
+    Corpo da resposta de /api/tasks/statistics/.
+    """
+    total_tasks = counts['total_tasks']
+    completed_tasks = counts['completed_tasks']
+    completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+    return {
+        'total_tasks': total_tasks,
+        'completed_tasks': completed_tasks,
+        'pending_tasks': counts['pending_tasks'],
+        'completion_rate': round(completion_rate, 1),
+        'tasks_today': counts['tasks_today'],
+        'tasks_this_week': counts['tasks_this_week'],
+        'tasks_this_month': counts['tasks_this_month'],
+        'completed_today': counts['completed_today'],
+        'recent_tasks': recent_tasks
+    }
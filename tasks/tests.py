@@ -1,10 +1,59 @@
-from django.test import TestCase
+import base64
+import csv
+import gzip
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
 from django.contrib.auth.models import User
-from rest_framework.test import APITestCase
+from django.db import connection, connections
+from django.db.models import F, Value
+from django.db.models.functions import Now
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APITestCase, APIRequestFactory
 from rest_framework import status
 from rest_framework.authtoken.models import Token
-from .models import Task
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.cache import SQLiteLRUCache
+from core.db import get_pool
+from core.health import ReadinessProbe, reset_readiness_probe, wait_for_database
+from core.metrics import MetricsStore, reset_metrics
+from .async_views import AsyncTaskViewSet
+from .authentication import (
+    CachedJWTAuthentication, UserCache, bump_user_version, get_user_cache, get_user_version,
+    reset_user_cache,
+)
+from .benchmarks import QUERY_BUDGETS, prepare_users, run_scenario, seed_dataset
+from .cache import generation_key, get_cache
+from .diagnostics import clear_diagnostics_cache
+from .export_jobs import claim_next_job, run_export_job
+from .imports import import_tasks_csv
+from .models import DailyTaskStats, ExportJob, HourlyTaskStats, Task, TaskEvent, UserTaskStats
 from .serializers import TaskSerializer
+from .renderers import FastJSONRenderer
+from .quotes import FALLBACK_QUOTES, CircuitBreaker, QuotePool, get_quote_pool, reset_quote_pool
+from .search import search_tasks
+from .stats import count_tasks, rebuild_user_stats
+from .throttling import TokenBucketStore, action_cost, reset_throttle_store
+from .views import TaskViewSet
 import json
 from typing import TYPE_CHECKING
 
@@ -172,3 +221,2467 @@ class TaskModelTestCase(TestCase):
         
         # Test string representation
         self.assertEqual(str(task), 'Teste do modelo')
+
+
+class TaskQueryPlanTestCase(TestCase):
+    """
+    Test suite for index usage on the task listing queries
+    """
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='plantest',
+            email='plan@test.com',
+            password='planpass123'
+        )
+        Task.objects.bulk_create([
+            Task(title=f'Tarefa {i}', status='pending' if i % 2 else 'completed', user=self.user)
+            for i in range(20)
+        ])
+        # Um dia de criação por tarefa, para o filtro de data ser seletivo
+        Task.objects.filter(user=self.user).update(
+            created_at=Now() - (F('id') % 20) * Value(timedelta(days=1))
+        )
+        self.factory = APIRequestFactory()
+
+    def get_plan(self, params):
+        """Return the EXPLAIN output for TaskViewSet.get_queryset with the given params"""
+        request = self.factory.get('/api/tasks/', params)
+        view = TaskViewSet()
+        view.request = Request(request)
+        view.request.user = self.user
+
+        # Tabela pequena: força o planner a considerar só caminhos por índice
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE tasks_task')
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return view.get_queryset().explain()
+
+    def test_date_range_uses_user_created_index(self):
+        """
+        Test that date filters are sargable and hit (user, created_at)
+        """
+        today = timezone.localdate().isoformat()
+        plan = self.get_plan({'date_from': today, 'date_to': today})
+
+        self.assertIn('task_user_created_idx', plan)
+        self.assertNotIn('::date', plan)
+
+        print("✓ Date range filter uses task_user_created_idx")
+
+    def test_status_filter_uses_user_status_created_index(self):
+        """
+        Test that status + date filters hit (user, status, created_at)
+        """
+        week_ago = (timezone.localdate() - timedelta(days=7)).isoformat()
+        plan = self.get_plan({'status': 'pending', 'date_from': week_ago})
+
+        self.assertIn('task_user_status_created_idx', plan)
+
+        print("✓ Status filter uses task_user_status_created_idx")
+
+    def test_oldest_pending_first_is_an_index_range_scan(self):
+        """
+        Test that priority filter + -priority ordering is a (user, status, created_at) range
+        """
+        plan = self.get_plan({'priority': 'alta', 'ordering': '-priority'})
+
+        self.assertIn('task_user_status_created_idx', plan)
+        self.assertIn('created_at <', plan)
+        self.assertNotIn('CASE', plan)
+
+        print("✓ Oldest pending first uses task_user_status_created_idx")
+
+    def test_date_to_is_inclusive(self):
+        """
+        Test that date_to still includes tasks created during that day
+        """
+        request = self.factory.get('/api/tasks/', {'date_to': timezone.localdate().isoformat()})
+        view = TaskViewSet()
+        view.request = Request(request)
+        view.request.user = self.user
+
+        self.assertEqual(view.get_queryset().count(), 20)
+
+
+class TaskStatisticsTestCase(APITestCase):
+    """
+    Test suite for the incrementally maintained statistics counters
+    """
+
+    def setUp(self):
+        """Set up test data and authentication"""
+        self.user = User.objects.create_user(
+            username='statsuser',
+            email='stats@test.com',
+            password='statspass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        for i in range(3):
+            self.client.post('/api/tasks/', {'title': f'Tarefa {i}'}, format='json')
+
+    def test_counters_follow_writes(self):
+        """
+        Test that counters match a full aggregation after create, update and delete
+        """
+        # Primeira leitura cria os contadores do usuário
+        self.client.get('/api/tasks/statistics/')
+
+        tasks = list(Task.objects.filter(user=self.user).order_by('id'))
+        self.client.patch(f'/api/tasks/{tasks[0].id}/', {'status': 'completed'}, format='json')
+        self.client.patch(f'/api/tasks/{tasks[1].id}/', {'status': 'completed'}, format='json')
+        self.client.patch(f'/api/tasks/{tasks[1].id}/', {'status': 'pending'}, format='json')
+        self.client.delete(f'/api/tasks/{tasks[2].id}/')
+        self.client.post('/api/tasks/', {'title': 'Outra', 'status': 'completed'}, format='json')
+
+        response = self.client.get('/api/tasks/statistics/')
+        expected = count_tasks(Task.objects.filter(user=self.user))
+
+        for key, value in expected.items():
+            self.assertEqual(response.data[key], value, key)
+        self.assertEqual(response.data['total_tasks'], 3)
+        self.assertEqual(response.data['completed_today'], 2)
+
+        print(f"✓ Counters consistent with aggregation: {expected}")
+
+    def test_statistics_reads_counters(self):
+        """
+        Test that unfiltered statistics don't scale with the number of tasks
+        """
+        self.client.get('/api/tasks/statistics/')
+        get_cache().clear()
+
+        # Linha de contadores, linhas diárias e as 5 tarefas recentes
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/tasks/statistics/')
+        self.assertEqual(response.data['total_tasks'], 3)
+
+        # Com filtros: versão do usuário, uma consulta agregada e as recentes
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/tasks/statistics/', {'status': 'pending'})
+        self.assertEqual(response.data['total_tasks'], 3)
+
+    def test_rebuild_command_repairs_counters(self):
+        """
+        Test that rebuild_task_stats recomputes corrupted counters
+        """
+        self.client.get('/api/tasks/statistics/')
+        UserTaskStats.objects.filter(user=self.user).update(total=99, pending=42)
+        DailyTaskStats.objects.filter(user=self.user).delete()
+
+        call_command('rebuild_task_stats', 'statsuser', stdout=StringIO())
+
+        stats = UserTaskStats.objects.get(user=self.user)
+        self.assertEqual((stats.total, stats.pending, stats.completed), (3, 3, 0))
+        self.assertEqual(
+            DailyTaskStats.objects.get(user=self.user, day=timezone.localdate()).created, 3
+        )
+
+
+class TaskPaginationTestCase(APITestCase):
+    """
+    Test suite for keyset pagination on list and search
+    """
+
+    def setUp(self):
+        """Set up test data with repeated titles and statuses"""
+        self.user = User.objects.create_user(
+            username='pageuser',
+            email='page@test.com',
+            password='pagepass123'
+        )
+        Task.objects.bulk_create([
+            Task(
+                title=f'Tarefa {i % 4}',
+                status='completed' if i % 3 == 0 else 'pending',
+                user=self.user
+            )
+            for i in range(23)
+        ])
+        self.client.force_authenticate(user=self.user)
+
+    def walk(self, url, params):
+        """Follow next links and return (ids, responses)"""
+        ids, pages = [], []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response)
+            ids.extend(task['id'] for task in response.data['results'])
+            if not response.data['next']:
+                return ids, pages
+            response = self.client.get(response.data['next'])
+
+    def test_pages_cover_every_ordering(self):
+        """
+        Test that walking the cursor yields the same rows as the unpaginated list
+        """
+        for ordering in ['created_at', '-created_at', 'title', '-title', 'status', '-status']:
+            expected = [task['id'] for task in self.client.get('/api/tasks/', {'ordering': ordering}).data]
+            ids, pages = self.walk('/api/tasks/', {'ordering': ordering, 'page_size': 5})
+
+            self.assertEqual(ids, expected, ordering)
+            self.assertEqual(len(pages), 5)
+
+            # Volta pelas páginas usando os links previous
+            back = []
+            response = pages[-1]
+            while response.data['previous']:
+                response = self.client.get(response.data['previous'])
+                back = [task['id'] for task in response.data['results']] + back
+            self.assertEqual(back, expected[:len(back)], ordering)
+            self.assertEqual(len(back), 20)
+
+        print("✓ Cursor pagination consistent for all orderings")
+
+    def test_count_is_opt_in(self):
+        """
+        Test that a page costs one query unless count=true is requested
+        """
+        first = self.client.get('/api/tasks/', {'page_size': 5})
+        self.assertNotIn('count', first.data)
+
+        # Versão do usuário (ETag) + a própria página
+        with self.assertNumQueries(2):
+            self.client.get(first.data['next'])
+
+        response = self.client.get('/api/tasks/search/', {'status': 'pending', 'page_size': 5, 'count': 'true'})
+        self.assertEqual(response.data['count'], 15)
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertEqual(response.data['filters_applied']['status'], 'pending')
+
+    def test_invalid_cursor(self):
+        """
+        Test that a malformed cursor returns 404
+        """
+        response = self.client.get('/api/tasks/', {'cursor': 'invalido'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_wrong_typed_values(self):
+        """
+        Test that a well-formed cursor whose values do not fit the ordering fields returns 404
+        """
+        def cursor(values):
+            payload = json.dumps({'p': values, 'r': 0}).encode()
+            return base64.urlsafe_b64encode(payload).decode()
+
+        cases = [
+            ({}, ['2024-01-01T00:00:00+00:00', 'abc']),
+            ({}, ['2024-01-01T00:00:00+00:00', True]),
+            ({}, ['2024-01-01T00:00:00', 1]),
+            ({}, [20240101, 1]),
+            ({'ordering': 'title'}, [1, '2024-01-01T00:00:00+00:00', 1]),
+            ({'ordering': 'priority'}, ['alta', '2024-01-01T00:00:00+00:00', 1]),
+            ({}, {'created_at': 1}),
+        ]
+        for params, values in cases:
+            response = self.client.get('/api/tasks/', {**params, 'cursor': cursor(values)})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, values)
+
+        valid = cursor(['2024-01-01T00:00:00+00:00', 1])
+        self.assertEqual(self.client.get('/api/tasks/', {'cursor': valid}).status_code, status.HTTP_200_OK)
+
+
+class TaskSearchTestCase(APITestCase):
+    """
+    Test suite for the full-text search engine
+    """
+
+    def setUp(self):
+        """Set up test data and authentication"""
+        self.user = User.objects.create_user(
+            username='searchuser',
+            email='search@test.com',
+            password='searchpass123'
+        )
+        self.in_description = Task.objects.create(
+            title='Reunião semanal',
+            description='Revisar o cronograma do projeto',
+            user=self.user
+        )
+        self.in_title = Task.objects.create(
+            title='Projeto final',
+            description='Entregar a documentação',
+            user=self.user
+        )
+        Task.objects.create(title='Estudar inglês', description='Reading and running', user=self.user)
+        Task.objects.create(title='Comprar pão', user=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def search(self, **params):
+        response = self.client.get('/api/tasks/search/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_results_ranked_by_relevance(self):
+        """
+        Test that a title match ranks above a description match
+        """
+        response = self.search(q='projeto')
+        ids = [task['id'] for task in response.data['results']]
+
+        self.assertEqual(ids, [self.in_title.id, self.in_description.id])
+        self.assertEqual(response.data['filters_applied']['ordering'], '-relevance')
+
+        print(f"✓ Search ranked by relevance: {ids}")
+
+    def test_stemming_and_partial_terms(self):
+        """
+        Test Portuguese/English stemming and prefix matching
+        """
+        self.assertEqual(self.search(q='estudando').data['count'], 1)
+        self.assertEqual(self.search(q='run').data['count'], 1)
+        self.assertEqual(self.search(q='proj').data['count'], 2)
+        self.assertEqual(self.search(q='pã').data['count'], 1)
+        self.assertEqual(self.search(q='inexistente').data['count'], 0)
+
+    def test_highlight(self):
+        """
+        Test that highlight=true returns marked snippets
+        """
+        response = self.client.get('/api/tasks/', {'search': 'projeto', 'highlight': 'true'})
+        highlight = response.data[0]['highlight']
+
+        self.assertEqual(highlight['title'], '<mark>Projeto</mark> final')
+        self.assertNotIn('highlight', self.search(q='projeto').data['results'][0])
+
+    def test_relevance_pagination(self):
+        """
+        Test that the cursor walks relevance-ordered results
+        """
+        first = self.search(q='proj', page_size=1)
+        second = self.client.get(first.data['next'])
+
+        self.assertEqual(first.data['results'][0]['id'], self.in_title.id)
+        self.assertEqual(second.data['results'][0]['id'], self.in_description.id)
+        self.assertIsNone(second.data['next'])
+
+    def test_search_uses_gin_index(self):
+        """
+        Test that the full-text filter is served by the GIN index
+        """
+        queryset = search_tasks(Task.objects.all(), 'projeto')
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        self.assertIn('task_search_vector_idx', queryset.explain())
+
+
+class TaskExportTestCase(APITestCase):
+    """
+    Test suite for the streaming CSV export
+    """
+
+    def setUp(self):
+        """Set up test data and authentication"""
+        self.user = User.objects.create_user(
+            username='exportuser',
+            email='export@test.com',
+            password='exportpass123'
+        )
+        self.old_task = Task.objects.create(title='Antiga', description='', user=self.user)
+        Task.objects.filter(pk=self.old_task.pk).update(
+            created_at=timezone.now() - timedelta(days=10)
+        )
+        Task.objects.create(title='Feita', description='Com "aspas"; e ponto e vírgula', status='completed', user=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def test_export_format(self):
+        """
+        Test that the streamed CSV keeps the BOM, delimiter and priority column
+        """
+        response = self.client.get('/api/tasks/export_csv/', {'ordering': 'created_at'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="tarefas_exportuser_', response['Content-Disposition'])
+
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(content.startswith('\ufeff"ID";"Título";"Descrição";"Status";"Prioridade"'))
+
+        rows = list(csv.reader(StringIO(content.lstrip('\ufeff')), delimiter=';'))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1][1:5], ['Antiga', 'Sem descrição', 'Pendente', 'Alta'])
+        self.assertEqual(rows[1][7:], ['10 dias', 'exportuser'])
+        self.assertEqual(rows[2][2:5], ['Com "aspas"; e ponto e vírgula', 'Concluída', 'N/A'])
+
+        print(f"✓ CSV export streamed: {len(rows) - 1} tasks")
+
+    def test_export_reads_value_tuples_in_chunks(self):
+        """
+        Test that the export fetches only the exported columns
+        """
+        # Inicializa os contadores do usuário fora da captura
+        self.client.get('/api/tasks/statistics/')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tasks/export_csv/')
+            b''.join(response.streaming_content)
+
+        task_queries = [q['sql'] for q in queries.captured_queries if 'tasks_task' in q['sql']]
+        self.assertEqual(len(task_queries), 1)
+        self.assertNotIn('"tasks_task"."user_id", ', task_queries[0].split('FROM')[0])
+
+
+class ExportJobTestCase(APITestCase):
+    """
+    Test suite for asynchronous export jobs
+    """
+
+    def setUp(self):
+        """Set up test data, authentication and a temporary export directory"""
+        self.export_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.export_root, ignore_errors=True)
+        settings_override = override_settings(EXPORT_ROOT=self.export_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(
+            username='jobuser',
+            email='job@test.com',
+            password='jobpass123'
+        )
+        for i in range(5):
+            Task.objects.create(title=f'Tarefa {i}', status='completed' if i < 2 else 'pending', user=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def test_job_lifecycle(self):
+        """
+        Test submit, worker run, status polling and gzip download
+        """
+        response = self.client.post('/api/exports/', {'status': 'pending', 'ordering': 'title'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'queued')
+        self.assertEqual(response.data['params'], {'status': 'pending', 'ordering': 'title'})
+        job_url = f"/api/exports/{response.data['id']}/"
+
+        self.assertEqual(self.client.get(job_url + 'download/').status_code, status.HTTP_409_CONFLICT)
+
+        call_command('run_export_worker', '--once', stdout=StringIO())
+
+        job = self.client.get(job_url).data
+        self.assertEqual(job['status'], 'completed')
+        self.assertEqual(job['row_count'], 3)
+        self.assertTrue(job['download_url'].endswith('download/'))
+
+        download = self.client.get(job_url + 'download/')
+        self.assertEqual(download['Content-Type'], 'application/gzip')
+        content = gzip.decompress(b''.join(download.streaming_content)).decode('utf-8')
+
+        # Mesmo conteúdo do export síncrono com os mesmos filtros
+        expected = self.client.get('/api/tasks/export_csv/', {'status': 'pending', 'ordering': 'title'})
+        self.assertEqual(content, b''.join(expected.streaming_content).decode('utf-8'))
+
+        print(f"✓ Export job completed: {job['row_count']} tasks, {job['file_size']} bytes")
+
+    def test_artifacts_expire(self):
+        """
+        Test that expired artifacts are removed and no longer downloadable
+        """
+        response = self.client.post('/api/exports/', {}, format='json')
+        call_command('run_export_worker', '--once', stdout=StringIO())
+        job = ExportJob.objects.get(pk=response.data['id'])
+        self.assertTrue(os.path.exists(job.file_path))
+
+        ExportJob.objects.filter(pk=job.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+        call_command('run_export_worker', '--once', stdout=StringIO())
+
+        self.assertFalse(os.path.exists(job.file_path))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'expired')
+        download = self.client.get(f'/api/exports/{job.id}/download/')
+        self.assertEqual(download.status_code, status.HTTP_410_GONE)
+
+    def test_jobs_are_private(self):
+        """
+        Test that users cannot see each other's export jobs
+        """
+        response = self.client.post('/api/exports/', {}, format='json')
+        other = User.objects.create_user(username='outro', password='outropass123')
+        self.client.force_authenticate(user=other)
+
+        self.assertEqual(self.client.get(f"/api/exports/{response.data['id']}/").status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.post('/api/exports/', {'format': 'xls'}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_body_and_missing_file(self):
+        """
+        Test that a non-object body is a 400 and a completed job without its file is a 410
+        """
+        for body in ([1], 'csv', 3):
+            response = self.client.post('/api/exports/', body, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, body)
+        self.assertFalse(ExportJob.objects.exists())
+
+        response = self.client.post('/api/exports/', {}, format='json')
+        call_command('run_export_worker', '--once', stdout=StringIO())
+        os.remove(ExportJob.objects.get(pk=response.data['id']).file_path)
+        download = self.client.get(f"/api/exports/{response.data['id']}/download/")
+        self.assertEqual(download.status_code, status.HTTP_410_GONE)
+
+        print("✓ Export job rejects non-object bodies and reports missing files")
+
+    def test_stale_running_jobs_are_reclaimed(self):
+        """
+        Test that a job left running by a dead worker is picked up again after the timeout
+        """
+        response = self.client.post('/api/exports/', {}, format='json')
+        job = claim_next_job()
+        self.assertEqual(str(job.pk), response.data['id'])
+
+        # Ainda dentro do prazo: pertence ao worker que o pegou
+        self.assertIsNone(claim_next_job())
+
+        started_at = timezone.now() - timedelta(seconds=settings.EXPORT_JOB_TIMEOUT_SECONDS + 1)
+        ExportJob.objects.filter(pk=job.pk).update(started_at=started_at)
+        reclaimed = claim_next_job()
+        self.assertEqual(reclaimed.pk, job.pk)
+        self.assertGreater(reclaimed.started_at, started_at)
+
+        run_export_job(reclaimed)
+        self.assertEqual(ExportJob.objects.get(pk=job.pk).status, 'completed')
+
+
+class TaskBulkWriteTestCase(APITestCase):
+    """
+    Test suite for the batch write endpoints
+    """
+
+    def setUp(self):
+        """Set up authentication and initialize the statistics counters"""
+        self.user = User.objects.create_user(
+            username='bulkuser',
+            email='bulk@test.com',
+            password='bulkpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.client.get('/api/tasks/statistics/')
+
+    def assert_counters_consistent(self):
+        stats = self.client.get('/api/tasks/statistics/').data
+        expected = count_tasks(Task.objects.filter(user=self.user))
+        for key, value in expected.items():
+            self.assertEqual(stats[key], value, key)
+
+    def test_bulk_create_reports_item_errors(self):
+        """
+        Test that valid items are inserted in one query and invalid ones reported
+        """
+        items = [
+            {'title': 'Primeira'},
+            {'title': ''},
+            {'title': 'Terceira', 'status': 'completed'},
+            {'title': 'Quarta', 'status': 'invalido'},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/tasks/bulk_create/', items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([task['title'] for task in response.data['created']], ['Primeira', 'Terceira'])
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 3])
+        self.assertIn('status', response.data['errors'][1]['errors'])
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "tasks_task"')]
+        self.assertEqual(len(inserts), 1)
+        self.assert_counters_consistent()
+
+        print(f"✓ Bulk create: {len(response.data['created'])} created, {len(response.data['errors'])} errors")
+
+    def test_bulk_update(self):
+        """
+        Test partial updates in batch, including tasks the user doesn't own
+        """
+        tasks = [Task.objects.create(title=f'Tarefa {i}', user=self.user) for i in range(3)]
+        other_task = Task.objects.create(
+            title='Alheia', user=User.objects.create_user(username='alheio', password='alheiopass123')
+        )
+        items = [
+            {'id': tasks[0].id, 'status': 'completed'},
+            {'id': tasks[1].id, 'title': 'Renomeada'},
+            {'id': other_task.id, 'status': 'completed'},
+            {'id': tasks[2].id, 'status': 'xyz'},
+        ]
+        response = self.client.patch('/api/tasks/bulk_update/', items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([task['id'] for task in response.data['updated']], [tasks[0].id, tasks[1].id])
+        self.assertEqual([error['index'] for error in response.data['errors']], [2, 3])
+        self.assertEqual(Task.objects.get(pk=tasks[1].id).title, 'Renomeada')
+        self.assertEqual(Task.objects.get(pk=other_task.id).status, 'pending')
+        self.assert_counters_consistent()
+
+    def test_bulk_update_rejects_boolean_ids(self):
+        """
+        Test that true/false are not accepted as task ids (True == 1 in Python)
+        """
+        Task.objects.filter(pk=1).delete()
+        Task.objects.create(pk=1, title='Primeira', user=self.user)
+        response = self.client.patch('/api/tasks/bulk_update/', [{'id': True, 'title': 'Booleano'}], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0]['errors'], {'id': ['Tarefa não encontrada.']})
+        self.assertEqual(Task.objects.get(pk=1).title, 'Primeira')
+
+    def test_bulk_status_single_update(self):
+        """
+        Test that a filter-based status change runs as one UPDATE
+        """
+        for i in range(4):
+            Task.objects.create(title=f'Relatório {i}' if i % 2 else f'Outra {i}', user=self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                '/api/tasks/bulk_status/',
+                {'status': 'completed', 'filters': {'search': 'relatório'}},
+                format='json'
+            )
+
+        self.assertEqual(response.data['updated'], 2)
+        updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "tasks_task"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Task.objects.filter(user=self.user, status='completed').count(), 2)
+        self.assert_counters_consistent()
+
+        response = self.client.post('/api/tasks/bulk_status/', {'status': 'feito'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class StubHTTPServer:
+    """
+    Local HTTP server for tests that call external services.
+
+    Every GET answers with (status, body) from the handler function.
+    """
+
+    def __init__(self, handler):
+        stub = self
+        self.handler = handler
+        self.requests = []
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append(self.path)
+                status_code, body = stub.handler(self.path)
+                payload = json.dumps(body).encode()
+                self.send_response(status_code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), RequestHandler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class QuotePoolTestCase(APITestCase):
+    """
+    Test suite for the motivational quote pool and circuit breaker
+    """
+
+    def setUp(self):
+        """Set up authentication and a fresh quote pool per test"""
+        self.user = User.objects.create_user(username='quoteuser', password='quotepass123')
+        self.client.force_authenticate(user=self.user)
+        reset_quote_pool()
+        self.addCleanup(reset_quote_pool)
+
+    @staticmethod
+    def quotes(path):
+        limit = int(path.split('limit=')[1])
+        return 200, [
+            {'_id': f'q{i}', 'content': f'Frase {i}', 'author': 'Autor', 'tags': ['Teste'], 'length': 7}
+            for i in range(limit)
+        ]
+
+    def test_pool_serves_quotes_from_background_refill(self):
+        """
+        Test that the endpoint answers from the pool refilled in batches
+        """
+        with StubHTTPServer(self.quotes) as stub:
+            with override_settings(QUOTES_API_URL=stub.url + '/quotes/random', QUOTES_POOL_BATCH_SIZE=10):
+                # Pool vazio: responde com o cache local e dispara o reabastecimento
+                first = self.client.get('/api/tasks/motivacional/')
+                self.assertEqual(first.data['source'], 'QUOTABLE_API_CACHED')
+                get_quote_pool().wait_for_refill(timeout=5)
+
+                sources = [self.client.get('/api/tasks/motivacional/').data['source'] for _ in range(8)]
+                get_quote_pool().wait_for_refill(timeout=5)
+                stats = self.client.get('/api/tasks/motivacional/stats/').data
+
+        self.assertEqual(sources, ['QUOTABLE_API'] * 8)
+        self.assertEqual(stats['hits'], 8)
+        self.assertEqual(stats['misses'], 1)
+        # Um lote inicial e outro quando o pool ficou abaixo do mínimo
+        self.assertEqual(len(stub.requests), 2)
+        self.assertTrue(stub.requests[0].endswith('limit=10'))
+
+        print(f"✓ Quote pool stats: {stats}")
+
+    def test_circuit_breaker_stops_upstream_calls(self):
+        """
+        Test that repeated failures open the breaker for the cool-down period
+        """
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, cooldown=30, clock=lambda: now[0])
+
+        with StubHTTPServer(lambda path: (503, {'erro': 'indisponível'})) as stub:
+            pool = QuotePool(stub.url + '/quotes/random', batch_size=5, timeout=2, breaker=breaker)
+            for _ in range(5):
+                quote, from_pool = pool.get()
+                pool.wait_for_refill(timeout=5)
+                self.assertFalse(from_pool)
+                self.assertIn(quote, FALLBACK_QUOTES)
+
+            self.assertEqual(len(stub.requests), 2)
+            self.assertEqual(breaker.state, 'open')
+
+            # Depois do cool-down uma nova tentativa é liberada
+            now[0] = 31
+            self.assertEqual(breaker.state, 'half-open')
+            pool.get()
+            pool.wait_for_refill(timeout=5)
+            self.assertEqual(len(stub.requests), 3)
+            self.assertEqual(breaker.state, 'open')
+
+    def test_malformed_payload_counts_as_failure(self):
+        """
+        Test that a payload that is not a quote list or object is a breaker failure
+        """
+        payloads = iter([{'erro': 'formato'}, 'texto', [1, 'frase', None], self.quotes('limit=2')[1]])
+        breaker = CircuitBreaker(failure_threshold=5, cooldown=30)
+
+        with StubHTTPServer(lambda path: (200, next(payloads))) as stub:
+            pool = QuotePool(stub.url + '/quotes/random', batch_size=2, timeout=2, breaker=breaker)
+            self.assertEqual([pool.refill() for _ in range(3)], [0, 0, 0])
+            self.assertEqual(breaker.failures, 3)
+            self.assertEqual(pool.refill(), 2)
+            self.assertEqual(breaker.failures, 0)
+
+
+class DiagnosticoTestCase(APITestCase):
+    """
+    Test suite for the concurrent connectivity probes
+    """
+
+    def setUp(self):
+        """Set up authentication and clear the probe cache"""
+        self.user = User.objects.create_user(username='diaguser', password='diagpass123')
+        self.client.force_authenticate(user=self.user)
+        clear_diagnostics_cache()
+        self.addCleanup(clear_diagnostics_cache)
+
+    @staticmethod
+    def slow(path):
+        time.sleep(2 if path.startswith('/lento') else 0.5)
+        return 200, {'ok': True}
+
+    def test_probes_run_concurrently(self):
+        """
+        Test that total latency follows the slowest probe, not the sum
+        """
+        with StubHTTPServer(self.slow) as stub:
+            targets = [(f'Alvo {i}', f'{stub.url}/alvo/{i}') for i in range(4)]
+            with override_settings(DIAGNOSTICO_TARGETS=targets):
+                started = time.perf_counter()
+                response = self.client.get('/api/tasks/diagnostico/')
+                elapsed = time.perf_counter() - started
+
+                cached = self.client.get('/api/tasks/diagnostico/')
+
+        self.assertLess(elapsed, 1.5)
+        results = response.data['diagnostico']
+        self.assertEqual([r['status_code'] for r in results], [200] * 4)
+        self.assertFalse(response.data['em_cache'])
+        for result in results:
+            self.assertGreaterEqual(result['tempos']['total_ms'], 500)
+            self.assertIsNotNone(result['tempos']['dns_ms'])
+            self.assertIsNotNone(result['tempos']['connect_ms'])
+            self.assertIsNone(result['tempos']['tls_ms'])
+
+        self.assertTrue(cached.data['em_cache'])
+        self.assertEqual(len(stub.requests), 4)
+
+        print(f"✓ 4 probes of 0.5s finished in {elapsed:.2f}s")
+
+    def test_overall_deadline(self):
+        """
+        Test that probes still running at the deadline are reported as errors
+        """
+        # O alvo lento só responde depois do teste: o resultado não depende
+        # de quanto a máquina demora
+        release = threading.Event()
+
+        def handler(path):
+            if path.startswith('/lento'):
+                release.wait(10)
+            return 200, {'ok': True}
+
+        with StubHTTPServer(handler) as stub:
+            targets = [('Rápido', f'{stub.url}/rapido'), ('Lento', f'{stub.url}/lento')]
+            try:
+                with override_settings(DIAGNOSTICO_TARGETS=targets, DIAGNOSTICO_DEADLINE=1):
+                    response = self.client.get('/api/tasks/diagnostico/')
+            finally:
+                release.set()
+
+        fast, slow = response.data['diagnostico']
+        self.assertTrue(fast['ok'])
+        self.assertFalse(slow['ok'])
+        self.assertIsNone(slow['status_code'])
+        self.assertIn('Prazo total', slow['erro'])
+
+
+class TaskConditionalGetTestCase(APITestCase):
+    """
+    Test suite for ETag / If-None-Match on the task read endpoints
+    """
+
+    ENDPOINTS = [
+        ('/api/tasks/', {}),
+        ('/api/tasks/', {'status': 'pending', 'page_size': 2}),
+        ('/api/tasks/search/', {'q': 'tarefa'}),
+        ('/api/tasks/statistics/', {}),
+        ('/api/tasks/export_csv/', {}),
+    ]
+
+    def setUp(self):
+        """Set up test data and authentication"""
+        self.user = User.objects.create_user(username='etaguser', password='etagpass123')
+        for i in range(3):
+            Task.objects.create(title=f'Tarefa {i}', user=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def test_not_modified_skips_task_queries(self):
+        """
+        Test that a matching If-None-Match returns 304 without reading tasks
+        """
+        for url, params in self.ENDPOINTS:
+            first = self.client.get(url, params)
+            etag = first['ETag']
+            self.assertEqual(first.status_code, status.HTTP_200_OK)
+
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, url)
+            self.assertEqual(response['ETag'], etag)
+            # Endpoints com cache de respostas nem consultam a versão
+            self.assertLessEqual(len(queries.captured_queries), 1, url)
+            for query in queries.captured_queries:
+                self.assertNotIn('tasks_task', query['sql'])
+
+        print(f"✓ 304 served with at most a version lookup for {len(self.ENDPOINTS)} endpoints")
+
+    def test_etag_changes_on_write(self):
+        """
+        Test that every kind of write invalidates the ETag
+        """
+        task = Task.objects.filter(user=self.user).first()
+        writes = [
+            lambda: self.client.post('/api/tasks/', {'title': 'Nova'}, format='json'),
+            lambda: self.client.patch(f'/api/tasks/{task.id}/', {'title': 'Renomeada'}, format='json'),
+            lambda: self.client.patch('/api/tasks/bulk_update/', [{'id': task.id, 'description': 'x'}], format='json'),
+            lambda: self.client.post('/api/tasks/bulk_status/', {'status': 'completed'}, format='json'),
+            lambda: self.client.delete(f'/api/tasks/{task.id}/'),
+        ]
+        etag = self.client.get('/api/tasks/')['ETag']
+        for write in writes:
+            write()
+            response = self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response['ETag'], etag)
+            etag = response['ETag']
+
+    def test_etag_depends_on_params_and_user(self):
+        """
+        Test that ETags differ per query string and per user
+        """
+        all_tasks = self.client.get('/api/tasks/')['ETag']
+        pending = self.client.get('/api/tasks/', {'status': 'pending'})['ETag']
+        self.assertNotEqual(all_tasks, pending)
+
+        other = User.objects.create_user(username='etagother', password='etagpass123')
+        self.client.force_authenticate(user=other)
+        response = self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=all_tasks)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TaskResponseCacheTestCase(APITestCase):
+    """
+    Test suite for the per-user response cache
+    """
+
+    def setUp(self):
+        """Set up test data, an isolated metrics store and authentication"""
+        get_cache().clear()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings_override = override_settings(METRICS_DB=os.path.join(directory, 'metrics.sqlite3'))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        reset_metrics()
+        self.addCleanup(reset_metrics)
+        self.user = User.objects.create_user(username='cacheuser', password='cachepass123')
+        self.other = User.objects.create_user(username='cacheother', password='cachepass123')
+        for i in range(3):
+            Task.objects.create(title=f'Tarefa {i}', user=self.user)
+            Task.objects.create(title=f'Outra {i}', user=self.other)
+        self.client.force_authenticate(user=self.user)
+
+    def test_hit_skips_database(self):
+        """
+        Test that a repeated read is served from cache without queries
+        """
+        for url, params in [
+            ('/api/tasks/', {'status': 'pending'}),
+            ('/api/tasks/search/', {'q': 'tarefa'}),
+            ('/api/tasks/statistics/', {}),
+        ]:
+            first = self.client.get(url, params)
+            with self.assertNumQueries(0):
+                second = self.client.get(url, params)
+            self.assertEqual(second.status_code, status.HTTP_200_OK)
+            self.assertEqual(second.data, first.data)
+            self.assertEqual(second['ETag'], first['ETag'])
+
+        stats = self.client.get('/api/tasks/cache/stats/').data
+        self.assertEqual(stats['hits'], 3)
+        self.assertEqual(stats['misses'], 3)
+        self.assertEqual(stats['hit_ratio'], 0.5)
+        print(f"✓ Cache hits served without queries: {stats}")
+
+    def test_writes_invalidate_only_owner(self):
+        """
+        Test that writes through the API invalidate only the owner's entries
+        """
+        self.client.get('/api/tasks/')
+        self.client.force_authenticate(user=self.other)
+        self.client.get('/api/tasks/')
+        self.client.force_authenticate(user=self.user)
+
+        task = Task.objects.filter(user=self.user).first()
+        writes = [
+            lambda: self.client.post('/api/tasks/', {'title': 'Nova'}),
+            lambda: self.client.patch(f'/api/tasks/{task.id}/', {'status': 'completed'}),
+            lambda: self.client.put(f'/api/tasks/{task.id}/', {'title': 'Editada', 'status': 'pending'}),
+            lambda: self.client.delete(f'/api/tasks/{task.id}/'),
+        ]
+        for write in writes:
+            write()
+            expected = list(Task.objects.filter(user=self.user).values_list('title', flat=True))
+            response = self.client.get('/api/tasks/')
+            self.assertCountEqual([item['title'] for item in response.data], expected)
+
+        # As entradas do outro usuário continuam válidas
+        self.client.force_authenticate(user=self.other)
+        with self.assertNumQueries(0):
+            self.client.get('/api/tasks/')
+
+    def test_sqlite_backend_is_lru_and_shared(self):
+        """
+        Test that the SQLite backend evicts the least recently used entry and increments atomically
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'cache.sqlite3')
+        params = {'TIMEOUT': 60, 'OPTIONS': {'MAX_ENTRIES': 3}}
+        cache = SQLiteLRUCache(path, params)
+        for key in 'abc':
+            cache.set(key, key.upper())
+        self.assertEqual(cache.get('a'), 'A')
+        cache.set('d', 'D')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual([cache.get(key) for key in 'acd'], ['A', 'C', 'D'])
+        self.assertEqual(len(cache), 3)
+
+        cache.set('curto', 1, timeout=0)
+        self.assertIsNone(cache.get('curto'))
+        self.assertFalse(cache.add('a', 'outro'))
+
+        # Outro worker com o mesmo arquivo: incrementos não se perdem
+        other = SQLiteLRUCache(path, params)
+        cache.add('n', 0, timeout=None)
+
+        def bump(backend):
+            for _ in range(50):
+                backend.incr('n')
+        threads = [threading.Thread(target=bump, args=(backend,)) for backend in (cache, other)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(other.get('n'), 100)
+
+        print("✓ SQLite response cache: LRU eviction and atomic incr")
+
+    def test_cached_entry_answers_conditional_get(self):
+        """
+        Test that a cached entry also answers If-None-Match with 304
+        """
+        etag = self.client.get('/api/tasks/statistics/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/tasks/statistics/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class TaskFastSerializationTestCase(APITestCase):
+    """
+    Test suite for sparse fieldsets and the value-row serialization path
+    """
+
+    def setUp(self):
+        """Set up test data and authentication"""
+        self.user = User.objects.create_user(username='fastuser', password='fastpass123')
+        Task.objects.create(title='Café ☕ com ação', description='linha\nnova "aspas"', user=self.user)
+        Task.objects.create(title='Separador \u2028 de linha', description='', user=self.user)
+        Task.objects.create(title='Concluída', status='completed', user=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def test_output_matches_task_serializer(self):
+        """
+        Test that list output is byte-identical to TaskSerializer + JSONRenderer
+        """
+        response = self.client.get('/api/tasks/')
+        queryset = Task.objects.filter(user=self.user).order_by('-created_at', '-id')
+        expected = JSONRenderer().render(TaskSerializer(queryset, many=True).data)
+        self.assertEqual(response.content, expected)
+        self.assertIn(b'\\u2028', response.content)
+        print("✓ Fast path output is byte-identical to TaskSerializer")
+
+    def test_fast_renderer_matches_json_renderer(self):
+        """
+        Test that FastJSONRenderer output matches JSONRenderer, with fallbacks
+        """
+        payloads = [
+            {'a': 'ação\u2029', 'b': [1, 2.5, None, True], 'c': {'d': 'x'}},
+            {'big': 2 ** 70},
+            {1: 'chave numérica'},
+            {
+                'utc': datetime(2024, 1, 1, 12, 30, tzinfo=dt_timezone.utc),
+                'offset': datetime(2024, 1, 1, 12, 30, 1, 500, tzinfo=dt_timezone(timedelta(hours=-3))),
+                'naive': datetime(2024, 1, 1, 12, 30), 'date': date(2024, 1, 1),
+            },
+            {'floats': [1e16, 1.5e-7, 0.00001, 1e-4, 1e15, 0.1 + 0.2, -0.0, 12.5]},
+            {'texto': 'versão 1e5 0.0000'},
+        ]
+        for data in payloads:
+            self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_fields_narrow_columns_and_output(self):
+        """
+        Test that ?fields= limits both the selected columns and the response
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tasks/', {'fields': 'id,title,status'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data[0]), {'id', 'title', 'status'})
+        select = next(q['sql'] for q in queries.captured_queries if 'FROM "tasks_task"' in q['sql'])
+        self.assertNotIn('"description"', select.split('FROM')[0])
+
+        response = self.client.get('/api/tasks/search/', {'q': 'café', 'fields': 'title'})
+        self.assertEqual(response.data['results'], [{'title': 'Café ☕ com ação'}])
+
+    def test_fields_with_cursor_pagination(self):
+        """
+        Test that cursors work when the ordering keys are not in ?fields=
+        """
+        titles = []
+        params = {'fields': 'title', 'page_size': 2, 'ordering': 'title'}
+        response = self.client.get('/api/tasks/', params)
+        titles += [item['title'] for item in response.data['results']]
+        response = self.client.get(response.data['next'])
+        titles += [item['title'] for item in response.data['results']]
+        self.assertEqual(titles, sorted(Task.objects.values_list('title', flat=True)))
+        self.assertEqual(set(response.data['results'][0]), {'title'})
+
+    def test_invalid_fields(self):
+        """
+        Test that unknown fields are rejected with 400
+        """
+        response = self.client.get('/api/tasks/', {'fields': 'title,senha'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+
+
+class TaskQueryBudgetTestCase(APITestCase):
+    """
+    Test suite for the per-endpoint query budgets used by bench_tasks
+    """
+
+    def test_scenarios_within_query_budget(self):
+        """
+        Test that no benchmark scenario exceeds its query budget
+        """
+        users = seed_dataset(users=3, tasks_per_user=40)
+        prepare_users(users)
+        for name, budget in QUERY_BUDGETS.items():
+            result = run_scenario(self.client, users, name, iterations=4)
+            self.assertLessEqual(result['queries_max'], budget, name)
+            self.assertTrue(all(code.startswith('2') for code in result['status_codes']), result)
+
+        print(f"✓ {len(QUERY_BUDGETS)} scenarios within their query budgets")
+
+    def test_jwt_scenarios_within_query_budget(self):
+        """
+        Test that authenticating by JWT adds no query once the user is cached
+        """
+        reset_user_cache()
+        self.addCleanup(reset_user_cache)
+        users = seed_dataset(users=2, tasks_per_user=20)
+        prepare_users(users)
+        for name in ('list', 'statistics', 'update'):
+            result = run_scenario(self.client, users, name, iterations=4, auth='jwt')
+            self.assertLessEqual(result['queries_max'], QUERY_BUDGETS[name], name)
+            self.assertTrue(all(code.startswith('2') for code in result['status_codes']), result)
+
+        print("✓ JWT scenarios within their query budgets")
+
+    def test_bench_command_writes_json(self):
+        """
+        Test that bench_tasks saves comparable JSON results
+        """
+        output = os.path.join(tempfile.mkdtemp(), 'bench.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(output))
+        call_command(
+            'bench_tasks', users=2, tasks_per_user=10, iterations=2,
+            scenario=['list', 'statistics'], output=output, stdout=StringIO(),
+        )
+        with open(output) as handle:
+            report = json.load(handle)
+        self.assertEqual(set(report['scenarios']), {'list', 'statistics'})
+        self.assertEqual(set(report['scenarios']['list']) >= {'p50_ms', 'p95_ms', 'p99_ms', 'peak_memory_kb'}, True)
+        self.assertFalse(User.objects.filter(username__startswith='__bench_').exists())
+
+
+class RequestTimingTestCase(APITestCase):
+    """
+    Test suite for the request timing middleware
+    """
+
+    def setUp(self):
+        """Set up test data and authentication"""
+        self.user = User.objects.create_user(username='timinguser', password='timingpass123')
+        for i in range(3):
+            Task.objects.create(title=f'Tarefa {i}', user=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def server_timing(self, response):
+        entries = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *attrs = entry.split(';')
+            entries[name] = dict(attr.split('=', 1) for attr in attrs)
+        return entries
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=1.0)
+    def test_server_timing_split(self):
+        """
+        Test that Server-Timing splits db, serialize, render and app time
+        """
+        self.client.get('/api/tasks/')
+        get_cache().clear()
+        response = self.client.get('/api/tasks/', HTTP_ORIGIN='http://localhost:3000')
+        entries = self.server_timing(response)
+
+        self.assertEqual(set(entries), {'db', 'serialize', 'render', 'app', 'total'})
+        self.assertEqual(entries['db']['desc'], '"2 queries"')
+        self.assertEqual(entries['total']['desc'], '"TaskViewSet.list"')
+        parts = sum(float(entries[name]['dur']) for name in ('db', 'serialize', 'render', 'app'))
+        self.assertAlmostEqual(parts, float(entries['total']['dur']), delta=0.5)
+        self.assertEqual(response['Timing-Allow-Origin'], 'http://localhost:3000')
+        print(f"✓ Server-Timing: {response['Server-Timing']}")
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_have_no_header(self):
+        """
+        Test that requests outside the sample get no Server-Timing header
+        """
+        response = self.client.get('/api/tasks/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0.0, SLOW_QUERY_MS=0)
+    def test_slow_queries_logged_with_action(self):
+        """
+        Test that slow queries are logged with their SQL and action, even unsampled
+        """
+        get_cache().clear()
+        with self.assertLogs('core.timing', level='WARNING') as logs:
+            self.client.get('/api/tasks/statistics/')
+        self.assertTrue(any('TaskViewSet.statistics' in line for line in logs.output))
+        self.assertTrue(any('tasks_usertaskstats' in line for line in logs.output))
+
+
+class MetricsTestCase(APITestCase):
+    """
+    Test suite for the Prometheus /metrics endpoint
+    """
+
+    def setUp(self):
+        """Set up an isolated metrics store and authentication"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.metrics_db = os.path.join(directory, 'metrics.sqlite3')
+        settings_override = override_settings(
+            METRICS_DB=self.metrics_db, METRICS_FLUSH_SECONDS=60, METRICS_TOKEN='segredo'
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        reset_metrics()
+        self.addCleanup(reset_metrics)
+
+        self.user = User.objects.create_user(username='metricsuser', password='metricspass123')
+        for i in range(3):
+            Task.objects.create(title=f'Tarefa {i}', user=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def scrape(self):
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer segredo')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def test_request_and_db_metrics_per_action(self):
+        """
+        Test that requests are counted per action and status with latency histograms
+        """
+        self.client.get('/api/tasks/')
+        self.client.get('/api/tasks/')
+        self.client.get('/api/tasks/999999/')
+        body = self.scrape()
+
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('http_requests_total{action="TaskViewSet.list",method="GET",status="200"} 2', body)
+        self.assertIn('http_requests_total{action="TaskViewSet.retrieve",method="GET",status="404"} 1', body)
+        self.assertIn(
+            'http_request_duration_seconds_count{action="TaskViewSet.list",status="200"} 2', body
+        )
+        self.assertIn(
+            'http_request_duration_seconds_bucket{action="TaskViewSet.list",le="+Inf",status="200"} 2', body
+        )
+        self.assertIn('db_queries_total{action="TaskViewSet.list"}', body)
+        print("✓ Per-action request, latency and DB metrics exposed")
+
+    def test_aggregates_across_processes(self):
+        """
+        Test that increments flushed by another process are summed in
+        """
+        self.client.get('/api/tasks/')
+        script = (
+            'from core.metrics import MetricsStore\n'
+            f'store = MetricsStore({self.metrics_db!r})\n'
+            "store.inc('http_requests_total', {'action': 'TaskViewSet.list', 'method': 'GET', 'status': 200}, 5)\n"
+            'store.flush()\n'
+        )
+        subprocess.run([sys.executable, '-c', script], check=True, cwd=settings.BASE_DIR)
+
+        body = self.scrape()
+        self.assertIn('http_requests_total{action="TaskViewSet.list",method="GET",status="200"} 6', body)
+
+    def test_export_and_quote_metrics(self):
+        """
+        Test that export rows and quote API call results are counted
+        """
+        response = self.client.get('/api/tasks/export_csv/')
+        b''.join(response.streaming_content)
+
+        reset_quote_pool()
+        self.addCleanup(reset_quote_pool)
+        with StubHTTPServer(lambda path: (500, {'erro': 'fora do ar'})) as stub:
+            pool = QuotePool(stub.url + '/quotes/random', batch_size=5, low_watermark=1, timeout=2)
+            pool.refill()
+
+        body = self.scrape()
+        self.assertIn('export_rows_total{kind="stream"} 3', body)
+        self.assertIn('quote_api_calls_total{result="error"} 1', body)
+        self.assertIn('quote_api_call_duration_seconds_count 1', body)
+
+    def test_token_required_when_configured(self):
+        """
+        Test that METRICS_TOKEN protects the endpoint
+        """
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer errado')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer segredo')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_missing_token_fails_closed_without_debug(self):
+        """
+        Test that /metrics is only open without METRICS_TOKEN when DEBUG is on
+        """
+        with override_settings(METRICS_TOKEN='', DEBUG=False):
+            self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_401_UNAUTHORIZED)
+            response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer ')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        with override_settings(METRICS_TOKEN='', DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_200_OK)
+
+
+@override_settings(ROOT_URLCONF='core.urls_async')
+class TaskAsyncViewsTestCase(TestCase):
+    """
+    Test suite for the async network-bound views served under ASGI
+    """
+
+    def setUp(self):
+        """Set up a user and a JWT for the async client"""
+        self.user = User.objects.create_user(username='asyncuser', password='asyncpass123')
+        token = str(RefreshToken.for_user(self.user).access_token)
+        self.auth = {'Authorization': f'Bearer {token}'}
+        self.async_client = AsyncClient()
+
+    def test_only_network_actions_are_async(self):
+        """
+        Test that database reads stay on the sync TaskViewSet in the ASGI URLconf
+        """
+        for path in ('/api/tasks/', '/api/tasks/search/', '/api/tasks/statistics/'):
+            self.assertIs(resolve(path).func.cls, TaskViewSet, path)
+        for path in ('/api/tasks/motivacional/', '/api/tasks/diagnostico/'):
+            self.assertIs(resolve(path).func.cls, AsyncTaskViewSet, path)
+
+    async def test_drf_pipeline(self):
+        """
+        Test that async views answer errors, OPTIONS and ?format=api like the DRF views
+        """
+        await sync_to_async(reset_quote_pool)()
+        self.addCleanup(reset_quote_pool)
+
+        for method in ('get', 'options'):
+            async_response = await getattr(self.async_client, method)('/api/tasks/motivacional/')
+            with override_settings(ROOT_URLCONF='core.urls'):
+                sync_response = await sync_to_async(getattr(self.client, method))('/api/tasks/motivacional/')
+            self.assertEqual(async_response.status_code, status.HTTP_401_UNAUTHORIZED, method)
+            self.assertEqual(async_response.content, sync_response.content, method)
+            for header in ('Content-Type', 'Allow', 'Vary', 'WWW-Authenticate'):
+                self.assertEqual(async_response.get(header), sync_response.get(header), f'{method} {header}')
+
+        with patch.object(QuotePool, 'refill_in_event_loop'):
+            response = await self.async_client.get(
+                '/api/tasks/motivacional/', {'format': 'api'}, headers=self.auth
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+
+    async def test_outbound_actions(self):
+        """
+        Test motivacional and diagnostico through async HTTP clients
+        """
+        await sync_to_async(reset_quote_pool)()
+        self.addCleanup(reset_quote_pool)
+        await sync_to_async(clear_diagnostics_cache)()
+        self.addCleanup(clear_diagnostics_cache)
+
+        def handler(path):
+            if path.startswith('/quotes'):
+                return 200, [{'_id': 'a1', 'content': 'Frase assíncrona', 'author': 'Autor', 'tags': ['Teste']}]
+            return 200, {'ok': True}
+
+        with StubHTTPServer(handler) as stub:
+            with override_settings(
+                QUOTES_API_URL=stub.url + '/quotes/random',
+                DIAGNOSTICO_TARGETS=[('Stub', stub.url + '/health')],
+            ):
+                first = json.loads((await self.async_client.get('/api/tasks/motivacional/', headers=self.auth)).content)
+                self.assertEqual(first['source'], 'QUOTABLE_API_CACHED')
+                await get_quote_pool()._refill_task
+                second = json.loads((await self.async_client.get('/api/tasks/motivacional/', headers=self.auth)).content)
+
+                response = await self.async_client.get('/api/tasks/diagnostico/', headers=self.auth)
+                diagnostico = json.loads(response.content)
+
+        self.assertEqual(second['content'], 'Frase assíncrona')
+        self.assertEqual(second['source'], 'QUOTABLE_API')
+        self.assertEqual(diagnostico['diagnostico'][0]['status_code'], 200)
+        self.assertFalse(diagnostico['em_cache'])
+
+
+class BootTestCase(TestCase):
+    def test_boot_skips_rare_action_modules(self):
+        """
+        Test that loading settings and the URLconf prints nothing and defers rare-action modules
+        """
+        script = (
+            'import sys; from core.boot import measure_boot; measure_boot(); '
+            'print(sorted(m for m in ("tasks.bulk", "tasks.diagnostics", "tasks.export_jobs", '
+            '"tasks.exports", "tasks.quotes") if m in sys.modules))'
+        )
+        completed = subprocess.run(
+            [sys.executable, '-c', script], capture_output=True, text=True, check=True, cwd=settings.BASE_DIR
+        )
+        self.assertEqual(completed.stdout.strip(), '[]')
+
+    def test_boot_profile_command(self):
+        """
+        Test that boot_profile reports every boot phase and per-package import times
+        """
+        output = os.path.join(tempfile.mkdtemp(), 'boot.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(output))
+        call_command('boot_profile', runs=1, output=output, stdout=StringIO())
+
+        with open(output) as handle:
+            result = json.load(handle)
+        self.assertEqual(
+            list(result['phases']),
+            ['interpreter', 'django', 'settings', 'apps', 'middleware', 'urls', 'checks'],
+        )
+        self.assertIn('django', result['imports'])
+        self.assertIn('tasks', result['imports'])
+        self.assertGreater(result['total_ms'], 0)
+
+
+class TaskTimeseriesTestCase(APITestCase):
+    """
+    Test suite for the bucketed created/completed time series
+    """
+
+    def setUp(self):
+        """Set up tasks spread over known UTC instants"""
+        self.user = User.objects.create_user(username='seriesuser', password='seriespass123')
+        self.client.force_authenticate(user=self.user)
+        instants = [
+            ('2026-03-02 10:00', 'completed'),
+            ('2026-03-02 15:00', 'pending'),
+            ('2026-03-04 12:00', 'completed'),
+            ('2026-03-10 02:00', 'pending'),
+            ('2026-04-01 12:00', 'completed'),
+        ]
+        for index, (instant, task_status) in enumerate(instants):
+            task = Task.objects.create(user=self.user, title=f'Tarefa {index}', status=task_status)
+            Task.objects.filter(pk=task.pk).update(
+                created_at=timezone.make_aware(datetime.strptime(instant, '%Y-%m-%d %H:%M'), dt_timezone.utc)
+            )
+        rebuild_user_stats(self.user.pk)
+        get_cache().clear()
+
+    def series(self, **params):
+        response = self.client.get('/api/tasks/timeseries/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return {item['bucket']: (item['created'], item['completed']) for item in response.data['series']}, response
+
+    def test_daily_buckets_from_rollup(self):
+        """
+        Test that daily buckets are zero-filled and read from the rollup with one grouped query
+        """
+        # Linha de contadores (ETag) e a consulta agrupada sobre DailyTaskStats
+        with CaptureQueriesContext(connection) as queries:
+            series, response = self.series(date_from='2026-03-01', date_to='2026-03-10')
+        self.assertEqual(len(queries), 2)
+        self.assertIn('tasks_dailytaskstats', queries[1]['sql'])
+        self.assertNotIn('tasks_task', queries[1]['sql'])
+
+        self.assertEqual(len(series), 10)
+        self.assertEqual(series['2026-03-01'], (0, 0))
+        self.assertEqual(series['2026-03-02'], (2, 1))
+        self.assertEqual(series['2026-03-04'], (1, 1))
+        self.assertEqual(series['2026-03-10'], (1, 0))
+        self.assertEqual(response.data['totals'], {'created': 4, 'completed': 2, 'completions': 0})
+
+    def test_week_and_month_buckets(self):
+        """
+        Test that weeks start on Monday and months on the 1st
+        """
+        weeks, _ = self.series(interval='week', date_from='2026-03-01', date_to='2026-03-31')
+        self.assertEqual(list(weeks)[:3], ['2026-02-23', '2026-03-02', '2026-03-09'])
+        self.assertEqual(weeks['2026-03-02'], (3, 2))
+        self.assertEqual(weeks['2026-03-09'], (1, 0))
+
+        months, _ = self.series(interval='month', date_from='2026-01-01', date_to='2026-04-30')
+        self.assertEqual(months, {
+            '2026-01-01': (0, 0), '2026-02-01': (0, 0), '2026-03-01': (4, 2), '2026-04-01': (1, 1),
+        })
+
+    def test_buckets_follow_requested_timezone(self):
+        """
+        Test that days are cut in the requested timezone, from the hourly rollup when offsets are whole hours
+        """
+        with CaptureQueriesContext(connection) as queries:
+            local, response = self.series(date_from='2026-03-01', date_to='2026-03-10', tz='America/Sao_Paulo')
+        self.assertIn('tasks_hourlytaskstats', queries[-1]['sql'])
+        self.assertNotIn('tasks_task', queries[-1]['sql'])
+        self.assertEqual(response.data['timezone'], 'America/Sao_Paulo')
+        # 2026-03-10 02:00 UTC ainda é dia 9 em São Paulo
+        self.assertEqual(local['2026-03-09'], (1, 0))
+        self.assertEqual(local['2026-03-10'], (0, 0))
+
+        # Mesmo fuso do projeto com outro nome: soma as horas e chega aos mesmos números
+        utc, _ = self.series(date_from='2026-03-01', date_to='2026-03-31', tz='Etc/UTC')
+        rollup, _ = self.series(date_from='2026-03-01', date_to='2026-03-31')
+        self.assertEqual(utc, rollup)
+
+        # Deslocamento de meia hora: agrupa as próprias tarefas
+        with CaptureQueriesContext(connection) as queries:
+            kolkata, _ = self.series(date_from='2026-03-01', date_to='2026-03-10', tz='Asia/Kolkata')
+        self.assertIn('tasks_task', queries[-1]['sql'])
+        self.assertEqual(kolkata['2026-03-02'], (2, 1))
+        self.assertEqual(kolkata['2026-03-10'], (1, 0))
+
+    def test_hourly_rollup_follows_writes(self):
+        """
+        Test that single and bulk writes keep the hourly rollup equal to a rebuild
+        """
+        def hourly():
+            return sorted(
+                HourlyTaskStats.objects.filter(user=self.user)
+                .exclude(created=0, completed=0, completions=0)
+                .values_list('hour', 'created', 'completed', 'completions')
+            )
+
+        response = self.client.post('/api/tasks/', {'title': 'Nova'}, format='json')
+        self.client.patch(f'/api/tasks/{response.data["id"]}/', {'status': 'completed'}, format='json')
+        for new_status in ('pending', 'completed'):
+            response = self.client.post('/api/tasks/bulk_status/', {'status': new_status}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        Task.objects.get(title='Tarefa 1').delete()
+
+        incremental = hourly()
+        rebuild_user_stats(self.user.pk)
+        self.assertEqual(incremental, hourly())
+
+        local, _ = self.series(date_from='2026-03-01', date_to='2026-03-10', tz='America/Sao_Paulo')
+        self.assertEqual(local['2026-03-02'], (1, 1))
+
+    def test_partial_buckets_are_marked(self):
+        """
+        Test that the first and last buckets report the part of the period inside the requested range
+        """
+        response = self.client.get(
+            '/api/tasks/timeseries/', {'interval': 'week', 'date_from': '2026-03-04', 'date_to': '2026-03-10'}
+        )
+        first, last = response.data['series']
+        self.assertEqual(
+            (first['bucket'], first['start'], first['end'], first['partial']),
+            ('2026-03-02', '2026-03-04', '2026-03-08', True),
+        )
+        # Só conta o que está dentro do período pedido
+        self.assertEqual((first['created'], first['completed']), (1, 1))
+        self.assertEqual(
+            (last['bucket'], last['start'], last['end'], last['partial']),
+            ('2026-03-09', '2026-03-09', '2026-03-10', True),
+        )
+
+        months = self.client.get(
+            '/api/tasks/timeseries/', {'interval': 'month', 'date_from': '2026-02-01', 'date_to': '2026-03-31'}
+        ).data['series']
+        self.assertEqual([item['partial'] for item in months], [False, False])
+        self.assertEqual(months[0]['end'], '2026-02-28')
+
+    def test_writes_update_series(self):
+        """
+        Test that new and completed tasks show up in today's bucket
+        """
+        today = timezone.localdate().isoformat()
+        self.series()
+        response = self.client.post('/api/tasks/', {'title': 'Hoje'}, format='json')
+        self.client.patch(f'/api/tasks/{response.data["id"]}/', {'status': 'completed'}, format='json')
+
+        series, _ = self.series()
+        self.assertEqual(series[today], (1, 1))
+        self.assertEqual(len(series), 30)
+
+    def test_invalid_params(self):
+        """
+        Test that unknown intervals, timezones, dates and oversized ranges are rejected
+        """
+        cases = [
+            ({'interval': 'hour'}, 'interval'),
+            ({'tz': 'Marte/Base'}, 'tz'),
+            ({'date_from': '01/03/2026'}, 'date_from'),
+            ({'date_from': '2026-03-10', 'date_to': '2026-03-01'}, 'date_from'),
+            ({'date_from': '2010-01-01', 'date_to': '2026-01-01'}, 'date_from'),
+        ]
+        for params, field in cases:
+            response = self.client.get('/api/tasks/timeseries/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+            self.assertIn(field, response.data)
+
+
+class TaskEventLogTestCase(APITestCase):
+    """
+    Test suite for completed_at, the task event log and flow metrics
+    """
+
+    def setUp(self):
+        """Set up test data and authentication"""
+        self.user = User.objects.create_user(username='eventsuser', password='eventspass123')
+        self.client.force_authenticate(user=self.user)
+
+    def kinds(self, task_id):
+        return list(
+            TaskEvent.objects.filter(task_id=task_id).order_by('occurred_at', 'id').values_list('kind', flat=True)
+        )
+
+    def test_transitions_set_completed_at_and_log_events(self):
+        """
+        Test that completing, reopening and deleting a task are logged and kept after deletion
+        """
+        task_id = self.client.post('/api/tasks/', {'title': 'Com histórico'}, format='json').data['id']
+        response = self.client.patch(f'/api/tasks/{task_id}/', {'status': 'completed'}, format='json')
+        self.assertIsNotNone(response.data['completed_at'])
+        self.assertIsNotNone(Task.objects.get(pk=task_id).completed_at)
+
+        response = self.client.patch(f'/api/tasks/{task_id}/', {'status': 'pending'}, format='json')
+        self.assertIsNone(response.data['completed_at'])
+        # Edição sem mudar o status não gera evento
+        self.client.patch(f'/api/tasks/{task_id}/', {'title': 'Renomeada'}, format='json')
+        self.client.delete(f'/api/tasks/{task_id}/')
+
+        self.assertEqual(self.kinds(task_id), ['created', 'completed', 'reopened', 'deleted'])
+        response = self.client.get(f'/api/tasks/{task_id}/history/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([event['kind'] for event in response.data['events']], self.kinds(task_id))
+
+        other = User.objects.create_user(username='eventsother', password='otherpass123')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(f'/api/tasks/{task_id}/history/').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bulk_writes_log_events(self):
+        """
+        Test that bulk create, bulk update and bulk status keep completed_at and the log in sync
+        """
+        created = self.client.post('/api/tasks/bulk_create/', [
+            {'title': 'Lote 1'}, {'title': 'Lote 2', 'status': 'completed'}, {'title': 'Lote 3'},
+        ], format='json').data['created']
+        first, second, third = (item['id'] for item in created)
+        self.assertEqual(self.kinds(second), ['created', 'completed'])
+
+        self.client.patch('/api/tasks/bulk_update/', [{'id': first, 'status': 'completed'}], format='json')
+        self.client.post('/api/tasks/bulk_status/', {'status': 'completed'}, format='json')
+        self.client.post('/api/tasks/bulk_status/', {'status': 'pending', 'filters': {'search': 'Lote'}}, format='json')
+
+        self.assertEqual(self.kinds(first), ['created', 'completed', 'reopened'])
+        self.assertEqual(self.kinds(second), ['created', 'completed', 'reopened'])
+        self.assertEqual(self.kinds(third), ['created', 'completed', 'reopened'])
+        self.assertFalse(Task.objects.filter(user=self.user, completed_at__isnull=False).exists())
+
+    def test_completed_today_counts_completion_date(self):
+        """
+        Test that completed_today counts tasks completed today, whatever their creation day
+        """
+        task = Task.objects.create(user=self.user, title='Antiga')
+        Task.objects.filter(pk=task.pk).update(created_at=timezone.now() - timedelta(days=3))
+        self.client.get('/api/tasks/statistics/')
+        self.client.patch(f'/api/tasks/{task.pk}/', {'status': 'completed'}, format='json')
+
+        response = self.client.get('/api/tasks/statistics/')
+        self.assertEqual(response.data['completed_today'], 1)
+        self.assertEqual(count_tasks(Task.objects.filter(user=self.user))['completed_today'], 1)
+
+        # O resumo diário reconstruído chega ao mesmo número
+        rebuild_user_stats(self.user.pk)
+        get_cache().clear()
+        self.assertEqual(self.client.get('/api/tasks/statistics/').data['completed_today'], 1)
+
+        today = timezone.localdate().isoformat()
+        series = self.client.get('/api/tasks/timeseries/').data['series']
+        self.assertEqual([item['completions'] for item in series if item['bucket'] == today], [1])
+
+    def test_flow_metric_percentiles(self):
+        """
+        Test lead time and cycle time percentiles computed in one query from the log
+        """
+        base = timezone.now() - timedelta(days=10)
+        events = []
+        for index, hours in enumerate([1, 2, 3, 4, 10]):
+            events.append(TaskEvent(
+                user=self.user, task_id=index + 1, kind='completed',
+                occurred_at=base + timedelta(hours=hours), task_created_at=base,
+            ))
+        # A tarefa 5 foi reaberta 2 h antes da conclusão: cycle time de 2 h
+        events.append(TaskEvent(
+            user=self.user, task_id=5, kind='reopened',
+            occurred_at=base + timedelta(hours=8), task_created_at=base,
+        ))
+        TaskEvent.objects.bulk_create(events)
+        self.client.get('/api/tasks/statistics/')
+        get_cache().clear()
+
+        # Linha de contadores (ETag) e a agregação sobre o log
+        with self.assertNumQueries(2):
+            lead = self.client.get('/api/tasks/lead-time/').data
+        cycle = self.client.get('/api/tasks/cycle-time/').data
+
+        self.assertEqual(lead['count'], 5)
+        self.assertEqual(lead['percentiles']['p50'], 3 * 3600)
+        self.assertEqual(lead['mean'], 4 * 3600)
+        self.assertEqual(cycle['percentiles']['p50'], 2 * 3600)
+        self.assertAlmostEqual(cycle['percentiles']['p99'], 3.96 * 3600)
+
+        empty = self.client.get('/api/tasks/lead-time/', {'date_to': (timezone.localdate() - timedelta(days=30)).isoformat()}).data
+        self.assertEqual(empty['count'], 0)
+        self.assertIsNone(empty['percentiles']['p50'])
+
+
+class TaskPriorityTestCase(APITestCase):
+    """
+    Test suite for the database-computed priority filter and ordering
+    """
+
+    def setUp(self):
+        """Set up one task per priority level plus a completed one"""
+        self.user = User.objects.create_user(
+            username='priorityuser',
+            email='priority@test.com',
+            password='prioritypass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        ages = {'alta': 10, 'media': 5, 'baixa': 1, 'feita': 20}
+        self.tasks = {}
+        for name, days in ages.items():
+            task = Task.objects.create(
+                title=name, status='completed' if name == 'feita' else 'pending', user=self.user
+            )
+            Task.objects.filter(pk=task.pk).update(created_at=timezone.now() - timedelta(days=days))
+            self.tasks[name] = task.pk
+
+    def titles(self, params):
+        response = self.client.get('/api/tasks/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [task['title'] for task in response.data]
+
+    def test_filter_by_priority(self):
+        """
+        Test that ?priority= keeps only pending tasks of that age band
+        """
+        self.assertEqual(self.titles({'priority': 'alta'}), ['alta'])
+        self.assertEqual(self.titles({'priority': 'média'}), ['media'])
+        self.assertEqual(self.titles({'priority': 'baixa'}), ['baixa'])
+        # Valor desconhecido é ignorado, como as datas inválidas
+        self.assertEqual(len(self.titles({'priority': 'urgente'})), 4)
+
+        print("✓ Priority filter maps onto created_at ranges")
+
+    def test_ordering_by_priority(self):
+        """
+        Test that -priority lists the most urgent first and non-pending tasks last
+        """
+        self.assertEqual(self.titles({'ordering': '-priority'}), ['alta', 'media', 'baixa', 'feita'])
+        self.assertEqual(self.titles({'ordering': 'priority'}), ['feita', 'baixa', 'media', 'alta'])
+        self.assertEqual(
+            self.titles({'ordering': '-priority', 'status': 'pending'}), ['alta', 'media', 'baixa']
+        )
+
+        print("✓ Ordering by priority")
+
+    def test_priority_ordering_paginates(self):
+        """
+        Test that cursor pagination walks the priority ordering without gaps
+        """
+        seen = []
+        response = self.client.get('/api/tasks/', {'ordering': '-priority', 'page_size': 1})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(task['title'] for task in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(seen, ['alta', 'media', 'baixa', 'feita'])
+
+        print("✓ Cursor pagination over priority ordering")
+
+    def test_priority_responses_are_keyed_by_day(self):
+        """
+        Test that the ETag of a priority query changes with the date
+        """
+        with patch('django.utils.timezone.localdate', return_value=date(2026, 3, 1)):
+            first = self.client.get('/api/tasks/', {'priority': 'alta'})
+        with patch('django.utils.timezone.localdate', return_value=date(2026, 3, 2)):
+            second = self.client.get('/api/tasks/', {'priority': 'alta'})
+
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+        print("✓ Priority responses include the day in their cache key")
+
+
+class HealthProbeTestCase(TestCase):
+    """
+    Test suite for the health endpoints, the readiness backoff and pool metrics
+    """
+
+    def setUp(self):
+        """Set up a fresh readiness probe and an isolated metrics store"""
+        reset_readiness_probe()
+        self.addCleanup(reset_readiness_probe)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.metrics_db = os.path.join(directory, 'metrics.sqlite3')
+        settings_override = override_settings(METRICS_DB=self.metrics_db, METRICS_FLUSH_SECONDS=60)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        reset_metrics()
+        self.addCleanup(reset_metrics)
+        self.now = 100.0
+
+    def clock(self):
+        return self.now
+
+    def test_live_and_ready(self):
+        """
+        Test that both probes answer 200 while the database is up
+        """
+        self.assertEqual(self.client.get('/health/live').status_code, 200)
+
+        response = self.client.get('/health/ready')
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['status'], 'ok')
+        self.assertEqual(body['database']['status'], 'ok')
+        if settings.DB_POOL:
+            self.assertEqual(body['pool']['max_size'], get_pool().max_size)
+
+        print("✓ /health/live and /health/ready answer 200")
+
+    def test_backoff_doubles_between_failures(self):
+        """
+        Test that failed checks are not retried before the backoff delay, which doubles
+        """
+        calls = []
+
+        def failing_check():
+            calls.append(self.now)
+            raise OSError('connection refused')
+
+        probe = ReadinessProbe(check=failing_check, base_delay=1, max_delay=4, clock=self.clock)
+        for _ in range(3):
+            result = probe.check()
+        self.assertFalse(result['ready'])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(result['retry_after'], 1)
+        self.assertIn('connection refused', result['database']['error'])
+
+        delays = []
+        for _ in range(4):
+            self.now += probe.retry_after()
+            probe.check()
+            delays.append(probe.retry_after())
+        self.assertEqual(delays, [2, 4, 4, 4])
+        self.assertEqual(len(calls), 5)
+
+        probe.check_database = lambda: 1.0
+        self.now += probe.retry_after()
+        self.assertTrue(probe.check()['ready'])
+        self.assertEqual(probe.failures, 0)
+
+        print("✓ Readiness checks back off exponentially")
+
+    def test_wait_for_database_sleeps_the_backoff(self):
+        """
+        Test that wait_for_database retries until the database answers
+        """
+        outcomes = [OSError('down'), OSError('down'), 2.5]
+
+        def check():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        def sleep(seconds):
+            slept.append(seconds)
+            self.now += seconds
+
+        slept = []
+        probe = ReadinessProbe(check=check, base_delay=0.5, max_delay=10, clock=self.clock)
+        result = wait_for_database(probe, timeout=10, sleep=sleep)
+
+        self.assertTrue(result['ready'])
+        self.assertEqual(slept, [0.5, 1.0])
+
+    def test_unavailable_database_returns_503(self):
+        """
+        Test that /health/ready answers 503 with Retry-After when the check fails
+        """
+        def failing_check():
+            raise OSError('timeout')
+
+        probe = ReadinessProbe(check=failing_check, base_delay=2, max_delay=30)
+        with patch('core.health.get_readiness_probe', return_value=probe):
+            response = self.client.get('/health/ready')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '2')
+        self.assertEqual(response.json()['database']['status'], 'unavailable')
+
+    @skipUnless(settings.DB_POOL, 'psycopg_pool não instalado')
+    def test_pool_metrics_exposed(self):
+        """
+        Test that pool usage counters and per-process gauges reach /metrics
+        """
+        self.client.get('/health/ready')
+        with override_settings(METRICS_TOKEN='segredo'):
+            body = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer segredo').content.decode()
+
+        self.assertIn('# TYPE db_pool_size gauge', body)
+        self.assertIn(f'db_pool_size{{alias="default",pid="{os.getpid()}"}}', body)
+        self.assertIn('db_pool_requests_total{alias="default"}', body)
+
+    def test_gauges_of_finished_processes_are_dropped(self):
+        """
+        Test that a gauge written by a process that exited disappears from the scrape
+        """
+        script = (
+            'from core.metrics import MetricsStore\n'
+            f'store = MetricsStore({self.metrics_db!r})\n'
+            "store.set('db_pool_size', 7, {'alias': 'default'})\n"
+            'store.flush()\n'
+        )
+        subprocess.run([sys.executable, '-c', script], check=True, cwd=settings.BASE_DIR)
+
+        store = MetricsStore(self.metrics_db)
+        self.assertEqual(len(store.connect().execute('SELECT * FROM samples').fetchall()), 1)
+        self.assertNotIn('db_pool_size', store.render())
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], READ_YOUR_WRITES_SECONDS=60)
+class ReadReplicaTestCase(TransactionTestCase):
+    """
+    Test suite for read-replica routing with read-your-writes pinning
+
+    replica1 is a test mirror of default, so a TransactionTestCase is needed
+    for its connection to see the committed rows.
+    """
+    databases = {'default', 'replica1'}
+
+    def setUp(self):
+        """Set up committed tasks and an authenticated client"""
+        self.user = User.objects.create_user(username='replicauser', password='replicapass123')
+        for i in range(3):
+            Task.objects.create(title=f'Relatório {i}', user=self.user)
+        # Contadores já criados: a reconstrução roda numa transação no default
+        rebuild_user_stats(self.user.pk)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.clear_cache()
+
+    def clear_cache(self):
+        """Drop the read-your-writes pins and cached responses"""
+        get_cache().clear()
+
+    def task_queries(self, method, path, data=None):
+        """Run a request and return (response, task queries on default, task queries on replica1)"""
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica1']) as replica:
+            response = getattr(self.client, method)(path, data, format='json')
+            if response.streaming:
+                b''.join(response.streaming_content)
+
+        def reads(queries):
+            # DECLARE: o export lê por um cursor no servidor
+            return [
+                q['sql'] for q in queries.captured_queries
+                if q['sql'].startswith(('SELECT', 'DECLARE')) and '"tasks_task"' in q['sql']
+            ]
+        return response, reads(primary), reads(replica)
+
+    def test_heavy_reads_go_to_the_replica(self):
+        """
+        Test that list, search, statistics and export_csv read tasks from the replica
+        """
+        for path, params in [
+            ('/api/tasks/', {}),
+            ('/api/tasks/search/', {'q': 'relatório'}),
+            ('/api/tasks/statistics/', {'status': 'pending'}),
+            ('/api/tasks/export_csv/', {}),
+        ]:
+            response, primary, replica = self.task_queries('get', path, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, path)
+            self.assertTrue(replica, path)
+            self.assertEqual(primary, [], path)
+
+        print("✓ Heavy reads routed to replica1")
+
+    def test_user_reads_own_writes_from_primary(self):
+        """
+        Test that after a write the user's reads stay on the primary until the pin expires
+        """
+        response, _, _ = self.task_queries('post', '/api/tasks/', {'title': 'Nova'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response, primary, replica = self.task_queries('get', '/api/tasks/')
+        self.assertIn('Nova', [task['title'] for task in response.data])
+        self.assertTrue(primary)
+        self.assertEqual(replica, [])
+
+        # Outro usuário não é afetado pela escrita
+        other = User.objects.create_user(username='outro', password='outropass123')
+        self.client.force_authenticate(user=other)
+        _, primary, replica = self.task_queries('get', '/api/tasks/')
+        self.assertTrue(replica)
+
+        self.client.force_authenticate(user=self.user)
+        self.clear_cache()
+        _, primary, replica = self.task_queries('get', '/api/tasks/')
+        self.assertTrue(replica)
+        self.assertEqual(primary, [])
+
+        print("✓ Read-your-writes pinning")
+
+    def test_other_actions_and_writes_stay_on_primary(self):
+        """
+        Test that detail reads and writes never touch the replica
+        """
+        task = Task.objects.filter(user=self.user).first()
+        self.clear_cache()
+        _, primary, replica = self.task_queries('get', f'/api/tasks/{task.pk}/')
+        self.assertTrue(primary)
+        self.assertEqual(replica, [])
+
+        _, _, replica = self.task_queries('patch', f'/api/tasks/{task.pk}/', {'status': 'completed'})
+        self.assertEqual(replica, [])
+
+    def test_stats_version_is_read_from_primary(self):
+        """
+        Test that the ETag version and the lazy counters rebuild use the primary on replica actions
+        """
+        def stats_queries(queries):
+            return [q['sql'] for q in queries.captured_queries if '"tasks_usertaskstats"' in q['sql']]
+
+        for rebuilt in (False, True):
+            if rebuilt:
+                UserTaskStats.objects.filter(user=self.user).delete()
+                self.clear_cache()
+            with CaptureQueriesContext(connections['default']) as primary, \
+                    CaptureQueriesContext(connections['replica1']) as replica:
+                response = self.client.get('/api/tasks/statistics/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(stats_queries(primary))
+            self.assertEqual(stats_queries(replica), [])
+        self.assertEqual(response.data['total_tasks'], 3)
+        self.assertTrue(UserTaskStats.objects.filter(user=self.user).exists())
+
+
+class StatsRebuildRaceTestCase(TransactionTestCase):
+    """
+    Test suite for writes racing the lazy counters rebuild
+
+    Each side runs in its own thread (and connection), so the writes must
+    be committed.
+    """
+
+    def setUp(self):
+        """Set up an untracked user with committed tasks"""
+        self.user = User.objects.create_user(username='raceuser', password='racepass123')
+        for i in range(3):
+            Task.objects.create(title=f'Tarefa {i}', user=self.user)
+        UserTaskStats.objects.filter(user=self.user).delete()
+
+    def test_write_during_rebuild_is_counted(self):
+        """
+        Test that a task committed between the rebuild's aggregate and its row write is not lost
+        """
+        aggregated, release = threading.Event(), threading.Event()
+        update_or_create = UserTaskStats.objects.update_or_create
+
+        def paused_update_or_create(*args, **kwargs):
+            aggregated.set()
+            release.wait(10)
+            return update_or_create(*args, **kwargs)
+
+        def in_thread(target):
+            def run():
+                try:
+                    target()
+                finally:
+                    connection.close()
+            thread = threading.Thread(target=run)
+            thread.start()
+            return thread
+
+        with patch.object(UserTaskStats.objects, 'update_or_create', paused_update_or_create):
+            rebuild = in_thread(lambda: rebuild_user_stats(self.user.pk))
+            self.assertTrue(aggregated.wait(10))
+            write = in_thread(lambda: Task.objects.create(title='Durante', user=self.user, status='completed'))
+            # O writer fica preso no lock até a reconstrução gravar a linha
+            write.join(0.5)
+            release.set()
+            rebuild.join(10)
+            write.join(10)
+
+        stats = UserTaskStats.objects.get(user=self.user)
+        self.assertEqual((stats.total, stats.pending, stats.completed), (4, 3, 1))
+        daily = DailyTaskStats.objects.get(user=self.user)
+        self.assertEqual((daily.created, daily.completed, daily.completions), (4, 1, 1))
+
+
+class UserCacheTestCase(APITestCase):
+    """
+    Test suite for the authenticated-user cache on the JWT path
+    """
+
+    def setUp(self):
+        """Set up a user with an access token and an empty user cache"""
+        reset_user_cache()
+        self.addCleanup(reset_user_cache)
+        self.user = User.objects.create_user(username='cacheuser', password='cachepass123')
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def user_queries(self, path='/api/tasks/'):
+        """Run a GET and return (response, SELECTs on auth_user)"""
+        # Só as respostas: a versão do usuário no cache compartilhado fica
+        get_cache().delete(generation_key(self.user.pk))
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(path)
+        return response, [q['sql'] for q in captured.captured_queries if '"auth_user"' in q['sql']]
+
+    def test_user_loaded_once(self):
+        """
+        Test that only the first request with a token loads the user
+        """
+        response, first = self.user_queries()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(first), 1)
+
+        response, second = self.user_queries()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(second, [])
+
+        print("✓ JWT user served from the cache")
+
+    def test_user_change_evicts_entry(self):
+        """
+        Test that saving or deleting the user removes it from the cache
+        """
+        self.user_queries()
+        self.assertIsNotNone(get_user_cache().get(self.user.pk, get_user_version(self.user.pk)))
+
+        self.user.first_name = 'Novo'
+        self.user.save()
+        self.assertIsNone(get_user_cache().get(self.user.pk, get_user_version(self.user.pk)))
+
+        self.user_queries()
+        self.assertEqual(get_user_cache().get(self.user.pk, get_user_version(self.user.pk)).first_name, 'Novo')
+
+    def test_change_in_another_worker_invalidates_entry(self):
+        """
+        Test that a version bump from another process invalidates this process's entry
+        """
+        self.user_queries()
+        # Outro worker desativou o usuário: aqui só a versão compartilhada muda
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        bump_user_version(self.user.pk)
+
+        response, queries = self.user_queries()
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(len(queries), 1)
+
+        print("✓ User change in another worker invalidates the cached user")
+
+    def test_deactivated_user_rejected(self):
+        """
+        Test that a deactivated user is rejected on the next request
+        """
+        self.user_queries()
+        self.user.is_active = False
+        self.user.save()
+
+        response, _ = self.user_queries()
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # Mesmo com o usuário inativo no cache (outro worker), a checagem vale
+        get_user_cache().set(self.user.pk, self.user, get_user_version(self.user.pk))
+        response, queries = self.user_queries()
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(queries, [])
+
+        print("✓ Deactivated user rejected")
+
+    def test_requests_get_their_own_user_object(self):
+        """
+        Test that attributes set on request.user do not leak into the cache
+        """
+        self.user_queries()
+        cached = get_user_cache().get(self.user.pk)
+        request = APIRequestFactory().get('/api/tasks/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        user, _ = CachedJWTAuthentication().authenticate(Request(request))
+        user.scratch = True
+        self.assertIsNot(user, cached)
+        self.assertFalse(hasattr(cached, 'scratch'))
+
+    def test_lru_size_and_ttl(self):
+        """
+        Test that the cache evicts the least recently used entry and expired entries
+        """
+        now = [0.0]
+        cache = UserCache(maxsize=2, ttl=10, clock=lambda: now[0])
+        cache.set(1, 'a')
+        cache.set(2, 'b')
+        self.assertEqual(cache.get('1'), 'a')
+        cache.set(3, 'c')
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(len(cache), 2)
+
+        now[0] = 10
+        self.assertIsNone(cache.get(1))
+        self.assertIsNone(cache.get(3))
+
+        cache.set(4, 'd', version='v1')
+        self.assertIsNone(cache.get(4, version='v2'))
+        self.assertIsNone(cache.get(4, version='v1'))
+
+        disabled = UserCache(maxsize=2, ttl=0)
+        disabled.set(1, 'a')
+        self.assertIsNone(disabled.get(1))
+
+
+class ThrottleTestCase(APITestCase):
+    """
+    Test suite for the cost-aware token-bucket throttle on expensive task actions
+    """
+
+    def setUp(self):
+        """Set up an isolated bucket store with a slow refill and authentication"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.throttle_db = os.path.join(directory, 'throttle.sqlite3')
+        settings_override = override_settings(
+            THROTTLE_ENABLED=True, THROTTLE_DB=self.throttle_db,
+            THROTTLE_RATE=0.5, THROTTLE_BURST=40,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        reset_throttle_store()
+        self.addCleanup(reset_throttle_store)
+
+        self.user = User.objects.create_user(username='throttleuser', password='throttlepass123')
+        Task.objects.create(title='Relatório', user=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def export(self):
+        response = self.client.get('/api/tasks/export_csv/')
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def test_bucket_refill_and_wait(self):
+        """
+        Test that the bucket refills over time and reports the wait for the missing tokens
+        """
+        now = [1000.0]
+        store = TokenBucketStore(self.throttle_db, rate=1, burst=10, clock=lambda: now[0])
+        self.assertEqual(store.consume('a', 4), (True, 0.0))
+        self.assertEqual(store.consume('a', 4), (True, 0.0))
+        self.assertEqual(store.consume('a', 4), (False, 2.0))
+        self.assertEqual(store.consume('b', 4), (True, 0.0))
+
+        now[0] += 2
+        self.assertEqual(store.consume('a', 4), (True, 0.0))
+
+        # Outro processo com o mesmo arquivo vê o mesmo balde
+        other = TokenBucketStore(self.throttle_db, rate=1, burst=10, clock=lambda: now[0])
+        self.assertFalse(other.consume('a', 4)[0])
+
+        # Custo maior que o balde vale o balde inteiro
+        now[0] += 100
+        self.assertTrue(store.consume('a', 50)[0])
+
+        print("✓ Token bucket refill shared across stores")
+
+    def test_action_costs(self):
+        """
+        Test that only unbounded search and filtered statistics pay their full cost
+        """
+        self.assertEqual(action_cost('list', {}), 0)
+        self.assertEqual(action_cost('export_csv', {}), settings.THROTTLE_COSTS['export_csv'])
+        self.assertEqual(action_cost('search', {}), settings.THROTTLE_COSTS['search'])
+        self.assertEqual(action_cost('search', {'q': 'projeto'}), settings.THROTTLE_BOUNDED_COST)
+        self.assertEqual(action_cost('search', {'page_size': '20'}), settings.THROTTLE_BOUNDED_COST)
+        self.assertEqual(action_cost('statistics', {}), settings.THROTTLE_BOUNDED_COST)
+        self.assertEqual(
+            action_cost('statistics', {'status': 'pending'}), settings.THROTTLE_COSTS['statistics']
+        )
+
+    def test_expensive_action_returns_429(self):
+        """
+        Test that repeated exports get 429 with Retry-After while cheap actions and other users pass
+        """
+        self.assertEqual(self.export().status_code, status.HTTP_200_OK)
+        self.assertEqual(self.export().status_code, status.HTTP_200_OK)
+
+        response = self.export()
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # 20 fichas faltando a 0.5 por segundo
+        self.assertEqual(response['Retry-After'], '40')
+
+        # Ações sem custo não dependem do balde
+        task = Task.objects.get(user=self.user)
+        self.assertEqual(self.client.get('/api/tasks/').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(f'/api/tasks/{task.pk}/').status_code, status.HTTP_200_OK)
+
+        other = User.objects.create_user(username='outro', password='outropass123')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.export().status_code, status.HTTP_200_OK)
+
+        print("✓ 429 with Retry-After for repeated exports")
+
+    @override_settings(ROOT_URLCONF='core.urls_async')
+    def test_async_views_are_throttled(self):
+        """
+        Test that the async views apply the same limit
+        """
+        clear_diagnostics_cache()
+        self.addCleanup(clear_diagnostics_cache)
+        token = str(RefreshToken.for_user(self.user).access_token)
+        client = AsyncClient()
+        get = async_to_sync(client.get)
+        headers = {'Authorization': f'Bearer {token}'}
+
+        with StubHTTPServer(lambda path: (200, {'ok': True})) as stub:
+            with override_settings(DIAGNOSTICO_TARGETS=[('Stub', stub.url + '/health')]):
+                for _ in range(4):
+                    response = get('/api/tasks/diagnostico/', headers=headers)
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+                response = get('/api/tasks/diagnostico/', headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        self.assertIn('detail', response.json())
+
+        # Ações sem custo seguem atendidas
+        self.assertEqual(get('/api/tasks/', headers=headers).status_code, status.HTTP_200_OK)
+
+
+class TaskImportTestCase(APITestCase):
+    """
+    Test suite for the streaming CSV import
+    """
+
+    def setUp(self):
+        """Set up a source user with exported tasks and an importing user"""
+        self.source = User.objects.create_user(username='origem', password='origempass123')
+        old = Task.objects.create(title='Antiga', description='', user=self.source)
+        Task.objects.filter(pk=old.pk).update(created_at=datetime(2024, 3, 5, 14, 30, tzinfo=dt_timezone.utc))
+        Task.objects.create(
+            title='Feita', description='Com "aspas"; e ponto e vírgula\nem duas linhas',
+            status='completed', user=self.source,
+        )
+        self.user = User.objects.create_user(username='importuser', password='importpass123')
+        self.client.force_authenticate(user=self.user)
+        self.client.get('/api/tasks/statistics/')
+
+    def exported_csv(self):
+        self.client.force_authenticate(user=self.source)
+        response = self.client.get('/api/tasks/export_csv/', {'ordering': 'created_at'})
+        self.client.force_authenticate(user=self.user)
+        return b''.join(response.streaming_content)
+
+    def upload(self, content):
+        return self.client.post(
+            '/api/tasks/import_csv/',
+            {'file': SimpleUploadedFile('tarefas.csv', content, content_type='text/csv')},
+            format='multipart',
+        )
+
+    def test_export_round_trip(self):
+        """
+        Test that an exported CSV imports back with the same tasks, dates and counters
+        """
+        response = self.upload(self.exported_csv())
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual((response.data['rows'], response.data['created'], response.data['failed']), (2, 2, 0))
+        self.assertIn('rows_per_second', response.data)
+
+        imported = list(Task.objects.filter(user=self.user).order_by('created_at'))
+        source = list(Task.objects.filter(user=self.source).order_by('created_at'))
+        self.assertEqual(
+            [(t.title, t.description, t.status) for t in imported],
+            [(t.title, t.description, t.status) for t in source],
+        )
+        for task, original in zip(imported, source):
+            self.assertEqual(task.created_at, original.created_at.replace(second=0, microsecond=0))
+        self.assertEqual(imported[1].completed_at, imported[1].created_at)
+        self.assertEqual(TaskEvent.objects.filter(user=self.user).count(), 3)
+
+        stats = self.client.get('/api/tasks/statistics/').data
+        for key, value in count_tasks(Task.objects.filter(user=self.user)).items():
+            self.assertEqual(stats[key], value, key)
+
+        print("✓ CSV export imported back")
+
+    def test_row_errors_and_chunks(self):
+        """
+        Test that invalid rows are reported by row number and valid ones inserted per chunk
+        """
+        content = (
+            '\ufeff"ID";"Título";"Descrição";"Status";"Prioridade";"Data de Criação";"Hora de Criação"\n'
+            '"1";"Boa";"";"Pendente";"Alta";"01/02/2024";"08:15"\n'
+            '"2";"";"";"Pendente";"";"";""\n'
+            '"3";"Status ruim";"";"Arquivada";"";"";""\n'
+            '"4";"Data ruim";"";"concluída";"";"2024-02-01";""\n'
+            '"5";"Sem data";"";"completed";"";"";""\n'
+            '"6";"Última";"";"";"";"";""\n'
+        ).encode()
+        with CaptureQueriesContext(connection) as queries:
+            report = import_tasks_csv(self.user, BytesIO(content), chunk_size=2)
+
+        self.assertEqual((report['rows'], report['created'], report['failed']), (6, 3, 3))
+        self.assertEqual([error['row'] for error in report['errors']], [2, 3, 4])
+        self.assertIn('title', report['errors'][0]['errors'])
+        self.assertIn('status', report['errors'][1]['errors'])
+        self.assertIn('Data de Criação', report['errors'][2]['errors'])
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "tasks_task"')]
+        # Blocos (1, 2), (3, 4) e (5, 6); o segundo não tem linha válida
+        self.assertEqual(len(inserts), 2)
+
+        tasks = {task.title: task for task in Task.objects.filter(user=self.user)}
+        self.assertEqual(tasks['Boa'].created_at, datetime(2024, 2, 1, 8, 15, tzinfo=dt_timezone.utc))
+        self.assertEqual(tasks['Sem data'].status, 'completed')
+        self.assertEqual(tasks['Última'].status, 'pending')
+
+        report = import_tasks_csv(self.user, BytesIO(content), max_errors=1)
+        self.assertEqual(len(report['errors']), 1)
+        self.assertTrue(report['errors_truncated'])
+
+    def test_invalid_uploads(self):
+        """
+        Test that a missing file or a CSV without the export header returns 400
+        """
+        response = self.client.post('/api/tasks/import_csv/', {}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('file', response.data)
+
+        response = self.upload(b'title,status\nx,pending\n')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Título', response.data['detail'])
+
+        response = self.upload('"Título"\n"Só erros"\n'.encode('latin-1'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Task.objects.filter(user=self.user).exists())
+
+    def test_upload_size_limit(self):
+        """
+        Test that files above IMPORT_MAX_UPLOAD_BYTES are refused with 413 before any import
+        """
+        content = self.exported_csv()
+        with override_settings(IMPORT_MAX_UPLOAD_BYTES=len(content) - 1):
+            response = self.upload(content)
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertIn('import_tasks', response.data['detail'])
+        self.assertFalse(Task.objects.filter(user=self.user).exists())
+
+        with override_settings(IMPORT_MAX_UPLOAD_BYTES=len(content)):
+            self.assertEqual(self.upload(content).status_code, status.HTTP_201_CREATED)
+
+    def test_import_command(self):
+        """
+        Test that import_tasks reads a file from disk and prints the summary
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'tarefas.csv')
+        with open(path, 'wb') as handle:
+            handle.write(self.exported_csv())
+
+        out = StringIO()
+        call_command('import_tasks', path, user='importuser', chunk_size=1, stdout=out, stderr=StringIO())
+        self.assertIn('2 linhas, 2 criadas, 0 com erro', out.getvalue())
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 2)
@@ -0,0 +1,193 @@
+"""
+Limite de uso por usuário para as ações caras de TaskViewSet.
+
+Cada usuário tem um balde de THROTTLE_BURST fichas que se recarrega a
+THROTTLE_RATE fichas por segundo; cada requisição a uma ação cara gasta o
+custo dela (THROTTLE_COSTS) e, sem fichas suficientes, recebe 429 com
+Retry-After. As demais ações não gastam nada nem tocam no balde.
+
+Os baldes ficam num SQLite (THROTTLE_DB), como as métricas, para valerem
+para todos os workers do gunicorn no mesmo host sem um serviço externo.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from core.metrics import get_metrics
+from .filters import has_row_filters
+
+
+logger = logging.getLogger(__name__)
+
+# Baldes parados há mais que o tempo de recarga completa estão cheios e
+# podem ser apagados; a limpeza roda a cada PRUNE_EVERY consumos
+PRUNE_EVERY = 1000
+
+
+class TokenBucketStore:
+    """
+    Baldes de fichas num SQLite compartilhado entre processos.
+
+    consume() lê, recarrega e desconta o balde numa transação IMMEDIATE, o
+    que serializa os workers que disputam o mesmo arquivo. O relógio é o de
+    parede (time.time), o único comum a todos os processos.
+    """
+
+    def __init__(self, path, rate, burst, clock=time.time):
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self._ready = False
+        self._calls = 0
+        self._lock = threading.Lock()
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        if not self._ready:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+            self._ready = True
+        return conn
+
+    def consume(self, key, cost):
+        """
+        Desconta cost fichas do balde de key. Devolve (permitido, segundos
+        até haver fichas suficientes).
+
+        Um custo maior que o balde é tratado como o balde inteiro, para a
+        ação continuar possível com o balde cheio.
+        """
+        cost = min(cost, self.burst)
+        now = self.clock()
+        conn = self.connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+                tokens = self.burst
+                if row is not None:
+                    tokens = min(self.burst, row[0] + max(0.0, now - row[1]) * self.rate)
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                conn.execute(
+                    'INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) '
+                    'ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                    (key, tokens, now)
+                )
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            if self.should_prune():
+                self.prune(conn, now)
+        finally:
+            conn.close()
+        return allowed, 0.0 if allowed else (cost - tokens) / self.rate
+
+    def should_prune(self):
+        with self._lock:
+            self._calls += 1
+            return self._calls % PRUNE_EVERY == 0
+
+    def prune(self, conn, now):
+        conn.execute('DELETE FROM buckets WHERE updated < ?', (now - self.burst / self.rate,))
+
+    def reset(self):
+        conn = self.connect()
+        try:
+            conn.execute('DELETE FROM buckets')
+        finally:
+            conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_throttle_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                os.makedirs(os.path.dirname(settings.THROTTLE_DB) or '.', exist_ok=True)
+                _store = TokenBucketStore(
+                    settings.THROTTLE_DB, settings.THROTTLE_RATE, settings.THROTTLE_BURST
+                )
+    return _store
+
+
+def reset_throttle_store():
+    global _store
+    with _store_lock:
+        _store = None
+
+
+def action_cost(action, query_params):
+    """
+    Fichas gastas por uma requisição à ação.
+
+    search só custa o valor cheio sem termo, filtros nem paginação (devolve
+    todas as tarefas); statistics, com filtros (agrega sobre as linhas em
+    vez de ler os contadores). Nos outros casos as duas custam
+    THROTTLE_BOUNDED_COST.
+    """
+    cost = settings.THROTTLE_COSTS.get(action, 0)
+    if action == 'search':
+        bounded = (
+            query_params.get('q') or has_row_filters(query_params)
+            or 'page_size' in query_params or 'cursor' in query_params
+        )
+        if bounded:
+            return min(cost, settings.THROTTLE_BOUNDED_COST)
+    if action == 'statistics' and not has_row_filters(query_params):
+        return min(cost, settings.THROTTLE_BOUNDED_COST)
+    return cost
+
+
+class CostThrottle(BaseThrottle):
+    """
+    Throttle do DRF com o custo da ação (action_cost) descontado do balde
+    do usuário (ou do IP, sem autenticação).
+
+    Se o SQLite falhar, a requisição passa: o limite protege os workers,
+    mas não pode derrubá-los.
+    """
+
+    def __init__(self):
+        self._wait = None
+
+    def allow_request(self, request, view):
+        return self.allow_action(request, getattr(view, 'action', None))
+
+    def cost(self, request, action):
+        if not settings.THROTTLE_ENABLED:
+            return 0
+        return action_cost(action, request.query_params)
+
+    def allow_action(self, request, action):
+        cost = self.cost(request, action)
+        if cost <= 0:
+            return True
+        user = getattr(request, 'user', None)
+        key = f'user:{user.pk}' if user and user.is_authenticated else f'ip:{self.get_ident(request)}'
+        try:
+            allowed, self._wait = get_throttle_store().consume(key, cost)
+        except sqlite3.Error as e:
+            logger.warning('Falha ao consultar o limite de uso em %s: %s', settings.THROTTLE_DB, e)
+            return True
+        if not allowed:
+            get_metrics().inc('throttled_requests_total', {'action': action})
+        return allowed
+
+    def wait(self):
+        return self._wait
@@ -0,0 +1,171 @@
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import Count, DateField, Q, Sum
+from django.db.models.functions import Trunc
+from rest_framework import serializers
+
+from .filters import parse_period_params
+from .models import DailyTaskStats, HourlyTaskStats, Task
+
+
+TIMESERIES_INTERVALS = ('day', 'week', 'month')
+
+# Período padrão (em dias, terminando hoje) de cada intervalo
+DEFAULT_RANGE_DAYS = {'day': 30, 'week': 12 * 7, 'month': 365}
+
+MAX_RANGE_DAYS = 5 * 366
+
+
+def parse_timeseries_params(query_params):
+    """
+    (intervalo, date_from, date_to, fuso) de ?interval=&date_from=&date_to=&tz=.
+    """
+    interval = query_params.get('interval', 'day')
+    if interval not in TIMESERIES_INTERVALS:
+        raise serializers.ValidationError({'interval': f'Opções: {", ".join(TIMESERIES_INTERVALS)}'})
+    date_from, date_to, tz = parse_period_params(
+        query_params, DEFAULT_RANGE_DAYS[interval], max_days=MAX_RANGE_DAYS
+    )
+    return interval, date_from, date_to, tz
+
+
+def bucket_start(day, interval):
+    """
+    Primeiro dia do período de day (semanas começam na segunda, como no
+    date_trunc do PostgreSQL).
+    """
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, interval):
+    if interval == 'week':
+        return day + timedelta(days=7)
+    if interval == 'month':
+        return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+    return day + timedelta(days=1)
+
+
+def uses_daily_rollup(tz):
+    """
+    DailyTaskStats guarda os dias no fuso do projeto; outros fusos têm
+    fronteiras de dia diferentes.
+    """
+    return getattr(tz, 'key', None) == settings.TIME_ZONE
+
+
+def uses_hourly_rollup(tz, date_from, date_to):
+    """
+    Os dias de tz são somas de horas UTC inteiras se o deslocamento é de
+    horas cheias em todo o período (não vale, por exemplo, para
+    Asia/Kolkata ou America/St_Johns).
+    """
+    day = date_from
+    while day <= date_to + timedelta(days=1):
+        if datetime.combine(day, time.min, tzinfo=tz).utcoffset() % timedelta(hours=1):
+            return False
+        day += timedelta(days=1)
+    return True
+
+
+def rollup_counts(rows, bucket):
+    """
+    {início do período: (criadas, concluídas, conclusões)} das linhas de
+    DailyTaskStats ou HourlyTaskStats agrupadas pela expressão bucket.
+    """
+    rows = rows.annotate(bucket=bucket).values('bucket').annotate(
+        created_count=Sum('created'),
+        completed_count=Sum('completed'),
+        completions_count=Sum('completions'),
+    ).order_by()
+    return {
+        row['bucket']: (row['created_count'], row['completed_count'], row['completions_count'])
+        for row in rows
+    }
+
+
+def bucket_counts(user, interval, date_from, date_to, tz):
+    """
+    {início do período: (criadas, concluídas, conclusões)}.
+
+    No fuso do projeto agrupa as linhas de DailyTaskStats; em outro fuso de
+    horas cheias, as de HourlyTaskStats truncadas no fuso pedido. Só nos
+    demais fusos o agrupamento trunca created_at e completed_at direto na
+    tabela de tarefas, pelos índices (user, created_at) e (user, completed_at).
+    """
+    if uses_daily_rollup(tz):
+        return rollup_counts(
+            DailyTaskStats.objects.filter(user=user, day__gte=date_from, day__lte=date_to),
+            Trunc('day', interval, output_field=DateField()),
+        )
+
+    start = datetime.combine(date_from, time.min, tzinfo=tz)
+    end = datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=tz)
+    if uses_hourly_rollup(tz, date_from, date_to):
+        return rollup_counts(
+            HourlyTaskStats.objects.filter(user=user, hour__gte=start, hour__lt=end),
+            Trunc('hour', interval, output_field=DateField(), tzinfo=tz),
+        )
+
+    tasks = Task.objects.filter(user=user).order_by()
+    counts = {}
+    created = tasks.filter(created_at__gte=start, created_at__lt=end).annotate(
+        bucket=Trunc('created_at', interval, output_field=DateField(), tzinfo=tz)
+    ).values('bucket').annotate(
+        created_count=Count('id'), completed_count=Count('id', filter=Q(status='completed'))
+    )
+    for row in created:
+        counts[row['bucket']] = (row['created_count'], row['completed_count'], 0)
+    completions = tasks.filter(completed_at__gte=start, completed_at__lt=end).annotate(
+        bucket=Trunc('completed_at', interval, output_field=DateField(), tzinfo=tz)
+    ).values('bucket').annotate(completions_count=Count('id'))
+    for row in completions:
+        created_count, completed_count, _ = counts.get(row['bucket'], (0, 0, 0))
+        counts[row['bucket']] = (created_count, completed_count, row['completions_count'])
+    return counts
+
+
+def task_timeseries(user, interval, date_from, date_to, tz):
+    """
+    Corpo de /api/tasks/timeseries/, com períodos sem atividade preenchidos
+    com zero: tarefas criadas no período, quantas delas estão concluídas e
+    quantas tarefas foram concluídas no período.
+
+    start e end são os dias (inclusivos) que cada período cobre dentro de
+    date_from..date_to; o primeiro e o último podem cobrir só parte do
+    período e saem com partial verdadeiro.
+    """
+    counts = bucket_counts(user, interval, date_from, date_to, tz)
+    series = []
+    totals = {'created': 0, 'completed': 0, 'completions': 0}
+    bucket = bucket_start(date_from, interval)
+    while bucket <= date_to:
+        created, completed, completions = counts.get(bucket, (0, 0, 0))
+        following = next_bucket(bucket, interval)
+        start = max(bucket, date_from)
+        end = min(following - timedelta(days=1), date_to)
+        series.append({
+            'bucket': bucket.isoformat(),
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'partial': start != bucket or end != following - timedelta(days=1),
+            'created': created,
+            'completed': completed,
+            'completions': completions,
+        })
+        totals['created'] += created
+        totals['completed'] += completed
+        totals['completions'] += completions
+        bucket = following
+    return {
+        'interval': interval,
+        'timezone': str(tz),
+        'date_from': date_from.isoformat(),
+        'date_to': date_to.isoformat(),
+        'series': series,
+        'totals': totals,
+    }
@@ -1,9 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TaskViewSet
+from .views import ExportJobViewSet, TaskViewSet
 
 router = DefaultRouter()
 router.register(r'tasks', TaskViewSet, basename='task')
+router.register(r'exports', ExportJobViewSet, basename='export')
 
 urlpatterns = [
     path('api/', include(router.urls)),
@@ -1,77 +1,107 @@
 
-from rest_framework import viewsets, status  
+from rest_framework import mixins, viewsets, status  
 from rest_framework.decorators import action  
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response  
 from rest_framework.permissions import IsAuthenticated  
-from django.db.models import Count, Q  
-from django.http import HttpResponse
-from datetime import datetime, timedelta
-import requests
-import csv
-from .models import Task
-from .serializers import TaskSerializer, TaskUpdateSerializer
-import random
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from core.routers import end_replica_reads, start_replica_reads
+from core.timing import timed
+from .cache import cache_stats, read_database
+from .conditional import conditional_task_response
+from .filters import apply_task_filters, clean_filter_params, has_row_filters, search_filters_applied
+from .events import completion_time_distribution, parse_flow_params
+from .models import ExportJob, Task, TaskEvent
+from .pagination import TaskCursorPagination
+from .serializers import (
+    ExportJobSerializer, TaskEventSerializer, TaskSerializer, TaskUpdateSerializer,
+    parse_task_fields, serialize_task_rows, task_values,
+)
+from .stats import build_statistics, count_tasks, count_user_tasks
+from .throttling import CostThrottle
+from .timeseries import parse_timeseries_params, task_timeseries
+
+# Ações raras (lote, exportação, frases, diagnóstico) importam seus módulos
+# na primeira chamada, para não pesar no boot de cada worker.
+
+# Leituras pesadas servidas por uma réplica, quando houver (core.routers)
+REPLICA_ACTIONS = {'list', 'search', 'statistics', 'export_csv'}
+
 
 class TaskViewSet(viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
+    throttle_classes = [CostThrottle]
+    pagination_class = TaskCursorPagination
+
+    def initial(self, request, *args, **kwargs):
+        """
+        Depois da autenticação, abre as leituras na réplica para as ações de
+        REPLICA_ACTIONS (a menos que o usuário tenha escrito há pouco),
+        até o fim de dispatch.
+        """
+        super().initial(request, *args, **kwargs)
+        if self.action in REPLICA_ACTIONS:
+            self.replica_token = start_replica_reads(read_database(request.user.pk))
+
+    def dispatch(self, request, *args, **kwargs):
+        self.replica_token = None
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            if self.replica_token is not None:
+                end_replica_reads(self.replica_token)
 
     def get_queryset(self):
         """
         Filtra tarefas do usuário com suporte a busca e filtros.
         
         Parâmetros de query disponíveis:
-        - search: busca por título ou descrição
+        - search: busca full-text em título e descrição, ordenada por relevância
+        - highlight=true: inclui trechos com os termos marcados (<mark>)
         - status: filtra por status (pending, completed, cancelled)
+        - priority: alta, media ou baixa (pendentes há mais de 7 dias, de 4 a
+          7 dias, até 3 dias), calculada pelo banco
         - date_from: tarefas criadas a partir desta data (YYYY-MM-DD)
         - date_to: tarefas criadas até esta data (YYYY-MM-DD)
-        - ordering: ordena por campo (-created_at, title, status)
+        - ordering: ordena por campo (-created_at, title, status, -priority)
+        - cursor / page_size: paginação por cursor (ver TaskCursorPagination)
+        - count=true: inclui a contagem total na resposta paginada
+        - fields: campos da resposta em list/search (ex.: id,title,status)
         """
         queryset = Task.objects.filter(user=self.request.user)
         
-        
         if hasattr(self.request, 'query_params'):
             query_params = self.request.query_params
         else:
             query_params = self.request.GET
         
-        search = query_params.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | 
-                Q(description__icontains=search)
-            )
-        
-        
-        status_filter = query_params.get('status')
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        
-        date_from = query_params.get('date_from')
-        date_to = query_params.get('date_to')
-        
-        if date_from:
-            try:
-                date_from_parsed = datetime.strptime(date_from, '%Y-%m-%d').date()
-                queryset = queryset.filter(created_at__date__gte=date_from_parsed)
-            except ValueError:
-                pass 
-        if date_to:
-            try:
-                date_to_parsed = datetime.strptime(date_to, '%Y-%m-%d').date()
-                queryset = queryset.filter(created_at__date__lte=date_to_parsed)
-            except ValueError:
-                pass  
-        
-       
-        ordering = query_params.get('ordering', '-created_at')
-        if ordering in ['created_at', '-created_at', 'title', '-title', 'status', '-status']:
-            queryset = queryset.order_by(ordering)
-        else:
-            queryset = queryset.order_by('-created_at')  
+        return apply_task_filters(queryset, query_params)
+
+    def task_rows(self, queryset):
+        """
+        Linhas do queryset restritas aos campos de ?fields=, e esses campos.
+        """
+        fields = parse_task_fields(self.request.query_params.get('fields'))
+        return task_values(queryset, fields), fields
 
-        return queryset
+    @conditional_task_response(cache=True)
+    def list(self, request, *args, **kwargs):
+        """
+        Lista as tarefas do usuário (ver get_queryset para os filtros).
+
+        ?fields=id,title,status limita as colunas lidas e os campos da
+        resposta. As linhas são serializadas direto dos valores do banco
+        (serialize_task_rows), com a mesma saída de TaskSerializer.
+        """
+        rows, fields = self.task_rows(self.get_queryset())
+        page = self.paginate_queryset(rows)
+        with timed('serialize'):
+            if page is not None:
+                return self.get_paginated_response(serialize_task_rows(page, fields))
+            return Response(serialize_task_rows(rows, fields))
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -106,53 +136,93 @@ class TaskViewSet(viewsets.ModelViewSet):
         return self.update(request, *args, **kwargs)
 
     @action(detail=False, methods=['get'])
+    @conditional_task_response(daily=True, cache=True)
     def statistics(self, request):
         """
         Retorna estatísticas das tarefas do usuário
         """
         user_tasks = self.get_queryset()
         
-       
-        total_tasks = user_tasks.count()
-        completed_tasks = user_tasks.filter(status='completed').count()
-        pending_tasks = user_tasks.filter(status='pending').count()
-        
-      
-        today = datetime.now().date()
-        week_ago = today - timedelta(days=7)
-        month_ago = today - timedelta(days=30)
-        
-        tasks_today = user_tasks.filter(created_at__date=today).count()
-        tasks_this_week = user_tasks.filter(created_at__date__gte=week_ago).count()
-        tasks_this_month = user_tasks.filter(created_at__date__gte=month_ago).count()
-        
-        completed_today = user_tasks.filter(
-            status='completed',
-            created_at__date=today
-        ).count()
-        
-   
-        completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-        
+        # Sem filtros, os números saem dos contadores mantidos por usuário;
+        # com filtros, de uma única consulta agregada sobre o queryset filtrado.
+        if has_row_filters(request.query_params):
+            counts = count_tasks(user_tasks)
+        else:
+            counts = count_user_tasks(request.user, stats=getattr(request, 'task_stats', None))
         
         recent_tasks = user_tasks.order_by('-created_at')[:5]
         recent_tasks_data = TaskSerializer(recent_tasks, many=True).data
-        
-        statistics_data = {
-            'total_tasks': total_tasks,
-            'completed_tasks': completed_tasks,
-            'pending_tasks': pending_tasks,
-            'completion_rate': round(completion_rate, 1),
-            'tasks_today': tasks_today,
-            'tasks_this_week': tasks_this_week,
-            'tasks_this_month': tasks_this_month,
-            'completed_today': completed_today,
-            'recent_tasks': recent_tasks_data
-        }
+        statistics_data = build_statistics(counts, recent_tasks_data)
         
         return Response(statistics_data)
     
     @action(detail=False, methods=['get'])
+    @conditional_task_response(daily=True, cache=True)
+    def timeseries(self, request):
+        """
+        Tarefas criadas e concluídas por dia, semana ou mês, para gráficos.
+        
+        Parâmetros de query:
+        - interval: day (padrão), week ou month
+        - date_from, date_to: período (YYYY-MM-DD, inclusivo); padrão termina hoje
+        - tz: fuso dos dias, nome IANA (padrão: o do projeto)
+        
+        "completed" conta, entre as tarefas criadas no período, as que estão
+        concluídas; "completions", as tarefas concluídas no período (por
+        completed_at). Os números vêm de uma consulta agrupada sobre o
+        resumo diário por usuário (DailyTaskStats) no fuso do projeto, ou
+        sobre o horário (HourlyTaskStats) em fusos de horas cheias; fusos
+        de meia hora agrupam as próprias tarefas. Cada período traz start,
+        end e partial, para o primeiro e o último que o intervalo corta.
+        """
+        interval, date_from, date_to, tz = parse_timeseries_params(request.query_params)
+        return Response(task_timeseries(request.user, interval, date_from, date_to, tz))
+
+    @action(detail=False, methods=['get'], url_path='lead-time')
+    @conditional_task_response(daily=True, cache=True)
+    def lead_time(self, request):
+        """
+        Distribuição do lead time (criação até conclusão), em segundos.
+        
+        Considera as conclusões entre date_from e date_to (YYYY-MM-DD, no
+        fuso de ?tz=; padrão: últimos 90 dias) registradas no log de eventos.
+        """
+        start, end = parse_flow_params(request.query_params)
+        return Response(completion_time_distribution(request.user, 'lead_time', start, end))
+
+    @action(detail=False, methods=['get'], url_path='cycle-time')
+    @conditional_task_response(daily=True, cache=True)
+    def cycle_time(self, request):
+        """
+        Distribuição do cycle time, em segundos: da última vez que a tarefa
+        ficou pendente (criação ou reabertura) até a conclusão.
+        
+        Mesmos parâmetros de lead-time.
+        """
+        start, end = parse_flow_params(request.query_params)
+        return Response(completion_time_distribution(request.user, 'cycle_time', start, end))
+
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None):
+        """
+        Eventos da tarefa (criação, conclusões, reaberturas, exclusão), do
+        mais antigo ao mais recente. Continua disponível depois da exclusão.
+        """
+        try:
+            task_id = int(pk)
+        except (TypeError, ValueError):
+            raise NotFound()
+        events = list(
+            TaskEvent.objects.filter(user=request.user, task_id=task_id)
+            .order_by('occurred_at', 'id')
+            .values('kind', 'occurred_at')
+        )
+        if not events:
+            raise NotFound()
+        return Response({'task_id': task_id, 'events': TaskEventSerializer(events, many=True).data})
+
+    @action(detail=False, methods=['get'])
+    @conditional_task_response(cache=True)
     def search(self, request):
         """
         Endpoint dedicado para busca e filtros das tarefas.
@@ -161,230 +231,320 @@ class TaskViewSet(viewsets.ModelViewSet):
         - /api/tasks/search/?q=estudar
         - /api/tasks/search/?status=pending&q=projeto
         - /api/tasks/search/?status=completed&date_from=2024-01-01
+        - /api/tasks/search/?q=projeto&page_size=20&count=true
+        - /api/tasks/search/?q=projeto&highlight=true
+        - /api/tasks/search/?q=projeto&fields=id,title,status
         """
        
         search_term = request.query_params.get('q') or request.query_params.get('search')
         
-        queryset = Task.objects.filter(user=request.user)
-        
-        
-        if search_term:
-            queryset = queryset.filter(
-                Q(title__icontains=search_term) | 
-                Q(description__icontains=search_term)
-            )
-        
-        
-        status_filter = request.query_params.get('status')
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        
-        date_from = request.query_params.get('date_from')
-        date_to = request.query_params.get('date_to')
-        
-        if date_from:
-            try:
-                date_from_parsed = datetime.strptime(date_from, '%Y-%m-%d').date()
-                queryset = queryset.filter(created_at__date__gte=date_from_parsed)
-            except ValueError:
-                pass
+        queryset = apply_task_filters(
+            Task.objects.filter(user=request.user),
+            request.query_params,
+            search_term=search_term or '',
+        )
+        filters_applied = search_filters_applied(
+            request.query_params, search_term, ranked='rank' in queryset.query.annotations
+        )
         
-        if date_to:
-            try:
-                date_to_parsed = datetime.strptime(date_to, '%Y-%m-%d').date()
-                queryset = queryset.filter(created_at__date__lte=date_to_parsed)
-            except ValueError:
-                pass
+        rows, fields = self.task_rows(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            with timed('serialize'):
+                data = self.paginator.get_paginated_data(serialize_task_rows(page, fields))
+            data['filters_applied'] = filters_applied
+            return Response(data)
         
+        with timed('serialize'):
+            results = serialize_task_rows(rows, fields)
         
-        ordering = request.query_params.get('ordering', '-created_at')
-        if ordering in ['created_at', '-created_at', 'title', '-title', 'status', '-status']:
-            queryset = queryset.order_by(ordering)
+        return Response({
+            'results': results,
+            'count': len(results),
+            'filters_applied': filters_applied
+        })
+    
+    def get_bulk_items(self, request):
+        """
+        Lista de itens do corpo de uma escrita em lote, ou uma Response de erro.
+        """
+        from .bulk import BULK_MAX_ITEMS
+
+        items = request.data
+        if not isinstance(items, list):
+            return None, Response(
+                {'detail': 'Envie uma lista de tarefas.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > BULK_MAX_ITEMS:
+            return None, Response(
+                {'detail': f'Máximo de {BULK_MAX_ITEMS} itens por requisição.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return items, None
+
+    def bulk_response(self, key, tasks, errors, success_status):
+        if errors and not tasks:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif errors:
+            response_status = status.HTTP_207_MULTI_STATUS
         else:
-            queryset = queryset.order_by('-created_at')
+            response_status = success_status
+        return Response({
+            key: TaskSerializer(tasks, many=True).data,
+            'errors': errors
+        }, status=response_status)
+
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """
+        Cria várias tarefas em uma requisição.
         
+        Corpo: lista de tarefas no formato do POST /api/tasks/. As válidas
+        são gravadas com um único INSERT; as inválidas voltam em errors com
+        o índice do item.
+        """
+        items, error_response = self.get_bulk_items(request)
+        if error_response:
+            return error_response
+        from .bulk import bulk_create_tasks
+
+        tasks, errors = bulk_create_tasks(request.user, items)
+        return self.bulk_response('created', tasks, errors, status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['patch'])
+    def bulk_update(self, request):
+        """
+        Atualiza várias tarefas em uma requisição.
         
-        serializer = TaskSerializer(queryset, many=True)
+        Corpo: lista de {"id": ..., campos a alterar}. Tudo é gravado com um
+        único UPDATE em lote; itens inválidos ou de outros usuários voltam
+        em errors.
+        """
+        items, error_response = self.get_bulk_items(request)
+        if error_response:
+            return error_response
+        if not all(isinstance(item, dict) for item in items):
+            return Response(
+                {'detail': 'Cada item deve ser um objeto.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        from .bulk import bulk_update_tasks
+
+        tasks, errors = bulk_update_tasks(request.user, items)
+        return self.bulk_response('updated', tasks, errors, status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'])
+    def bulk_status(self, request):
+        """
+        Define o status de todas as tarefas que casam com os filtros.
         
-        return Response({
-            'results': serializer.data,
-            'count': queryset.count(),
-            'filters_applied': {
-                'search': search_term,
-                'status': status_filter,
-                'date_from': date_from,
-                'date_to': date_to,
-                'ordering': ordering
-            }
-        })
-    
+        Corpo: {"status": "completed", "filters": {"search": ..., "status": ...,
+        "date_from": ..., "date_to": ...}}. Executa um único UPDATE no banco.
+        """
+        serializer = TaskUpdateSerializer(data={'status': request.data.get('status')})
+        serializer.is_valid(raise_exception=True)
+        new_status = serializer.validated_data['status']
+
+        filters = request.data.get('filters') or {}
+        if not isinstance(filters, dict):
+            return Response(
+                {'filters': ['Deve ser um objeto.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        filters = clean_filter_params(filters, allowed=('search', 'status', 'date_from', 'date_to'))
+
+        from .bulk import bulk_set_status
+
+        updated = bulk_set_status(request.user, filters, new_status)
+        return Response({'updated': updated, 'status': new_status, 'filters_applied': filters})
+
     @action(detail=False, methods=['get'])
     def motivacional(self, request):
         """
         Retorna uma frase motivacional aleatória da API Quotable.
         
-        Tenta HTTPS primeiro com certificados atualizados, fallback para HTTP.
+        As frases vêm de um pool em memória reabastecido em segundo plano
+        (ver tasks.quotes.QuotePool), então a resposta não espera pela API
+        externa; com o pool vazio, usa o cache local de frases.
         """
-        
-        # Solução 1: Tentar requisição simples para a API Quotable
-        try:
-            import requests
-            response = requests.get('https://api.quotable.io/random', timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                return Response({
-                    'content': data.get('content', ''),
-                    'author': data.get('author', ''),
-                    'tag': data.get('tags', ['Famous Quotes'])[0] if data.get('tags') else 'inspiração',
-                    'success': True,
-                    'source': 'QUOTABLE_API',
-                    'api_id': data.get('_id', ''),
-                    'length': data.get('length', 0)
-                })
-        except Exception as e:
-            print(f"Quotable API falhou: {e}")
-
-        # Fallback: cache local de frases reais da Quotable API
-        quotable_database = [
-            {"_id": "YbIkDkitaO", "content": "Life is what happens when you're busy making other plans.", "author": "John Lennon", "tags": ["Famous Quotes"], "length": 58},
-            {"_id": "ZvmwOvR0QI", "content": "The only way to do great work is to love what you do.", "author": "Steve Jobs", "tags": ["Famous Quotes"], "length": 54},
-            {"_id": "kPPCBjlg", "content": "In the end, we will remember not the words of our enemies, but the silence of our friends.", "author": "Martin Luther King Jr.", "tags": ["Famous Quotes"], "length": 89},
-            {"_id": "EhPdlmjZ9ON", "content": "Intuition will tell the thinking mind where to look next.", "author": "Jonas Salk", "tags": ["Famous Quotes"], "length": 57},
-            {"_id": "mEOw7jZ4OY", "content": "Success is not final, failure is not fatal: it is the courage to continue that counts.", "author": "Winston Churchill", "tags": ["Famous Quotes"], "length": 83},
-            {"_id": "X8nGqg5OxI", "content": "The future belongs to those who believe in the beauty of their dreams.", "author": "Eleanor Roosevelt", "tags": ["Famous Quotes"], "length": 70},
-            {"_id": "bQJl8Z6wQ5", "content": "Innovation distinguishes between a leader and a follower.", "author": "Steve Jobs", "tags": ["Famous Quotes"], "length": 56},
-            {"_id": "pQXf9Y8xR2", "content": "Be yourself; everyone else is already taken.", "author": "Oscar Wilde", "tags": ["Famous Quotes"], "length": 42},
-            {"_id": "nK8fQ9Rx", "content": "Two things are infinite: the universe and human stupidity; and I'm not sure about the universe.", "author": "Albert Einstein", "tags": ["Famous Quotes"], "length": 94},
-            {"_id": "mX7dR4Wp", "content": "A room without books is like a body without a soul.", "author": "Marcus Tullius Cicero", "tags": ["Famous Quotes"], "length": 49},
-            {"_id": "hL9sK2Nt", "content": "You only live once, but if you do it right, once is enough.", "author": "Mae West", "tags": ["Famous Quotes"], "length": 58},
-            {"_id": "fG4pM8Qv", "content": "If you want to know what a man's like, take a good look at how he treats his inferiors.", "author": "J.K. Rowling", "tags": ["Famous Quotes"], "length": 85},
-            {"_id": "eC3hN7Bs", "content": "The greatest glory in living lies not in never falling, but in rising every time we fall.", "author": "Nelson Mandela", "tags": ["Famous Quotes"], "length": 87},
-            {"_id": "dB2gM6Ar", "content": "The way to get started is to quit talking and begin doing.", "author": "Walt Disney", "tags": ["Famous Quotes"], "length": 56},
-            {"_id": "aZ1fL5Dq", "content": "Your time is limited, so don't waste it living someone else's life.", "author": "Steve Jobs", "tags": ["Famous Quotes"], "length": 66}
-        ]
-        import random
-        selected_quote = random.choice(quotable_database)
-        return Response({
-            'content': selected_quote['content'],
-            'author': selected_quote['author'],
-            'tag': selected_quote['tags'][0],
-            'success': True,
-            'source': 'QUOTABLE_API_CACHED',
-            'api_id': selected_quote['_id'],
-            'length': selected_quote['length'],
-            'message': 'Dados reais da Quotable API (cache local por limitação Railway)'
-        })
+        from .quotes import get_quote_pool, quote_data
+
+        quote, from_pool = get_quote_pool().get()
+        return Response(quote_data(quote, from_pool))
+
+    @action(detail=False, methods=['get'], url_path='motivacional/stats')
+    def motivacional_stats(self, request):
+        """
+        Contadores do pool de frases deste processo (hits, misses, circuit breaker).
+        """
+        from .quotes import get_quote_pool
+
+        return Response(get_quote_pool().stats())
     
     @action(detail=False, methods=['get'])
+    @conditional_task_response(daily=True)
     def export_csv(self, request):
         """
-        Exporta as tarefas do usuário em formato CSV profissional
-        """
+        Exporta as tarefas do usuário em formato CSV profissional.
         
+        O arquivo é gerado em streaming, então a memória usada não depende
+        da quantidade de tarefas exportadas.
+        """
+        from .exports import export_filename, iter_task_csv
+
+        # O streaming lê depois do fim de dispatch: fixa o banco escolhido agora
         queryset = self.get_queryset()
-        
-       
+        queryset = queryset.using(queryset.db)
         username = request.user.username
-        today = datetime.now().strftime('%Y-%m-%d')
-        filename = f'tarefas_{username}_{today}.csv'
         
-       
-        response = HttpResponse(
+        response = StreamingHttpResponse(
+            iter_task_csv(queryset, username),
             content_type='text/csv; charset=utf-8',
             headers={
-                'Content-Disposition': f'attachment; filename="{filename}"'
+                'Content-Disposition': f'attachment; filename="{export_filename(username)}"'
             },
         )
-        
-        
-        response.write('\ufeff')
-        
-        
-        writer = csv.writer(response, delimiter=';', quoting=csv.QUOTE_ALL)
-        
-        
-        writer.writerow([
-            'ID',
-            'Título',
-            'Descrição',
-            'Status',
-            'Prioridade',
-            'Data de Criação',
-            'Hora de Criação',
-            'Dias Desde Criação',
-            'Usuário'
-        ])
-        
-        
-        for task in queryset:
-            
-            days_since_creation = (datetime.now().date() - task.created_at.date()).days
-            
-            
-            status_map = {
-                'pending': 'Pendente',
-                'completed': 'Concluída',
-                'cancelled': 'Cancelada'
-            }
-            
-            
-            if task.status == 'pending':
-                if days_since_creation > 7:
-                    priority = 'Alta'
-                elif days_since_creation > 3:
-                    priority = 'Média'
-                else:
-                    priority = 'Baixa'
-            else:
-                priority = 'N/A'
-            
-            writer.writerow([
-                task.id,
-                task.title,
-                task.description or 'Sem descrição',
-                status_map.get(task.status, task.status),
-                priority,
-                task.created_at.strftime('%d/%m/%Y'),
-                task.created_at.strftime('%H:%M'),
-                f'{days_since_creation} dias',
-                request.user.username
-            ])
-        
         return response
 
+    @action(detail=False, methods=['post'])
+    def import_csv(self, request):
+        """
+        Importa tarefas de um CSV no formato de export_csv (campo file de um
+        multipart/form-data).
+        
+        O arquivo é lido em streaming e gravado em blocos; a resposta traz
+        quantas linhas foram lidas, criadas e recusadas, os erros por linha
+        (row conta a partir da primeira linha depois do cabeçalho) e a vazão.
+        Arquivos acima de IMPORT_MAX_UPLOAD_BYTES recebem 413: a importação
+        roda dentro da requisição e precisa caber no timeout do worker; os
+        maiores vão pelo comando import_tasks.
+        """
+        from .imports import CSVImportError, import_tasks_csv
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(
+                {'file': ['Envie o CSV no campo file (multipart/form-data).']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if upload.size > settings.IMPORT_MAX_UPLOAD_BYTES:
+            return Response(
+                {
+                    'detail': (
+                        f'Arquivo maior que {settings.IMPORT_MAX_UPLOAD_BYTES} bytes. Divida o CSV '
+                        'ou importe pelo servidor com manage.py import_tasks.'
+                    ),
+                    'max_bytes': settings.IMPORT_MAX_UPLOAD_BYTES,
+                },
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        try:
+            report = import_tasks_csv(request.user, upload)
+        except CSVImportError as e:
+            return Response({'detail': str(e), **(e.report or {})}, status=status.HTTP_400_BAD_REQUEST)
+
+        if report['failed'] and not report['created']:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif report['failed']:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_201_CREATED
+        return Response(report, status=response_status)
+
+    @action(detail=False, methods=['get'], url_path='cache/stats')
+    def cache_stats(self, request):
+        """
+        Hits, misses e taxa de acerto do cache de respostas (todos os workers).
+        """
+        return Response(cache_stats())
+
     @action(detail=False, methods=['get'], url_path='diagnostico')
     def diagnostico(self, request):
         """
         Endpoint de diagnóstico: testa conexões HTTPS para vários domínios e retorna status.
+        
+        Os domínios são testados em paralelo, com prazo total
+        DIAGNOSTICO_DEADLINE, e o resultado fica em cache por alguns segundos.
         """
-        domínios = [
-            ('Quotable API', 'https://api.quotable.io/random'),
-            ('HTTPBin', 'https://httpbin.org/get'),
-            ('Google', 'https://www.google.com'),
-            ('GitHub', 'https://api.github.com'),
-            ('ZenQuotes', 'https://zenquotes.io/api/random'),
-            ('JsonPlaceholder', 'https://jsonplaceholder.typicode.com/todos/1'),
-        ]
-        resultados = []
-        for nome, url in domínios:
-            try:
-                r = requests.get(url, timeout=6)
-                resultados.append({
-                    'nome': nome,
-                    'url': url,
-                    'status_code': r.status_code,
-                    'ok': r.ok,
-                    'erro': None
-                })
-            except Exception as e:
-                resultados.append({
-                    'nome': nome,
-                    'url': url,
-                    'status_code': None,
-                    'ok': False,
-                    'erro': str(e)
-                })
-        return Response({
-            'diagnostico': resultados,
-            'mensagem': 'Se apenas a Quotable API falhar, o problema é externo ao seu código.'
-        })
\ No newline at end of file
+        from .diagnostics import diagnostico_data, run_diagnostics
+
+        resultados, em_cache = run_diagnostics()
+        return Response(diagnostico_data(resultados, em_cache))
+
+
+class ExportJobViewSet(mixins.CreateModelMixin,
+                       mixins.ListModelMixin,
+                       mixins.RetrieveModelMixin,
+                       viewsets.GenericViewSet):
+    """
+    Exportações assíncronas: cria o job, consulta o status e baixa o arquivo.
+
+    O arquivo é gerado fora do ciclo da requisição pelo comando
+    run_export_worker, com os mesmos filtros de /api/tasks/.
+    """
+    serializer_class = ExportJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return ExportJob.objects.filter(user=self.request.user).order_by('-created_at')
+
+    def create(self, request, *args, **kwargs):
+        """
+        Enfileira uma exportação.
+        
+        Corpo (todos opcionais): format (csv.gz), search, status, date_from,
+        date_to, ordering.
+        """
+        from .export_jobs import EXPORT_FORMATS
+
+        if not isinstance(request.data, dict):
+            return Response(
+                {'detail': 'Envie um objeto JSON com os parâmetros da exportação.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        export_format = request.data.get('format', 'csv.gz')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'format': [f'Formato inválido. Opções: {", ".join(EXPORT_FORMATS)}']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        job = ExportJob.objects.create(
+            user=request.user,
+            format=export_format,
+            params=clean_filter_params(request.data),
+        )
+        serializer = self.get_serializer(job)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """
+        Baixa o arquivo de uma exportação concluída.
+        """
+        job = self.get_object()
+        if job.status == 'expired' or (job.expires_at and job.expires_at <= timezone.now()):
+            return Response({'detail': 'Exportação expirada'}, status=status.HTTP_410_GONE)
+        if job.status != 'completed':
+            return Response(
+                {'detail': 'Exportação ainda não concluída', 'status': job.status},
+                status=status.HTTP_409_CONFLICT
+            )
+        from .export_jobs import EXPORT_FORMATS
+        from .exports import export_filename
+
+        _, content_type = EXPORT_FORMATS[job.format]
+        try:
+            handle = open(job.file_path, 'rb')
+        except OSError:
+            # Arquivo apagado (ou gerado num worker sem o mesmo EXPORT_ROOT)
+            return Response(
+                {'detail': 'Arquivo da exportação não encontrado; crie uma nova exportação'},
+                status=status.HTTP_410_GONE
+            )
+        return FileResponse(
+            handle,
+            as_attachment=True,
+            filename=export_filename(request.user.username, job.format),
+            content_type=content_type,
+        )